@@ -13,8 +13,12 @@ Architecture:
 
 Usage:
     python main.py
+    python main.py --daemon [--interval 15m | --cron "*/30 * * * *"]
+    python main.py --fleet [--environments-file environments.json] [--max-workers 4]
+    python main.py --serve [--host 127.0.0.1] [--port 8080] [--workers 1]
 """
 
+import argparse
 import os
 import sys
 from pathlib import Path
@@ -79,6 +83,108 @@ def display_welcome():
     ))
 
 
+def parse_args() -> argparse.Namespace:
+    """Command line options"""
+    parser = argparse.ArgumentParser(description="Dynatrace Observability Multi-Agent System")
+    parser.add_argument(
+        "--daemon", action="store_true",
+        help="run headless, analyzing on a schedule and saving reports without prompts"
+    )
+    parser.add_argument("--interval", help="daemon interval, e.g. 900, 15m, 1h (default: DT_DAEMON_INTERVAL or 1h)")
+    parser.add_argument("--cron", help="daemon cron spec, e.g. '*/30 * * * *' (default: DT_DAEMON_CRON)")
+    parser.add_argument(
+        "--no-run-on-start", action="store_true",
+        help="wait for the first scheduled slot instead of analyzing immediately"
+    )
+    parser.add_argument("--report-dir", default="reports", help="directory for daemon, fleet and API reports")
+    parser.add_argument(
+        "--fleet", action="store_true",
+        help="analyze every environment in the fleet file concurrently and write a fleet summary"
+    )
+    parser.add_argument(
+        "--environments-file",
+        help="fleet file with the environments to analyze (default: DT_ENVIRONMENTS_FILE or environments.json)"
+    )
+    parser.add_argument(
+        "--max-workers", type=int,
+        help="environments analyzed at the same time (default: DT_FLEET_MAX_WORKERS or 4)"
+    )
+    parser.add_argument(
+        "--serve", action="store_true",
+        help="run the local HTTP API that queues analyses on demand"
+    )
+    parser.add_argument("--host", help="API bind address (default: DT_API_HOST or 127.0.0.1)")
+    parser.add_argument("--port", type=int, help="API port (default: DT_API_PORT or 8080)")
+    parser.add_argument("--workers", type=int, help="analyses the API runs at once (default: DT_API_WORKERS or 1)")
+    return parser.parse_args()
+
+
+def run_daemon(args: argparse.Namespace):
+    """Headless scheduled mode - one warm process, no prompts"""
+    from src.daemon import AnalysisDaemon, schedule_from_config
+    
+    console = Console()
+    
+    if not check_environment():
+        sys.exit(1)
+    
+    try:
+        schedule = schedule_from_config(interval=args.interval, cron=args.cron)
+    except ValueError as e:
+        console.print(f"[red]{e}[/red]")
+        sys.exit(2)
+    
+    daemon = AnalysisDaemon(
+        schedule,
+        report_dir=args.report_dir,
+        run_on_start=not args.no_run_on_start,
+        verbose=os.getenv("AGENT_VERBOSE", "false").lower() == "true"
+    )
+    try:
+        daemon.serve_forever()
+    except RuntimeError as e:
+        console.print(f"[red]{e}[/red]")
+        sys.exit(1)
+
+
+def run_fleet(args: argparse.Namespace):
+    """Analyze several Dynatrace environments concurrently, without prompts"""
+    from src.fleet import FleetAnalyzer
+    from src.tools.environments import load_environments
+    
+    console = Console()
+    
+    if not os.getenv("OPENAI_API_KEY"):
+        console.print("[red]OPENAI_API_KEY is required for fleet analysis.[/red]")
+        sys.exit(1)
+    
+    try:
+        environments = load_environments(args.environments_file)
+        for config in environments:
+            config.server_env()
+    except (OSError, ValueError) as e:
+        console.print(f"[red]Invalid fleet configuration: {e}[/red]")
+        sys.exit(2)
+    
+    results = FleetAnalyzer(
+        environments,
+        max_workers=args.max_workers,
+        report_dir=args.report_dir
+    ).run()
+    if results["status"] == "error":
+        sys.exit(1)
+
+
+def run_server(args: argparse.Namespace):
+    """Local HTTP API - analyses are submitted, polled and fetched over HTTP"""
+    from src.api_server import serve
+    
+    if not check_environment():
+        sys.exit(1)
+    
+    serve(host=args.host, port=args.port, workers=args.workers, report_dir=args.report_dir)
+
+
 def main():
     """Main execution function"""
     console = Console()
@@ -86,6 +192,17 @@ def main():
     # Load environment variables
     load_dotenv()
     
+    args = parse_args()
+    if args.daemon:
+        run_daemon(args)
+        return
+    if args.fleet:
+        run_fleet(args)
+        return
+    if args.serve:
+        run_server(args)
+        return
+    
     # Display welcome message
     display_welcome()
     
@@ -0,0 +1,297 @@
+"""
+LLM Response Cache - Replays agent LLM responses for identical prompts
+Responses are keyed on model, temperature, stop words and a hash of the full
+message list, so a re-run over unchanged inputs (e.g. the onboarding guide over
+an unchanged synthesis) answers from the cache instead of paying LLM latency
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Set
+
+from crewai import LLM
+
+from ..tools.rate_limiter import limited
+
+
+DEFAULT_BACKEND = "memory"
+DEFAULT_PATH = ".cache/llm_cache.sqlite"
+DEFAULT_MAX_ENTRIES = 1000
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def make_llm_cache_key(model: str, temperature: Optional[float], messages: Any, stop: Any = None) -> str:
+    """Stable key for one LLM call: model, sampling settings and a prompt hash"""
+    prompt = json.dumps(messages, sort_keys=True, default=str, separators=(",", ":"))
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    return f"{model}:{temperature}:{json.dumps(stop, sort_keys=True, default=str)}:{prompt_hash}"
+
+
+class LLMCacheBackend(ABC):
+    """Storage for cached responses; implementations evict by size on put()"""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    def put(self, key: str, value: str) -> int:
+        """Store a response and return the number of entries evicted to make room"""
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+    @abstractmethod
+    def size(self) -> Dict[str, int]:
+        ...
+
+
+class MemoryLLMCache(LLMCacheBackend):
+    """In-process LRU bounded by entry count and total response size"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: str) -> int:
+        evicted = 0
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= len(self._entries.pop(key))
+            self._entries[key] = value
+            self._bytes += len(value)
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, oldest = self._entries.popitem(last=False)
+                self._bytes -= len(oldest)
+                evicted += 1
+        return evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def size(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes}
+
+
+class SQLiteLLMCache(LLMCacheBackend):
+    """
+    Persistent cache shared across runs and processes. Least recently used
+    rows are deleted once the entry count or total size exceeds its limits.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_PATH,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS llm_responses ("
+            "key TEXT PRIMARY KEY, value TEXT, size INTEGER, accessed_at REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS llm_responses_accessed ON llm_responses (accessed_at)")
+        self._db.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute("SELECT value FROM llm_responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE llm_responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+            return row[0]
+
+    def put(self, key: str, value: str) -> int:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, value, size, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, len(value), time.time())
+            )
+            entries, total = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_responses"
+            ).fetchone()
+
+            victims: List[str] = []
+            if entries > self.max_entries or total > self.max_bytes:
+                for victim, size in self._db.execute(
+                    "SELECT key, size FROM llm_responses ORDER BY accessed_at"
+                ):
+                    if entries <= self.max_entries and total <= self.max_bytes:
+                        break
+                    victims.append(victim)
+                    entries -= 1
+                    total -= size
+                self._db.executemany("DELETE FROM llm_responses WHERE key = ?", [(v,) for v in victims])
+            self._db.commit()
+            return len(victims)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM llm_responses")
+            self._db.commit()
+
+    def size(self) -> Dict[str, int]:
+        with self._lock:
+            entries, total = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_responses"
+            ).fetchone()
+            return {"entries": entries, "bytes": total}
+
+
+class LLMResponseCache:
+    """Backend plus per-agent hit/miss/bypass counters"""
+
+    def __init__(self, backend: LLMCacheBackend):
+        self.backend = backend
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Any] = {"hits": 0, "misses": 0, "bypassed": 0, "evictions": 0, "by_agent": {}}
+
+    def _count(self, agent: str, field: str) -> None:
+        with self._lock:
+            self._stats[field] += 1
+            per_agent = self._stats["by_agent"].setdefault(
+                agent or "unnamed", {"hits": 0, "misses": 0, "bypassed": 0}
+            )
+            per_agent[field] += 1
+
+    def lookup(self, agent: str, key: str) -> Optional[str]:
+        value = self.backend.get(key)
+        self._count(agent, "hits" if value is not None else "misses")
+        return value
+
+    def store(self, key: str, value: str) -> None:
+        evicted = self.backend.put(key, value)
+        if evicted:
+            with self._lock:
+                self._stats["evictions"] += evicted
+
+    def record_bypass(self, agent: str) -> None:
+        self._count(agent, "bypassed")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            snapshot = json.loads(json.dumps(self._stats))
+        snapshot.update(self.backend.size())
+        return snapshot
+
+
+def llm_cache_delta(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Any]:
+    """Counters accumulated between two stats() snapshots, with per-agent hit rates"""
+    delta: Dict[str, Any] = {
+        field: after.get(field, 0) - before.get(field, 0)
+        for field in ("hits", "misses", "bypassed", "evictions")
+    }
+    delta["by_agent"] = {}
+    for agent, counts in after.get("by_agent", {}).items():
+        previous = before.get("by_agent", {}).get(agent, {})
+        agent_delta = {field: counts[field] - previous.get(field, 0) for field in ("hits", "misses", "bypassed")}
+        if any(agent_delta.values()):
+            lookups = agent_delta["hits"] + agent_delta["misses"]
+            agent_delta["hit_rate"] = round(agent_delta["hits"] / lookups, 3) if lookups else 0.0
+            delta["by_agent"][agent] = agent_delta
+    lookups = delta["hits"] + delta["misses"]
+    delta["hit_rate"] = round(delta["hits"] / lookups, 3) if lookups else 0.0
+    return delta
+
+
+def cache_sampled_from_env() -> bool:
+    """Also cache agents sampling at temperature > 0 (DT_LLM_CACHE_SAMPLED); off by default"""
+    return os.getenv("DT_LLM_CACHE_SAMPLED", "false").lower() in ("1", "true", "yes")
+
+
+def bypassed_agents() -> Set[str]:
+    """Agents whose calls never use the cache (DT_LLM_CACHE_BYPASS="onboarding_guide,...")"""
+    return {name.strip() for name in os.getenv("DT_LLM_CACHE_BYPASS", "").split(",") if name.strip()}
+
+
+class CachedLLM(LLM):
+    """
+    CrewAI LLM that consults the response cache before calling the model.
+
+    Native function-calling and streaming calls always go to the model: their
+    results involve tool execution or incremental callbacks that a replayed
+    string cannot reproduce. Calls that reach the model are throttled by the
+    model's limiter ("llm:<model>").
+    """
+
+    def __init__(self, *args, agent_name: str = "", response_cache: Optional[LLMResponseCache] = None,
+                 cache_bypass: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.agent_name = agent_name
+        self.response_cache = response_cache
+        self.cache_bypass = cache_bypass
+        self.last_cache_hit = False  # Whether the latest call was answered from the cache
+
+    def _call_model(self, *args):
+        with limited(f"llm:{self.model}"):
+            return LLM.call(self, *args)
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None, from_agent=None):
+        cache = self.response_cache
+        self.last_cache_hit = False
+        if cache is None:
+            return self._call_model(messages, tools, callbacks, available_functions, from_task, from_agent)
+        if self.cache_bypass or tools or self.stream:
+            cache.record_bypass(self.agent_name)
+            return self._call_model(messages, tools, callbacks, available_functions, from_task, from_agent)
+
+        key = make_llm_cache_key(self.model, self.temperature, messages, self.stop)
+        cached = cache.lookup(self.agent_name, key)
+        if cached is not None:
+            self.last_cache_hit = True
+            return cached
+
+        response = self._call_model(messages, tools, callbacks, available_functions, from_task, from_agent)
+        if isinstance(response, str) and response:
+            cache.store(key, response)
+        return response
+
+
+_cache: Optional[LLMResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """Process-wide LLM response cache (DT_LLM_CACHE_BACKEND=memory|sqlite|none)"""
+    global _cache
+    backend = os.getenv("DT_LLM_CACHE_BACKEND", DEFAULT_BACKEND).lower()
+    if backend in ("", "none", "off", "false"):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            max_entries = int(os.getenv("DT_LLM_CACHE_MAX_ENTRIES", str(DEFAULT_MAX_ENTRIES)))
+            max_bytes = int(os.getenv("DT_LLM_CACHE_MAX_BYTES", str(DEFAULT_MAX_BYTES)))
+            if backend == "sqlite":
+                store: LLMCacheBackend = SQLiteLLMCache(
+                    os.getenv("DT_LLM_CACHE_PATH", DEFAULT_PATH), max_entries, max_bytes
+                )
+            else:
+                store = MemoryLLMCache(max_entries, max_bytes)
+            _cache = LLMResponseCache(store)
+        return _cache
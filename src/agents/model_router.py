@@ -0,0 +1,277 @@
+"""
+Model Router - Per-agent model tiering and size-aware routing for create_llm
+Each agent role maps to a task type and a routing policy: an ordered list of
+(model, max prompt tokens) routes, a request timeout and fallback models tried
+when a call times out. The latency of every routed call is recorded per agent
+and model so tiers can be tuned from real runs
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Optional, Dict, Any, List, Tuple
+
+from .llm_cache import CachedLLM
+from ..tools.output_compactor import estimate_tokens
+from ..tools.deadline import DeadlineExceeded, get_deadline
+
+
+DEFAULT_MODEL = "gpt-4o-mini"
+DEFAULT_FALLBACK_MODEL = ""  # No fallback unless DT_LLM_FALLBACK_MODEL or the routing file names one
+DEFAULT_TIMEOUT: Optional[float] = None  # The LLM client's own default unless configured
+DEFAULT_ROUTING_FILE = "llm_routing.json"
+
+# Task type of each agent role created in specialist_agents
+AGENT_TASK_TYPES = {
+    "problem_analyst": "extraction",
+    "security_analyst": "extraction",
+    "log_analyst": "analysis",
+    "insights_synthesizer": "synthesis",
+    "onboarding_guide": "writing",
+}
+
+# Task types that can be configured in the "task_types" section or DT_LLM_ROUTES
+TASK_TYPES = ("extraction", "analysis", "synthesis", "writing")
+
+
+class RoutingPolicy:
+    """
+    Ordered routes of (max_prompt_tokens, model); the first route whose limit
+    fits the prompt wins and a route without a limit catches everything else.
+    """
+
+    def __init__(
+        self,
+        routes: List[Tuple[Optional[int], str]],
+        fallbacks: Optional[List[str]] = None,
+        timeout: Optional[float] = DEFAULT_TIMEOUT,
+        task_type: str = ""
+    ):
+        if not routes:
+            raise ValueError("A routing policy needs at least one route")
+        self.routes = routes
+        self.fallbacks = fallbacks or []
+        self.timeout = timeout
+        self.task_type = task_type
+
+    def choose(self, prompt_tokens: int) -> str:
+        for max_tokens, model in self.routes:
+            if max_tokens is None or prompt_tokens <= max_tokens:
+                return model
+        return self.routes[-1][1]
+
+    def candidates(self, prompt_tokens: int) -> List[str]:
+        """Chosen model followed by the fallbacks to try after a timeout"""
+        chosen = self.choose(prompt_tokens)
+        return [chosen] + [model for model in self.fallbacks if model != chosen]
+
+    @property
+    def primary_model(self) -> str:
+        return self.routes[0][1]
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], base: "RoutingPolicy") -> "RoutingPolicy":
+        """Policy from a config entry; fields it leaves out are taken from `base`"""
+        routes = base.routes
+        if "routes" in data:
+            routes = [(route.get("max_prompt_tokens"), route["model"]) for route in data["routes"]]
+        elif "model" in data:
+            routes = [(None, data["model"])]
+        return cls(
+            routes=routes,
+            fallbacks=data.get("fallbacks", base.fallbacks),
+            timeout=float(data["timeout"]) if data.get("timeout") else base.timeout,
+            task_type=data.get("task_type", base.task_type)
+        )
+
+
+def parse_routes(spec: str) -> List[Tuple[Optional[int], str]]:
+    """Inline routes: "gpt-4o-mini<=16000|gpt-4o" (the last route usually has no limit)"""
+    routes = []
+    for part in spec.split("|"):
+        model, _, limit = part.strip().partition("<=")
+        if model:
+            routes.append((int(limit) if limit else None, model.strip()))
+    return routes
+
+
+def load_routing_config(path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Routing overrides from DT_LLM_ROUTING_FILE (JSON, optional) and DT_LLM_ROUTES.
+
+    The file holds "defaults", "task_types" and "agents" sections, each entry
+    with optional routes [{"model", "max_prompt_tokens"}], fallbacks, timeout
+    and (for agents) task_type. DT_LLM_ROUTES="insights_synthesizer=gpt-4o-mini<=32000|gpt-4o;..."
+    sets routes for agents or task types inline and wins over the file.
+    """
+    path = path or os.getenv("DT_LLM_ROUTING_FILE", DEFAULT_ROUTING_FILE)
+    config: Dict[str, Any] = {"defaults": {}, "task_types": {}, "agents": {}}
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            loaded = json.load(f)
+        for section in config:
+            config[section].update(loaded.get(section, {}))
+
+    for item in os.getenv("DT_LLM_ROUTES", "").split(";"):
+        name, _, spec = item.partition("=")
+        name = name.strip()
+        if not name or not spec.strip():
+            continue
+        section = "task_types" if name in TASK_TYPES else "agents"
+        entry = dict(config[section].get(name, {}))
+        entry["routes"] = [{"model": model, "max_prompt_tokens": limit} for limit, model in parse_routes(spec)]
+        config[section][name] = entry
+    return config
+
+
+def timeout_from_env() -> Optional[float]:
+    """Request timeout in seconds for every agent (DT_LLM_TIMEOUT_SECONDS); None = client default"""
+    try:
+        return float(os.getenv("DT_LLM_TIMEOUT_SECONDS", "")) or DEFAULT_TIMEOUT
+    except ValueError:
+        return DEFAULT_TIMEOUT
+
+
+def get_routing_policy(agent: str, config: Optional[Dict[str, Any]] = None) -> RoutingPolicy:
+    """Resolve an agent's policy: agent entry over task type entry over defaults"""
+    config = config if config is not None else load_routing_config()
+    agent_entry = config["agents"].get(agent, {})
+    task_type = agent_entry.get("task_type") or AGENT_TASK_TYPES.get(agent, "analysis")
+
+    fallback = os.getenv("DT_LLM_FALLBACK_MODEL", DEFAULT_FALLBACK_MODEL)
+    policy = RoutingPolicy(
+        routes=[(None, os.getenv("DT_LLM_MODEL", DEFAULT_MODEL))],
+        fallbacks=[fallback] if fallback else [],
+        timeout=timeout_from_env(),
+        task_type=task_type
+    )
+    for entry in (config["defaults"], config["task_types"].get(task_type, {}), agent_entry):
+        if entry:
+            policy = RoutingPolicy.from_dict(entry, policy)
+    policy.task_type = task_type
+    return policy
+
+
+def is_timeout(error: BaseException) -> bool:
+    """Timeouts from litellm, the OpenAI client or the standard library"""
+    return isinstance(error, TimeoutError) or "timeout" in type(error).__name__.lower()
+
+
+class RoutingStats:
+    """Calls, cache hits, timeouts and model latency per agent and model"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, Dict[str, float]]] = {}
+
+    def record(self, agent: str, model: str, seconds: float, outcome: str) -> None:
+        with self._lock:
+            entry = self._stats.setdefault(agent or "unnamed", {}).setdefault(
+                model, {"calls": 0, "cached": 0, "timeouts": 0, "errors": 0, "seconds": 0.0, "max_seconds": 0.0}
+            )
+            entry["calls"] += 1
+            if outcome == "cached":
+                entry["cached"] += 1
+                return
+            if outcome in ("timeouts", "errors"):
+                entry[outcome] += 1
+            entry["seconds"] += seconds
+            entry["max_seconds"] = max(entry["max_seconds"], seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return json.loads(json.dumps(self._stats))
+
+
+def routing_delta(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Any]:
+    """Per agent/model counters between two stats() snapshots with average model latency"""
+    delta: Dict[str, Any] = {}
+    for agent, models in after.items():
+        for model, counts in models.items():
+            previous = before.get(agent, {}).get(model, {})
+            entry = {
+                field: counts[field] - previous.get(field, 0)
+                for field in ("calls", "cached", "timeouts", "errors", "seconds")
+            }
+            if not entry["calls"]:
+                continue
+            timed = entry["calls"] - entry["cached"]
+            entry["avg_seconds"] = round(entry["seconds"] / timed, 3) if timed else 0.0
+            entry["seconds"] = round(entry["seconds"], 3)
+            entry["max_seconds"] = round(counts["max_seconds"], 3)
+            delta.setdefault(agent, {})[model] = entry
+    return delta
+
+
+_routing_stats = RoutingStats()
+
+
+def get_routing_stats() -> RoutingStats:
+    return _routing_stats
+
+
+class RoutedLLM(CachedLLM):
+    """
+    LLM whose every call is routed by prompt size under the agent's policy.
+
+    The instance itself serves the primary model; other models get lazily
+    created sibling instances sharing the agent's cache settings. A call that
+    times out is retried on the next fallback model. While a run deadline is
+    registered for `environment`, each request's timeout is capped by the time
+    left and no request starts once it has passed. The deadline is captured
+    when the LLM is created, so a crew abandoned at its deadline keeps failing
+    fast even after the next run registers a new one.
+    """
+
+    def __init__(self, *args, policy: RoutingPolicy, environment: str = "", **kwargs):
+        kwargs.setdefault("timeout", policy.timeout)
+        super().__init__(*args, model=policy.primary_model, **kwargs)
+        self.policy = policy
+        self.environment = environment
+        self.deadline = get_deadline(environment)
+        self._init_kwargs = kwargs
+        self._siblings: Dict[str, CachedLLM] = {}
+        self._siblings_lock = threading.Lock()
+
+    def _for_model(self, model: str) -> CachedLLM:
+        if model == self.model:
+            return self
+        with self._siblings_lock:
+            sibling = self._siblings.get(model)
+            if sibling is None:
+                sibling = CachedLLM(model=model, **self._init_kwargs)
+                self._siblings[model] = sibling
+            return sibling
+
+    def _call_routed(self, llm: CachedLLM, *args):
+        return super().call(*args) if llm is self else llm.call(*args)
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None, from_agent=None):
+        prompt = messages if isinstance(messages, str) else "\n".join(
+            str(message.get("content", "")) for message in messages
+        )
+        candidates = self.policy.candidates(estimate_tokens(prompt))
+        args = (messages, tools, callbacks, available_functions, from_task, from_agent)
+        deadline = self.deadline
+
+        for index, model in enumerate(candidates):
+            llm = self._for_model(model)
+            llm.timeout = deadline.timeout_for(self.policy.timeout) if deadline else self.policy.timeout
+            started = time.monotonic()
+            try:
+                response = self._call_routed(llm, *args)
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                timed_out = is_timeout(e)
+                _routing_stats.record(
+                    self.agent_name, model, time.monotonic() - started, "timeouts" if timed_out else "errors"
+                )
+                if not timed_out or index == len(candidates) - 1 or (deadline and deadline.expired):
+                    raise
+                continue
+            _routing_stats.record(
+                self.agent_name, model, time.monotonic() - started, "cached" if llm.last_cache_hit else "ok"
+            )
+            return response
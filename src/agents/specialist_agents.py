@@ -4,28 +4,53 @@ Each agent is an expert in their domain: Problems, Security, Logs, and Analysis
 """
 
 from crewai import Agent
-from langchain_openai import ChatOpenAI
-from typing import List
+from typing import List, Optional
+from .llm_cache import get_llm_cache, bypassed_agents, cache_sampled_from_env
+from .model_router import RoutedLLM, get_routing_policy
 from ..tools.dynatrace_mcp_tools import (
     ListProblemsTool,
     ListVulnerabilitiesTool,
     ExecuteDQLTool,
+    BatchExecuteDQLTool,
+    QueryResultBufferTool,
+    MineLogTemplatesTool,
     GenerateDQLTool,
     FindEntityByNameTool,
     ChatWithDavisCopilotTool,
-    GetEnvironmentInfoTool
+    GetEnvironmentInfoTool,
+    ReadFullToolOutputTool
 )
 
 
-def create_llm(temperature: float = 0.7):
-    """Create an LLM instance for agents"""
-    return ChatOpenAI(
-        model="gpt-4o-mini",
-        temperature=temperature
+# Log queries may reach back as far as the problems they are correlated with
+LOG_QUERY_WINDOW_HOURS = 24
+
+
+def create_llm(temperature: float = 0.7, agent: str = "", cache: Optional[bool] = None, environment: str = ""):
+    """
+    Create an LLM instance for agents.
+    
+    The model for each call is picked by the agent's routing policy (prompt size
+    and task type, see model_router). Calls go through the process-wide response
+    cache when `cache` is True, or by default when `temperature` is 0 (other
+    agents only with DT_LLM_CACHE_SAMPLED), unless the agent is listed in
+    DT_LLM_CACHE_BYPASS; `agent` labels its hit rates and latencies. Request
+    timeouts are capped by the run deadline of `environment`.
+    """
+    if cache is None:
+        # A replayed response would stand in for a fresh sample of a non-deterministic agent
+        cache = temperature == 0 or cache_sampled_from_env()
+    return RoutedLLM(
+        policy=get_routing_policy(agent),
+        environment=environment,
+        temperature=temperature,
+        agent_name=agent,
+        response_cache=get_llm_cache(),
+        cache_bypass=not cache or agent in bypassed_agents()
     )
 
 
-def create_problem_analyst_agent() -> Agent:
+def create_problem_analyst_agent(environment: str = "") -> Agent:
     """
     Problem Analyst Agent - Expert in identifying and analyzing problems
     """
@@ -44,18 +69,19 @@ def create_problem_analyst_agent() -> Agent:
             "that application owners can understand and act upon."
         ),
         tools=[
-            ListProblemsTool(),
-            FindEntityByNameTool(),
-            GetEnvironmentInfoTool()
+            ListProblemsTool(environment=environment),
+            FindEntityByNameTool(environment=environment),
+            GetEnvironmentInfoTool(environment=environment),
+            ReadFullToolOutputTool(environment=environment)
         ],
-        llm=create_llm(temperature=0.3),
+        llm=create_llm(temperature=0.3, agent="problem_analyst", cache=True, environment=environment),
         verbose=True,
         allow_delegation=False,
         max_iter=10
     )
 
 
-def create_security_analyst_agent() -> Agent:
+def create_security_analyst_agent(environment: str = "") -> Agent:
     """
     Security Analyst Agent - Expert in security vulnerabilities and risks
     """
@@ -74,17 +100,18 @@ def create_security_analyst_agent() -> Agent:
             "that non-security personnel can understand and act upon."
         ),
         tools=[
-            ListVulnerabilitiesTool(),
-            FindEntityByNameTool()
+            ListVulnerabilitiesTool(environment=environment),
+            FindEntityByNameTool(environment=environment),
+            ReadFullToolOutputTool(environment=environment)
         ],
-        llm=create_llm(temperature=0.3),
+        llm=create_llm(temperature=0.3, agent="security_analyst", cache=True, environment=environment),
         verbose=True,
         allow_delegation=False,
         max_iter=10
     )
 
 
-def create_log_analyst_agent() -> Agent:
+def create_log_analyst_agent(environment: str = "") -> Agent:
     """
     Log Analyst Agent - Expert in log analysis and correlation
     """
@@ -103,19 +130,35 @@ def create_log_analyst_agent() -> Agent:
             "conditions that indicate underlying problems."
         ),
         tools=[
-            ExecuteDQLTool(),
-            GenerateDQLTool(),
-            FindEntityByNameTool(),
-            ChatWithDavisCopilotTool()
+            ExecuteDQLTool(
+                environment=environment,
+                agent_role="Log Analyst",
+                max_window_hours=LOG_QUERY_WINDOW_HOURS
+            ),
+            BatchExecuteDQLTool(
+                environment=environment,
+                agent_role="Log Analyst",
+                max_window_hours=LOG_QUERY_WINDOW_HOURS
+            ),
+            QueryResultBufferTool(environment=environment),
+            MineLogTemplatesTool(
+                environment=environment,
+                agent_role="Log Analyst",
+                max_window_hours=LOG_QUERY_WINDOW_HOURS
+            ),
+            GenerateDQLTool(environment=environment),
+            FindEntityByNameTool(environment=environment),
+            ChatWithDavisCopilotTool(environment=environment),
+            ReadFullToolOutputTool(environment=environment)
         ],
-        llm=create_llm(temperature=0.4),
+        llm=create_llm(temperature=0.4, agent="log_analyst", cache=True, environment=environment),
         verbose=True,
         allow_delegation=False,
         max_iter=10
     )
 
 
-def create_insights_synthesizer_agent() -> Agent:
+def create_insights_synthesizer_agent(environment: str = "") -> Agent:
     """
     Insights Synthesizer Agent - Master agent that synthesizes all findings
     """
@@ -137,14 +180,14 @@ def create_insights_synthesizer_agent() -> Agent:
             "comprehensive reports that guide decision-making and problem resolution."
         ),
         tools=[],  # This agent synthesizes, doesn't need tools
-        llm=create_llm(temperature=0.6),
+        llm=create_llm(temperature=0.6, agent="insights_synthesizer", environment=environment),
         verbose=True,
         allow_delegation=False,
         max_iter=15
     )
 
 
-def create_onboarding_guide_agent() -> Agent:
+def create_onboarding_guide_agent(environment: str = "") -> Agent:
     """
     Onboarding Guide Agent - Helps new users understand Dynatrace capabilities
     """
@@ -163,7 +206,7 @@ def create_onboarding_guide_agent() -> Agent:
             "helps teams get immediate value from their observability platform."
         ),
         tools=[],
-        llm=create_llm(temperature=0.7),
+        llm=create_llm(temperature=0.7, agent="onboarding_guide", cache=True, environment=environment),
         verbose=True,
         allow_delegation=False,
         max_iter=10
@@ -4,23 +4,73 @@ Defines the workflow and responsibilities for each agent
 """
 
 from crewai import Task
-from typing import List
+from typing import List, Optional
 
 
-def create_problem_analysis_task(agent) -> Task:
+def _with_prefetched_data(description: str, label: str, tool_name: str, data: Optional[str]) -> str:
+    """Append data collected before kickoff so the agent does not need to fetch it"""
+    if not data:
+        return description
+    return (
+        f"{description}\n\n"
+        f"The {label} has already been retrieved for you below. Do not call the "
+        f"'{tool_name}' tool again; analyze this data directly.\n\n"
+        f"--- {label.upper()} ---\n{data}\n--- END {label.upper()} ---"
+    )
+
+
+def _with_prior_analysis(description: str, prior_analysis: Optional[str]) -> str:
+    """Append analyses carried over from the previous run for items that did not change"""
+    if not prior_analysis:
+        return description
+    return (
+        f"{description}\n\n"
+        f"The items below have not changed since the previous run. Their earlier analysis "
+        f"still applies; use it as-is alongside the new findings.\n\n"
+        f"--- PRIOR ANALYSIS OF UNCHANGED ITEMS ---\n{prior_analysis}\n--- END PRIOR ANALYSIS ---"
+    )
+
+
+def _with_unchanged_note(description: str, label: str, unchanged_count: int) -> str:
+    """Tell a delta-mode analyst why its listing is shorter than the full inventory"""
+    if not unchanged_count:
+        return description
+    return (
+        f"{description}\n\n"
+        f"Incremental run: {unchanged_count} {label} unchanged since the previous run were left "
+        f"out of the listing below and must not be analyzed again."
+    )
+
+
+def create_problem_analysis_task(
+    agent,
+    problems_data: Optional[str] = None,
+    environment_info: Optional[str] = None,
+    unchanged_count: int = 0
+) -> Task:
     """Task for analyzing problems in Dynatrace"""
+    description = (
+        "Analyze all open problems in Dynatrace for the last 24 hours. "
+        "For each problem found:\n"
+        "1. Retrieve the problem details including severity, impact, and affected entities\n"
+        "2. Identify the root cause if available\n"
+        "3. Assess the business impact and urgency\n"
+        "4. List all affected services and infrastructure components\n"
+        "5. Note the timeline of the problem (when it started, duration)\n\n"
+        "Provide a structured summary of all problems, prioritized by severity and impact. "
+        "Start each problem's section with a heading containing its ID (e.g. '### P-12345'). "
+        "If no problems are found, clearly state that the system is healthy."
+    )
+    description = _with_unchanged_note(description, "problems", unchanged_count)
+    description = _with_prefetched_data(
+        description, "problem listing", "List Dynatrace Problems", problems_data
+    )
+    description = _with_prefetched_data(
+        description, "environment info", "Get Dynatrace Environment Info", environment_info
+    )
+    
     return Task(
-        description=(
-            "Analyze all open problems in Dynatrace for the last 24 hours. "
-            "For each problem found:\n"
-            "1. Retrieve the problem details including severity, impact, and affected entities\n"
-            "2. Identify the root cause if available\n"
-            "3. Assess the business impact and urgency\n"
-            "4. List all affected services and infrastructure components\n"
-            "5. Note the timeline of the problem (when it started, duration)\n\n"
-            "Provide a structured summary of all problems, prioritized by severity and impact. "
-            "If no problems are found, clearly state that the system is healthy."
-        ),
+        description=description,
         expected_output=(
             "A detailed report containing:\n"
             "- Total number of open problems\n"
@@ -32,20 +82,31 @@ def create_problem_analysis_task(agent) -> Task:
     )
 
 
-def create_security_analysis_task(agent) -> Task:
+def create_security_analysis_task(
+    agent,
+    vulnerabilities_data: Optional[str] = None,
+    unchanged_count: int = 0
+) -> Task:
     """Task for analyzing security vulnerabilities"""
+    description = (
+        "Analyze security problems and vulnerabilities in Dynatrace for the last 7 days. "
+        "For each security issue found:\n"
+        "1. Identify the vulnerability (CVE ID if available)\n"
+        "2. Assess the risk level and severity\n"
+        "3. Identify affected components, libraries, or services\n"
+        "4. Determine the exposure level (how many entities are affected)\n"
+        "5. Check the status (open, resolved, muted)\n\n"
+        "Provide a structured summary of all security issues, prioritized by risk level. "
+        "Start each vulnerability's section with a heading containing its ID (e.g. '### S-1234'). "
+        "If no vulnerabilities are found, clearly state that no security issues were detected."
+    )
+    description = _with_unchanged_note(description, "vulnerabilities", unchanged_count)
+    description = _with_prefetched_data(
+        description, "vulnerability listing", "List Dynatrace Vulnerabilities", vulnerabilities_data
+    )
+    
     return Task(
-        description=(
-            "Analyze security problems and vulnerabilities in Dynatrace for the last 7 days. "
-            "For each security issue found:\n"
-            "1. Identify the vulnerability (CVE ID if available)\n"
-            "2. Assess the risk level and severity\n"
-            "3. Identify affected components, libraries, or services\n"
-            "4. Determine the exposure level (how many entities are affected)\n"
-            "5. Check the status (open, resolved, muted)\n\n"
-            "Provide a structured summary of all security issues, prioritized by risk level. "
-            "If no vulnerabilities are found, clearly state that no security issues were detected."
-        ),
+        description=description,
         expected_output=(
             "A comprehensive security report containing:\n"
             "- Total number of security problems\n"
@@ -58,10 +119,10 @@ def create_security_analysis_task(agent) -> Task:
     )
 
 
-def create_log_analysis_task(agent, context: List[Task]) -> Task:
+def create_log_analysis_task(agent, context: List[Task], prior_analysis: Optional[str] = None) -> Task:
     """Task for analyzing logs related to problems and vulnerabilities"""
     return Task(
-        description=(
+        description=_with_prior_analysis((
             "Based on the problems and security issues identified by other agents, "
             "analyze relevant logs to provide additional context and insights. "
             "Your analysis should:\n"
@@ -71,9 +132,14 @@ def create_log_analysis_task(agent, context: List[Task]) -> Task:
             "3. Identify error patterns, stack traces, or anomalies in the logs\n"
             "4. Correlate log entries with the problems and vulnerabilities found\n"
             "5. Extract key error messages and their frequency\n\n"
+            "Use the 'Mine Log Templates' tool to get error patterns and their frequency instead of "
+            "reading raw log lines; fetch raw entries only for the templates worth quoting.\n"
+            "To query logs for several problems or entities, use the 'Execute DQL Query Batch' tool "
+            "once (a list of statements, or one template with an entity_id placeholder plus the entity IDs) "
+            "instead of one 'Execute DQL Query' call per entity.\n"
             "Use DQL queries to fetch logs efficiently. Focus on ERROR and WARN level logs. "
             "If specific entities are mentioned in the context, prioritize logs from those entities."
-        ),
+        ), prior_analysis),
         expected_output=(
             "A log analysis report containing:\n"
             "- Summary of error patterns found in logs\n"
@@ -87,10 +153,10 @@ def create_log_analysis_task(agent, context: List[Task]) -> Task:
     )
 
 
-def create_synthesis_task(agent, context: List[Task]) -> Task:
+def create_synthesis_task(agent, context: List[Task], prior_analysis: Optional[str] = None) -> Task:
     """Task for synthesizing all findings into actionable insights"""
     return Task(
-        description=(
+        description=_with_prior_analysis((
             "Synthesize all findings from the Problem Analyst, Security Analyst, and Log Analyst "
             "into a comprehensive, actionable report for application owners. Your report should:\n\n"
             "1. **Executive Summary**: Provide a high-level overview of the current state\n"
@@ -106,7 +172,7 @@ def create_synthesis_task(agent, context: List[Task]) -> Task:
             "5. **Actionable Recommendations**: Provide specific, prioritized steps to resolve issues\n\n"
             "Present the information in a clear, structured format that non-technical stakeholders "
             "can understand and act upon. Use bullet points, clear headings, and prioritization."
-        ),
+        ), prior_analysis),
         expected_output=(
             "A comprehensive observability report with:\n"
             "- Executive summary of system health\n"
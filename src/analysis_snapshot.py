@@ -0,0 +1,225 @@
+"""
+Analysis Snapshot - State carried between runs for incremental (delta) analysis
+Stores the problem and vulnerability IDs seen by the last run with a hash of
+their status-relevant fields and the per-item analysis the agents produced, so
+the next run only sends new or changed items through the analyst agents
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional, Dict, Any, List
+
+from .tools.result_buffer import iter_record_pages
+
+
+DEFAULT_PATH = ".cache/analysis_snapshot.json"
+
+# Kinds of items tracked, keyed by the prefetch tool that lists them
+ITEM_KINDS = {
+    "problems": "list_problems",
+    "vulnerabilities": "list_vulnerabilities",
+}
+
+ID_FIELDS = {
+    "problems": ["display_id", "displayId", "event.id", "problemId", "problem_id", "id"],
+    "vulnerabilities": [
+        "vulnerability.display_id", "displayId", "display_id",
+        "vulnerability.id", "vulnerabilityId", "id"
+    ],
+}
+
+# Fields whose change means an item must be analyzed again; anything else
+# (durations, "last seen" timestamps, counters) is ignored when present
+STATUS_FIELDS = {
+    "problems": [
+        "event.status", "status", "event.name", "title", "event.category", "severityLevel",
+        "impactLevel", "affected_entity_ids", "affectedEntities", "root_cause_entity_id",
+        "rootCauseEntity", "event.end", "endTime"
+    ],
+    "vulnerabilities": [
+        "vulnerability.resolution.status", "status", "vulnerability.risk.level", "riskLevel",
+        "vulnerability.risk.score", "riskScore", "vulnerability.mute.status", "muted",
+        "affected_entity.ids", "affectedEntities", "vulnerability.title", "title"
+    ],
+}
+
+ID_PATTERNS = {
+    "problems": re.compile(r"\bP-\d+\b"),
+    "vulnerabilities": re.compile(r"\bS-\d+\b"),
+}
+
+# How the MCP server words a listing with nothing in it
+EMPTY_LISTING = re.compile(
+    r"\b(?:no|0)\s+(?:open\s+|active\s+)?(?:problems|vulnerabilities|records|results)\b", re.IGNORECASE
+)
+EMPTY_RECORDS = re.compile(r"\[\s*\]")
+
+# Relative times in text listings change every run without the item changing
+VOLATILE_TEXT = re.compile(
+    r"\b\d+(?:\.\d+)?\s*(?:s|sec|seconds?|m|min|minutes?|h|hours?|d|days?)\b(?:\s+ago)?", re.IGNORECASE
+)
+
+
+def _hash(value: Any) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def extract_items(text: str, kind: str) -> "OrderedDict[str, Dict[str, Any]]":
+    """
+    Split a list_problems / list_vulnerabilities response into items.
+
+    Returns {item_id: {"data": record or text block, "hash": status hash}} in
+    listing order. JSON records are hashed on their STATUS_FIELDS; text listings
+    are split at each new ID and hashed with relative times removed.
+    """
+    items: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    for page in iter_record_pages(text):
+        for record in page:
+            item_id = next((str(record[f]) for f in ID_FIELDS[kind] if record.get(f)), None)
+            if item_id is None:
+                continue
+            status = {f: record[f] for f in STATUS_FIELDS[kind] if f in record}
+            items[item_id] = {"data": record, "hash": _hash(status or record)}
+    if items:
+        return items
+
+    current_id, block = None, []
+    for line in text.splitlines():
+        match = ID_PATTERNS[kind].search(line)
+        if match and match.group(0) != current_id and match.group(0) not in items:
+            if current_id:
+                items[current_id] = {"data": "\n".join(block)}
+            current_id, block = match.group(0), []
+        if current_id:
+            block.append(line)
+    if current_id:
+        items[current_id] = {"data": "\n".join(block)}
+    for item in items.values():
+        item["hash"] = _hash(VOLATILE_TEXT.sub("", " ".join(item["data"].split())))
+    return items
+
+
+def listing_is_empty(text: str) -> bool:
+    """
+    True when a listing says there is nothing to list. extract_items returning
+    nothing for any other listing means its format was not understood.
+    """
+    if not text.strip():
+        return True
+    if any(True for _ in iter_record_pages(text)):
+        return False
+    return bool(EMPTY_LISTING.search(text) or EMPTY_RECORDS.search(text))
+
+
+def render_items(items: Dict[str, Dict[str, Any]]) -> str:
+    """Listing text for a subset of extracted items"""
+    data = [item["data"] for item in items.values()]
+    if all(isinstance(d, dict) for d in data):
+        return json.dumps(data, indent=1, default=str)
+    return "\n\n".join(str(d) for d in data)
+
+
+def split_analysis(output: str, item_ids: List[str]) -> Dict[str, str]:
+    """
+    Cut an analyst's report into per-item sections.
+
+    A section starts at the first line mentioning an item's ID (the tasks ask for
+    one heading per item) and runs until the next item's section.
+    """
+    lines = output.splitlines()
+    starts = []
+    for item_id in item_ids:
+        pattern = re.compile(rf"(?<![\w-]){re.escape(item_id)}(?![\w-])")
+        index = next((i for i, line in enumerate(lines) if pattern.search(line)), None)
+        if index is not None:
+            starts.append((index, item_id))
+    starts.sort()
+
+    sections = {}
+    for position, (index, item_id) in enumerate(starts):
+        end = starts[position + 1][0] if position + 1 < len(starts) else len(lines)
+        if end > index:
+            sections[item_id] = "\n".join(lines[index:end]).strip()
+    return sections
+
+
+def compute_delta(previous: Dict[str, Dict[str, Any]], current: Dict[str, Dict[str, Any]]) -> Dict[str, List[str]]:
+    """
+    Classify current items against the previous snapshot. Items whose previous
+    analysis could not be recovered count as changed so they are analyzed again.
+    """
+    delta: Dict[str, List[str]] = {"new": [], "changed": [], "unchanged": [], "resolved": []}
+    for item_id, item in current.items():
+        before = previous.get(item_id)
+        if before is None:
+            delta["new"].append(item_id)
+        elif before.get("hash") != item["hash"] or not before.get("analysis"):
+            delta["changed"].append(item_id)
+        else:
+            delta["unchanged"].append(item_id)
+    delta["resolved"] = [item_id for item_id in previous if item_id not in current]
+    return delta
+
+
+class AnalysisSnapshotStore:
+    """JSON file holding the last run's items, hashes, analyses and final report"""
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                return None
+
+    def save(self, snapshot: Dict[str, Any]) -> None:
+        """Write atomically so an interrupted run never leaves a torn snapshot"""
+        with self._lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, indent=1)
+            os.replace(temp_path, self.path)
+
+
+def build_snapshot(
+    items: Dict[str, Dict[str, Dict[str, Any]]],
+    analyses: Dict[str, Dict[str, str]],
+    final_report: str
+) -> Dict[str, Any]:
+    """Snapshot of the current items with the analysis recorded for each"""
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "final_report": final_report,
+        "items": {
+            kind: {
+                item_id: {"hash": item["hash"], "analysis": analyses.get(kind, {}).get(item_id)}
+                for item_id, item in kind_items.items()
+            }
+            for kind, kind_items in items.items()
+        }
+    }
+
+
+def delta_enabled() -> bool:
+    return os.getenv("DT_DELTA_ANALYSIS_ENABLED", "false").lower() in ("1", "true", "yes")
+
+
+def get_snapshot_store(environment: str = "") -> AnalysisSnapshotStore:
+    """Snapshot store for an environment; named fleet environments get their own file"""
+    path = os.getenv("DT_DELTA_SNAPSHOT_PATH", DEFAULT_PATH)
+    if environment:
+        root, extension = os.path.splitext(path)
+        safe_name = re.sub(r"[^\w.-]", "_", environment)
+        path = f"{root}.{safe_name}{extension}"
+    return AnalysisSnapshotStore(path)
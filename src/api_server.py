@@ -0,0 +1,486 @@
+"""
+Analysis API - Local asyncio HTTP server for on-demand analyses
+Incident tooling submits an analysis, polls its status, streams its progress as
+Server-Sent Events and fetches the report. Jobs wait in a bounded queue, a fixed
+number of workers run DynatraceObservabilityCrew in threads, and a request that
+matches a queued or running job attaches to it instead of starting another run
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Tuple
+from urllib.parse import urlsplit, parse_qs
+
+from rich.console import Console
+
+from .analysis_snapshot import delta_enabled
+from .crew_orchestrator import DynatraceObservabilityCrew
+from .tools.environments import DEFAULT_ENVIRONMENTS_FILE, get_environment, load_environments
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+DEFAULT_WORKERS = 1
+DEFAULT_QUEUE_SIZE = 16
+DEFAULT_JOB_HISTORY = 100
+MAX_BODY_BYTES = 64 * 1024
+
+ACTIVE_STATES = ("queued", "running")
+
+REASONS = {
+    200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    409: "Conflict", 413: "Payload Too Large", 429: "Too Many Requests", 500: "Internal Server Error"
+}
+
+
+def _int_from_env(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+class QueueFullError(Exception):
+    """The job queue is at capacity; the client should retry later"""
+
+
+class AnalysisJob:
+    """One submitted analysis with its progress events and outcome"""
+
+    def __init__(self, key: str, environment: str, incremental: Optional[bool]):
+        self.id = uuid.uuid4().hex[:12]
+        self.key = key
+        self.environment = environment
+        self.incremental = incremental
+        self.status = "queued"
+        self.created = datetime.now()
+        self.started: Optional[datetime] = None
+        self.finished: Optional[datetime] = None
+        self.attached = 0  # Duplicate submissions that joined this job
+        self.events: List[Dict[str, Any]] = []
+        self.results: Optional[Dict[str, Any]] = None
+        self.report: Optional[str] = None
+        self.report_path: Optional[str] = None
+        self.error: Optional[str] = None
+        self._changed = asyncio.Event()
+
+    def add_event(self, stage: str, details: Optional[Dict[str, Any]] = None) -> None:
+        """Record a progress event (must run on the server's event loop)"""
+        self.events.append({
+            "seq": len(self.events),
+            "time": datetime.now().isoformat(),
+            "stage": stage,
+            "details": details or {}
+        })
+        # Wake every streamer, then re-arm for the next event
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def wait_for_event(self, seq: int) -> None:
+        """Return once an event with sequence number >= seq exists"""
+        while len(self.events) <= seq:
+            await self._changed.wait()
+
+    @property
+    def done(self) -> bool:
+        return self.status not in ACTIVE_STATES
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "environment": self.environment,
+            "incremental": self.incremental,
+            "created": self.created.isoformat(),
+            "started": self.started.isoformat() if self.started else None,
+            "finished": self.finished.isoformat() if self.finished else None,
+            "attached_requests": self.attached,
+            "stage": self.events[-1]["stage"] if self.events else None,
+            "events": len(self.events),
+            "report_path": self.report_path,
+            "error": self.error,
+            "duration_seconds": (self.results or {}).get("duration_seconds")
+        }
+
+
+class JobManager:
+    """
+    Bounded FIFO of analysis jobs drained by `workers` concurrent workers.
+
+    Submissions are deduplicated on (environment, incremental): while a matching
+    job is queued or running, a new request returns that job. Jobs of one
+    environment never run concurrently, since runs share the environment's
+    deadline, breaker, Grail budget and snapshot. Finished jobs are kept (newest
+    `history` of them) so clients can still fetch their reports.
+    """
+
+    def __init__(
+        self,
+        workers: int = DEFAULT_WORKERS,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        report_dir: str = "reports",
+        history: int = DEFAULT_JOB_HISTORY
+    ):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.report_dir = report_dir
+        self.history = history
+        self.jobs: "OrderedDict[str, AnalysisJob]" = OrderedDict()
+        self.active: Dict[str, AnalysisJob] = {}
+        self.stats = {"submitted": 0, "deduplicated": 0, "rejected": 0, "completed": 0, "failed": 0}
+        self._queue: Optional[asyncio.Queue] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._tasks: List[asyncio.Task] = []
+        self._environment_locks: Dict[str, asyncio.Lock] = {}
+        self._running = 0
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="analysis")
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def request_key(environment: str, incremental: Optional[bool]) -> str:
+        return json.dumps({"environment": environment, "incremental": incremental}, sort_keys=True)
+
+    def submit(self, environment: str = "", incremental: Optional[bool] = None) -> Tuple[AnalysisJob, bool]:
+        """Queue an analysis; returns (job, deduplicated). Raises QueueFullError when full."""
+        # Resolve the default now so "null" and its explicit value share one job
+        incremental = delta_enabled() if incremental is None else bool(incremental)
+        key = self.request_key(environment, incremental)
+        existing = self.active.get(key)
+        if existing is not None:
+            existing.attached += 1
+            self.stats["deduplicated"] += 1
+            return existing, True
+
+        job = AnalysisJob(key, environment, incremental)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.stats["rejected"] += 1
+            raise QueueFullError(f"Job queue is full ({self.queue_size} waiting)")
+
+        self.stats["submitted"] += 1
+        self.active[key] = job
+        self.jobs[job.id] = job
+        job.add_event("queued", {"position": self._queue.qsize()})
+        self._prune()
+        return job, False
+
+    def get(self, job_id: str) -> Optional[AnalysisJob]:
+        return self.jobs.get(job_id)
+
+    def _prune(self) -> None:
+        finished = [job_id for job_id, job in self.jobs.items() if job.done]
+        for job_id in finished[:max(0, len(finished) - self.history)]:
+            del self.jobs[job_id]
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            "status": "ok",
+            "workers": self.workers,
+            "running": self._running,
+            "queued": sum(job.status == "queued" for job in self.active.values()),
+            "queue_size": self.queue_size,
+            "jobs": len(self.jobs),
+            "stats": dict(self.stats)
+        }
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            lock = self._environment_locks.setdefault(job.environment, asyncio.Lock())
+            try:
+                # A job stays queued while another run of its environment is in progress
+                async with lock:
+                    self._running += 1
+                    try:
+                        await self._run_job(job)
+                    finally:
+                        self._running -= 1
+            finally:
+                self.active.pop(job.key, None)
+                self._queue.task_done()
+
+    async def _run_job(self, job: AnalysisJob) -> None:
+        loop = asyncio.get_running_loop()
+        job.status = "running"
+        job.started = datetime.now()
+
+        def on_progress(stage: str, details: Dict[str, Any]) -> None:
+            loop.call_soon_threadsafe(job.add_event, stage, details)
+
+        def run() -> Tuple[Dict[str, Any], str, str]:
+            crew_system = DynatraceObservabilityCrew(
+                verbose=False,
+                incremental=job.incremental,
+                environment=job.environment,
+                progress_callback=on_progress
+            )
+            results = crew_system.run_analysis()
+            timestamp = results.get("timestamp", "").replace(":", "-").split(".")[0]
+            report_dir = self.report_dir
+            if job.environment:
+                report_dir = os.path.join(report_dir, re.sub(r"[^\w.-]", "_", job.environment))
+            os.makedirs(report_dir, exist_ok=True)
+            report_path = os.path.join(report_dir, f"observability_report_{timestamp}.md")
+            crew_system.save_report(report_path)
+            with open(report_path, "r", encoding="utf-8") as f:
+                return results, f.read(), report_path
+
+        try:
+            job.results, job.report, job.report_path = await loop.run_in_executor(self._executor, run)
+            job.status = "succeeded"
+            self.stats["completed"] += 1
+        except Exception as e:
+            logger.exception("Analysis job %s failed", job.id)
+            job.status = "failed"
+            job.error = str(e)
+            self.stats["failed"] += 1
+        job.finished = datetime.now()
+        job.add_event("finished", {"status": job.status, "error": job.error, "report_path": job.report_path})
+
+
+class AnalysisAPIServer:
+    """
+    Minimal HTTP/1.1 server on asyncio streams (one request per connection).
+
+    Endpoints:
+        POST /analyses                 submit {"environment": "", "incremental": null}
+        GET  /analyses                 list known jobs
+        GET  /analyses/{id}            job status
+        GET  /analyses/{id}/events     progress as Server-Sent Events until the job ends
+        GET  /analyses/{id}/report     markdown report (?format=json for the full results)
+        GET  /health                   queue depth, worker usage and counters
+    """
+
+    def __init__(self, manager: JobManager, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        self.manager = manager
+        self.host = host
+        self.port = port
+        self.console = Console()
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        await self.manager.start()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await self.manager.stop()
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        self.console.print(
+            f"[bold cyan]Analysis API listening on http://{self.host}:{self.port}[/bold cyan] "
+            f"[dim]({self.manager.workers} worker(s), queue {self.manager.queue_size})[/dim]"
+        )
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Tuple[str, str, Dict[str, str], bytes]:
+        request_line = (await reader.readline()).decode("latin-1").strip()
+        method, target, _version = request_line.split(" ", 2)
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length", "0") or 0)
+        if length > MAX_BODY_BYTES:
+            raise ValueError("body too large")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target, headers, body
+
+    async def _send(
+        self,
+        writer: asyncio.StreamWriter,
+        status: int,
+        payload: Any,
+        content_type: str = "application/json",
+        extra_headers: Optional[Dict[str, str]] = None
+    ) -> None:
+        body = payload.encode("utf-8") if isinstance(payload, str) else json.dumps(payload, indent=1).encode("utf-8")
+        headers = {
+            "Content-Type": f"{content_type}; charset=utf-8",
+            "Content-Length": str(len(body)),
+            "Connection": "close",
+            **(extra_headers or {})
+        }
+        head = f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n" + "".join(
+            f"{name}: {value}\r\n" for name, value in headers.items()
+        )
+        writer.write(head.encode("latin-1") + b"\r\n" + body)
+        await writer.drain()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            try:
+                method, target, headers, body = await self._read_request(reader)
+            except ValueError as e:
+                status = 413 if "too large" in str(e) else 400
+                await self._send(writer, status, {"error": f"Malformed request: {e}"})
+                return
+            await self._route(method, target, headers, body, writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as e:
+            logger.exception("API request failed")
+            try:
+                await self._send(writer, 500, {"error": str(e)})
+            except ConnectionError:
+                pass
+        finally:
+            writer.close()
+
+    async def _route(
+        self, method: str, target: str, headers: Dict[str, str], body: bytes, writer: asyncio.StreamWriter
+    ) -> None:
+        url = urlsplit(target)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        parts = [part for part in url.path.split("/") if part]
+
+        if parts == ["health"] and method == "GET":
+            await self._send(writer, 200, self.manager.health())
+            return
+
+        if parts == ["analyses"]:
+            if method == "POST":
+                await self._submit(body, writer)
+            elif method == "GET":
+                await self._send(writer, 200, {"jobs": [job.to_dict() for job in self.manager.jobs.values()]})
+            else:
+                await self._send(writer, 405, {"error": f"{method} not allowed"})
+            return
+
+        if len(parts) in (2, 3) and parts[0] == "analyses":
+            job = self.manager.get(parts[1])
+            if job is None:
+                await self._send(writer, 404, {"error": f"Unknown job '{parts[1]}'"})
+            elif method != "GET":
+                await self._send(writer, 405, {"error": f"{method} not allowed"})
+            elif len(parts) == 2:
+                await self._send(writer, 200, job.to_dict())
+            elif parts[2] == "events":
+                last_seen = headers.get("last-event-id", "")
+                await self._stream_events(job, writer, int(last_seen) + 1 if last_seen.isdigit() else 0)
+            elif parts[2] == "report":
+                await self._send_report(job, query.get("format", "markdown"), writer)
+            else:
+                await self._send(writer, 404, {"error": f"Unknown resource '{parts[2]}'"})
+            return
+
+        await self._send(writer, 404, {"error": f"No route for {method} {url.path}"})
+
+    async def _submit(self, body: bytes, writer: asyncio.StreamWriter) -> None:
+        try:
+            params = json.loads(body or b"{}")
+            if not isinstance(params, dict):
+                raise ValueError("body must be a JSON object")
+            environment = str(params.get("environment") or "")
+            incremental = params.get("incremental")
+            if incremental is not None and not isinstance(incremental, bool):
+                raise ValueError("'incremental' must be true, false or null")
+            get_environment(environment)
+        except (ValueError, KeyError) as e:
+            await self._send(writer, 400, {"error": str(e.args[0]) if e.args else str(e)})
+            return
+
+        try:
+            job, deduplicated = self.manager.submit(environment, incremental)
+        except QueueFullError as e:
+            await self._send(writer, 429, {"error": str(e)}, extra_headers={"Retry-After": "30"})
+            return
+
+        await self._send(
+            writer, 200 if deduplicated else 202,
+            {**job.to_dict(), "deduplicated": deduplicated},
+            extra_headers={"Location": f"/analyses/{job.id}"}
+        )
+
+    async def _stream_events(self, job: AnalysisJob, writer: asyncio.StreamWriter, seq: int) -> None:
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/event-stream\r\n"
+            b"Cache-Control: no-cache\r\n"
+            b"Connection: close\r\n\r\n"
+        )
+        await writer.drain()
+        while True:
+            while seq < len(job.events):
+                event = job.events[seq]
+                writer.write(
+                    f"id: {event['seq']}\nevent: {event['stage']}\ndata: {json.dumps(event)}\n\n".encode("utf-8")
+                )
+                seq += 1
+            await writer.drain()
+            if job.done and seq >= len(job.events):
+                return
+            try:
+                await asyncio.wait_for(job.wait_for_event(seq), timeout=15)
+            except asyncio.TimeoutError:
+                writer.write(b": keep-alive\n\n")
+
+    async def _send_report(self, job: AnalysisJob, fmt: str, writer: asyncio.StreamWriter) -> None:
+        if not job.done:
+            await self._send(writer, 409, {"error": f"Job is {job.status}", "status": job.status})
+        elif job.status == "failed":
+            await self._send(writer, 409, {"error": job.error, "status": job.status})
+        elif fmt == "json":
+            await self._send(writer, 200, job.results)
+        else:
+            await self._send(writer, 200, job.report or "", content_type="text/markdown")
+
+
+def serve(
+    host: Optional[str] = None,
+    port: Optional[int] = None,
+    workers: Optional[int] = None,
+    queue_size: Optional[int] = None,
+    report_dir: str = "reports"
+) -> None:
+    """Run the API until interrupted (DT_API_HOST / DT_API_PORT / DT_API_WORKERS / DT_API_QUEUE_SIZE)"""
+    # Named environments in the fleet file can be requested by name
+    environments_file = os.getenv("DT_ENVIRONMENTS_FILE", DEFAULT_ENVIRONMENTS_FILE)
+    if os.path.exists(environments_file):
+        load_environments(environments_file)
+
+    manager = JobManager(
+        workers=workers or _int_from_env("DT_API_WORKERS", DEFAULT_WORKERS),
+        queue_size=queue_size or _int_from_env("DT_API_QUEUE_SIZE", DEFAULT_QUEUE_SIZE),
+        report_dir=report_dir,
+        history=_int_from_env("DT_API_JOB_HISTORY", DEFAULT_JOB_HISTORY)
+    )
+    server = AnalysisAPIServer(
+        manager,
+        host=host or os.getenv("DT_API_HOST", DEFAULT_HOST),
+        port=port or _int_from_env("DT_API_PORT", DEFAULT_PORT)
+    )
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
@@ -3,9 +3,12 @@ Crew Orchestrator - Main orchestration system for the multi-agent workflow
 Coordinates specialist agents to analyze Dynatrace observability data
 """
 
-from crewai import Crew, Process
-from typing import Dict, Any
+from crewai import Crew, Process, Task
+from typing import Dict, Any, List, Optional, Callable
 import json
+import logging
+import os
+import threading
 from datetime import datetime
 from rich.console import Console
 from rich.panel import Panel
@@ -18,6 +21,34 @@ from .agents.specialist_agents import (
     create_insights_synthesizer_agent,
     create_onboarding_guide_agent
 )
+from .agents.llm_cache import get_llm_cache, llm_cache_delta, cache_sampled_from_env
+from .agents.model_router import get_routing_stats, routing_delta
+from .tools.mcp_cache import get_tool_cache, stats_delta
+from .tools.single_flight import coalescing_delta
+from .tools.grail_budget import get_budget_meter
+from .tools.output_compactor import get_output_compactor, compaction_enabled, compaction_delta
+from .tools.rate_limiter import limiter_stats, limiter_delta
+from .tools.deadline import Deadline, DeadlineExceeded, get_deadline, run_budget_from_env, set_deadline
+from .tools.circuit_breaker import CircuitBreaker, MCPUnavailableError, breaker_delta
+from .tools.request_hedger import hedge_delta
+from .tools.dynatrace_mcp_tools import (
+    get_single_flight,
+    get_circuit_breaker,
+    get_request_hedger,
+    prefetch_tool_results,
+    run_async
+)
+from .analysis_snapshot import (
+    ITEM_KINDS,
+    extract_items,
+    listing_is_empty,
+    render_items,
+    split_analysis,
+    compute_delta,
+    build_snapshot,
+    delta_enabled,
+    get_snapshot_store
+)
 from .agents.tasks import (
     create_problem_analysis_task,
     create_security_analysis_task,
@@ -26,20 +57,310 @@ from .agents.tasks import (
     create_onboarding_guide_task
 )
 
+logger = logging.getLogger(__name__)
+
+
+def build_task_waves(tasks: List[Task]) -> List[List[Task]]:
+    """
+    Group tasks into dependency waves using their `context=[...]` wiring.
+
+    Every task in a wave depends only on tasks from earlier waves, so all tasks
+    within one wave can run in parallel. Original ordering is kept inside a wave.
+    """
+    depth: Dict[int, int] = {}
+    known = {id(task) for task in tasks}
+    remaining = list(tasks)
+
+    while remaining:
+        progressed = False
+        for task in list(remaining):
+            context = task.context if isinstance(task.context, list) else []
+            deps = [dep for dep in context if id(dep) in known]
+            if all(id(dep) in depth for dep in deps):
+                depth[id(task)] = 1 + max((depth[id(dep)] for dep in deps), default=-1)
+                remaining.remove(task)
+                progressed = True
+        if not progressed:
+            raise ValueError("Task context wiring contains a cycle")
+
+    waves: List[List[Task]] = [[] for _ in range(max(depth.values(), default=-1) + 1)]
+    for task in tasks:
+        waves[depth[id(task)]].append(task)
+    return waves
+
+
+def schedule_parallel_tasks(waves: List[List[Task]]) -> List[Task]:
+    """
+    Flatten dependency waves into a task list for CrewAI's sequential process,
+    marking independent tasks with `async_execution` so they run concurrently.
+
+    CrewAI runs consecutive async tasks in parallel and makes the next synchronous
+    task wait for all of them, so a synchronous task acts as the barrier between
+    waves. The crew must also end with a synchronous task.
+    """
+    ordered: List[Task] = []
+    pending_async = False
+
+    for index, wave in enumerate(waves):
+        is_last_wave = index == len(waves) - 1
+        for position, task in enumerate(wave):
+            barrier = pending_async and position == 0
+            final = is_last_wave and position == len(wave) - 1
+            task.async_execution = len(wave) > 1 and not barrier and not final
+            ordered.append(task)
+        pending_async = any(task.async_execution for task in wave)
+
+    return ordered
+
+
+# Extra seconds after the deadline for calls it cut off to unwind before a partial report
+KICKOFF_GRACE_SECONDS = 5.0
+
 
 class DynatraceObservabilityCrew:
     """
     Multi-agent system for comprehensive Dynatrace observability analysis
     """
     
-    def __init__(self, verbose: bool = True):
+    def __init__(
+        self,
+        verbose: bool = True,
+        incremental: Optional[bool] = None,
+        environment: str = "",
+        progress_callback: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+        time_budget: Optional[float] = None
+    ):
         self.console = Console()
         self.verbose = verbose
+        self.environment = environment  # Named fleet environment; "" = DT_ENVIRONMENT
+        self.progress_callback = progress_callback  # Called with (stage, details) as the run advances
+        self.time_budget = run_budget_from_env() if time_budget is None else (time_budget or None)
+        self.incremental = delta_enabled() if incremental is None else incremental
+        self.snapshot_store = get_snapshot_store(environment)
         self.results = {}
+        self.execution_plan: List[List[str]] = []
+        self._analysis_tasks: Dict[str, Task] = {}
+        self._completed_outputs: List[Dict[str, str]] = []
+        self._kickoff_abandoned = False
+        
+    def _progress(self, stage: str, **details: Any) -> None:
+        """Report a run milestone to the progress callback; callback errors never fail the run"""
+        if self.progress_callback is None:
+            return
+        try:
+            self.progress_callback(stage, details)
+        except Exception as e:
+            self.console.print(f"[dim]Progress callback failed: {e}[/dim]")
+    
+    def _on_task_complete(self, output) -> None:
+        agent = str(getattr(output, "agent", ""))
+        task = output.name or (output.description or "")[:80]
+        self._completed_outputs.append({"agent": agent, "task": task, "output": output.raw or ""})
+        self._progress("task_completed", agent=agent, task=task)
+    
+    def _kickoff(self, crew: Crew, deadline: Deadline) -> Optional[Any]:
+        """
+        Run the crew, giving up when the run deadline passes or the run is aborted.
         
-    def create_crew(self) -> Crew:
+        Returns the crew result, or None if the deadline ended the run first. The
+        abandoned kickoff thread winds down on its own: its LLM and tool calls
+        are bounded by the same (now expired) deadline and fail fast, and the
+        thread itself unregisters that deadline once it exits.
+        """
+        if deadline.expired:
+            return None
+        
+        outcome: Dict[str, Any] = {}
+        handoff = threading.Lock()
+        
+        def run():
+            try:
+                outcome["result"] = crew.kickoff()
+            except BaseException as e:
+                outcome["error"] = e
+            finally:
+                with handoff:
+                    outcome["finished"] = True
+                    abandoned = outcome.get("abandoned", False)
+                if abandoned:
+                    self._clear_deadline(deadline)
+        
+        worker = threading.Thread(target=run, name="crew-kickoff", daemon=True)
+        worker.start()
+        while worker.is_alive() and not deadline.expired:
+            # Wakes early when a tripped circuit breaker cancels the deadline
+            deadline.wait(min(deadline.remaining(), 1.0))
+        worker.join(KICKOFF_GRACE_SECONDS)
+        with handoff:
+            if not outcome.get("finished"):
+                # Tool calls of the still-running kickoff must keep seeing the
+                # expired deadline; the thread clears it when it exits
+                outcome["abandoned"] = self._kickoff_abandoned = True
+                return None
+        if "error" in outcome:
+            if deadline.expired or isinstance(outcome["error"], DeadlineExceeded):
+                return None
+            raise outcome["error"]
+        return outcome["result"]
+    
+    def _clear_deadline(self, deadline: Deadline) -> None:
+        """Unregister a run's deadline unless a newer run replaced it"""
+        if get_deadline(self.environment) is deadline:
+            set_deadline(self.environment, None)
+    
+    def _partial_report(self, crew: Crew, deadline: Deadline) -> str:
+        """Report assembled from the tasks that finished before the deadline or the abort"""
+        done_roles = [item["agent"] for item in self._completed_outputs]
+        pending = [task.agent.role for task in crew.tasks if task.agent.role not in done_roles]
+        sections = "\n\n".join(
+            f"## {item['agent']}\n\n{item['output']}" for item in self._completed_outputs
+        ) or "_No task finished before the deadline._"
+        if deadline.cancelled:
+            heading = "Run Aborted"
+            cause = f"The run was aborted ({deadline.reason})"
+        else:
+            heading = "Time Budget Reached"
+            cause = f"The {deadline.budget_seconds:.0f}s time budget ran out"
+        return (
+            f"# Partial Analysis - {heading}\n\n"
+            f"{cause} after "
+            f"{len(self._completed_outputs)} of {len(crew.tasks)} tasks completed. "
+            f"The findings below come from the completed tasks only.\n\n"
+            f"**Not completed:** {', '.join(pending) or 'none'}\n\n{sections}"
+        )
+    
+    def prefetch_data(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Deterministic data collection stage run before kickoff.
+        
+        The problem and security agents always start by listing problems and
+        vulnerabilities with the same arguments, so those calls (plus environment
+        info) are fired concurrently here and injected into the task descriptions,
+        removing several LLM round trips from the critical path.
+        """
+        self.console.print("\n[yellow]Pre-fetching Dynatrace data...[/yellow]")
+        
+        prefetched = prefetch_tool_results({
+            "list_problems": {},
+            "list_vulnerabilities": {},
+            "get_environment_info": {}
+        }, environment=self.environment)
+        
+        for tool_name, outcome in prefetched.items():
+            if outcome["ok"]:
+                self.console.print(f"  ✓ {tool_name} [dim]({outcome['seconds']:.2f}s)[/dim]")
+            else:
+                self.console.print(
+                    f"  [red]✗ {tool_name}[/red] [dim]({outcome['error']}) - agent will fetch it[/dim]"
+                )
+        
+        return prefetched
+    
+    def plan_delta(self, prefetched: Dict[str, Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Compare the pre-fetched problem and vulnerability listings with the last
+        run's snapshot. Returns None when a listing is missing or none of its
+        items could be extracted, in which case the run falls back to a full
+        analysis.
+        """
+        snapshot = self.snapshot_store.load() or {}
+        kinds = {}
+        for kind, tool_name in ITEM_KINDS.items():
+            outcome = prefetched.get(tool_name, {})
+            if not outcome.get("ok"):
+                return None
+            items = extract_items(outcome["text"], kind)
+            if not items and not listing_is_empty(outcome["text"]):
+                # An unrecognized listing format must not look like "nothing changed"
+                logger.warning(
+                    "No %s could be extracted from a non-empty %s response; running a full analysis",
+                    kind, tool_name
+                )
+                self.console.print(
+                    f"  [yellow]⚠ Could not extract {kind} from {tool_name} - running a full analysis[/yellow]"
+                )
+                return None
+            previous = snapshot.get("items", {}).get(kind, {})
+            kinds[kind] = {"items": items, "previous": previous, "delta": compute_delta(previous, items)}
+        
+        changed = any(
+            plan["delta"]["new"] or plan["delta"]["changed"] or plan["delta"]["resolved"]
+            for plan in kinds.values()
+        )
+        return {"snapshot": snapshot, "kinds": kinds, "changed": changed or not snapshot}
+    
+    def _inventory(self, prefetched: Dict[str, Dict[str, Any]]) -> Dict[str, Optional[int]]:
+        """Number of problems and vulnerabilities in the pre-fetched listings (None if not fetched)"""
+        inventory = {}
+        for kind, tool_name in ITEM_KINDS.items():
+            outcome = prefetched.get(tool_name, {})
+            inventory[kind] = len(extract_items(outcome["text"], kind)) if outcome.get("ok") else None
+        return inventory
+    
+    def _delta_summary(self, delta_plan: Dict[str, Any], reused_report: bool) -> Dict[str, Any]:
+        summary = {
+            kind: {category: len(ids) for category, ids in plan["delta"].items()}
+            for kind, plan in delta_plan["kinds"].items()
+        }
+        summary["baseline"] = delta_plan["snapshot"].get("timestamp")
+        summary["reused_report"] = reused_report
+        return summary
+    
+    def _save_snapshot(self, delta_plan: Dict[str, Any], final_report: str) -> None:
+        """Record per-item analyses: fresh ones from this run, carried-over ones for unchanged items"""
+        analyses = {}
+        for kind, plan in delta_plan["kinds"].items():
+            kind_analyses = {
+                item_id: plan["previous"][item_id]["analysis"] for item_id in plan["delta"]["unchanged"]
+            }
+            task = self._analysis_tasks.get(kind)
+            if task is not None and task.output is not None:
+                analyzed = plan["delta"]["new"] + plan["delta"]["changed"]
+                kind_analyses.update(split_analysis(task.output.raw, analyzed))
+            analyses[kind] = kind_analyses
+        
+        items = {kind: plan["items"] for kind, plan in delta_plan["kinds"].items()}
+        self.snapshot_store.save(build_snapshot(items, analyses, final_report))
+    
+    def create_crew(
+        self,
+        prefetched: Optional[Dict[str, Dict[str, Any]]] = None,
+        delta_plan: Optional[Dict[str, Any]] = None
+    ) -> Crew:
         """Create and configure the crew with agents and tasks"""
         
+        prefetched = prefetched or {}
+        kinds = delta_plan["kinds"] if delta_plan else {}
+        
+        def prefetched_text(tool_name: str) -> Optional[str]:
+            outcome = prefetched.get(tool_name, {})
+            if not outcome.get("ok"):
+                return None
+            text = outcome["text"]
+            
+            # Incremental runs only hand new or changed items to the analysts
+            kind = next((k for k, t in ITEM_KINDS.items() if t == tool_name and k in kinds), None)
+            if kind:
+                plan = kinds[kind]
+                analyze = plan["delta"]["new"] + plan["delta"]["changed"]
+                text = render_items({item_id: plan["items"][item_id] for item_id in analyze})
+            
+            if not compaction_enabled():
+                return text
+            return get_output_compactor().compact(tool_name, text, self.environment)
+        
+        def needs_analysis(kind: str) -> bool:
+            if kind not in kinds:
+                return True
+            delta = kinds[kind]["delta"]
+            return bool(delta["new"] or delta["changed"])
+        
+        prior_analysis = "\n\n".join(
+            plan["previous"][item_id]["analysis"]
+            for plan in kinds.values()
+            for item_id in plan["delta"]["unchanged"]
+        ) or None
+        
         self.console.print(Panel.fit(
             "[bold cyan]Initializing Dynatrace Observability Multi-Agent System[/bold cyan]",
             border_style="cyan"
@@ -48,36 +369,63 @@ class DynatraceObservabilityCrew:
         # Create specialist agents
         self.console.print("\n[yellow]Creating specialist agents...[/yellow]")
         
-        problem_analyst = create_problem_analyst_agent()
+        problem_analyst = create_problem_analyst_agent(self.environment)
         self.console.print("  ✓ Problem Analyst Agent created")
         
-        security_analyst = create_security_analyst_agent()
+        security_analyst = create_security_analyst_agent(self.environment)
         self.console.print("  ✓ Security Analyst Agent created")
         
-        log_analyst = create_log_analyst_agent()
+        log_analyst = create_log_analyst_agent(self.environment)
         self.console.print("  ✓ Log Analyst Agent created")
         
-        insights_synthesizer = create_insights_synthesizer_agent()
+        insights_synthesizer = create_insights_synthesizer_agent(self.environment)
         self.console.print("  ✓ Insights Synthesizer Agent created")
         
-        onboarding_guide = create_onboarding_guide_agent()
+        onboarding_guide = create_onboarding_guide_agent(self.environment)
         self.console.print("  ✓ Onboarding Guide Agent created")
         
         # Create tasks
         self.console.print("\n[yellow]Defining agent tasks...[/yellow]")
         
-        problem_task = create_problem_analysis_task(problem_analyst)
-        self.console.print("  ✓ Problem Analysis Task defined")
+        analysis_tasks: List[Task] = []
+        self._analysis_tasks = {}
+        
+        if needs_analysis("problems"):
+            problem_task = create_problem_analysis_task(
+                problem_analyst,
+                problems_data=prefetched_text("list_problems"),
+                environment_info=prefetched_text("get_environment_info"),
+                unchanged_count=len(kinds["problems"]["delta"]["unchanged"]) if kinds else 0
+            )
+            analysis_tasks.append(problem_task)
+            self._analysis_tasks["problems"] = problem_task
+            self.console.print("  ✓ Problem Analysis Task defined")
+        else:
+            self.console.print("  [dim]- Problem Analysis skipped (no new or changed problems)[/dim]")
         
-        security_task = create_security_analysis_task(security_analyst)
-        self.console.print("  ✓ Security Analysis Task defined")
+        if needs_analysis("vulnerabilities"):
+            security_task = create_security_analysis_task(
+                security_analyst,
+                vulnerabilities_data=prefetched_text("list_vulnerabilities"),
+                unchanged_count=len(kinds["vulnerabilities"]["delta"]["unchanged"]) if kinds else 0
+            )
+            analysis_tasks.append(security_task)
+            self._analysis_tasks["vulnerabilities"] = security_task
+            self.console.print("  ✓ Security Analysis Task defined")
+        else:
+            self.console.print("  [dim]- Security Analysis skipped (no new or changed vulnerabilities)[/dim]")
         
-        log_task = create_log_analysis_task(log_analyst, context=[problem_task, security_task])
+        log_task = create_log_analysis_task(
+            log_analyst,
+            context=list(analysis_tasks),
+            prior_analysis=prior_analysis
+        )
         self.console.print("  ✓ Log Analysis Task defined")
         
         synthesis_task = create_synthesis_task(
             insights_synthesizer, 
-            context=[problem_task, security_task, log_task]
+            context=analysis_tasks + [log_task],
+            prior_analysis=prior_analysis
         )
         self.console.print("  ✓ Synthesis Task defined")
         
@@ -87,7 +435,17 @@ class DynatraceObservabilityCrew:
         )
         self.console.print("  ✓ Onboarding Guide Task defined")
         
-        # Create crew with sequential process
+        # Run every task as soon as the tasks in its context have finished
+        waves = build_task_waves(analysis_tasks + [log_task, synthesis_task, onboarding_task])
+        tasks = schedule_parallel_tasks(waves)
+        self.execution_plan = [[task.agent.role for task in wave] for wave in waves]
+        
+        self.console.print("\n[yellow]Execution plan:[/yellow]")
+        for index, wave in enumerate(self.execution_plan, start=1):
+            mode = "parallel" if len(wave) > 1 else "sequential"
+            self.console.print(f"  {index}. {' + '.join(wave)} [dim]({mode})[/dim]")
+        
+        # Sequential process honours async_execution, giving us a DAG schedule
         crew = Crew(
             agents=[
                 problem_analyst,
@@ -96,17 +454,12 @@ class DynatraceObservabilityCrew:
                 insights_synthesizer,
                 onboarding_guide
             ],
-            tasks=[
-                problem_task,
-                security_task,
-                log_task,
-                synthesis_task,
-                onboarding_task
-            ],
+            tasks=tasks,
             process=Process.sequential,
             verbose=self.verbose,
             memory=False,  # Disable memory to reduce token usage
-            cache=False     # Disable cache for fresh results
+            cache=False,    # Disable cache for fresh results
+            task_callback=self._on_task_complete
         )
         
         self.console.print("\n[bold green]✓ Crew initialized successfully![/bold green]\n")
@@ -117,42 +470,135 @@ class DynatraceObservabilityCrew:
         """Execute the multi-agent analysis workflow"""
         
         self.console.print(Panel.fit(
-            "[bold magenta]Starting Dynatrace Observability Analysis[/bold magenta]\n"
+            "[bold magenta]Starting Dynatrace Observability Analysis[/bold magenta]"
+            + (f" [bold]({self.environment})[/bold]" if self.environment else "") + "\n"
             "[dim]This may take several minutes as agents analyze your environment...[/dim]",
             border_style="magenta"
         ))
         
         start_time = datetime.now()
+        cache = get_tool_cache()
+        cache_before = cache.stats() if cache else {}
+        coalescing_before = dict(get_single_flight().stats)
+        budget_meter = get_budget_meter(self.environment)
+        budget_meter.start_run()
+        compaction_before = get_output_compactor().stats()
+        llm_cache = get_llm_cache()
+        llm_cache_before = llm_cache.stats() if llm_cache else {}
+        routing_before = get_routing_stats().stats()
+        limiters_before = limiter_stats()
+        self._completed_outputs = []
+        self._kickoff_abandoned = False
+        deadline = Deadline(self.time_budget)
+        set_deadline(self.environment, deadline)
+        
+        # An MCP backend going down aborts the remaining tasks instead of
+        # letting every agent burn LLM round trips on failing tools
+        breaker = get_circuit_breaker(self.environment)
+        breaker_before = breaker.stats() if breaker else {}
+        hedger = get_request_hedger(self.environment)
+        hedging_before = hedger.stats()
+        
+        def abort_on_trip(tripped: CircuitBreaker) -> None:
+            deadline.cancel(f"Dynatrace MCP backend unavailable: {tripped.last_error}")
+        
+        if breaker is not None:
+            breaker.add_listener(abort_on_trip)
+        self._progress("started", environment=self.environment, incremental=self.incremental)
         
         try:
+            # Collect deterministic inputs without spending LLM round trips
+            # Incremental runs need the listings up front to diff against the snapshot
+            prefetched = {}
+            if self.incremental or os.getenv("DT_PREFETCH_ENABLED", "true").lower() not in ("0", "false", "no"):
+                prefetched = self.prefetch_data()
+                self._progress("prefetched", tools={
+                    tool_name: outcome["ok"] for tool_name, outcome in prefetched.items()
+                })
+            
+            # Still open after prefetch (or left open by an earlier run): probe once, then
+            # skip the agents entirely rather than start tasks that all depend on MCP data
+            if breaker is not None and breaker.is_open:
+                try:
+                    run_async(breaker.before_call())
+                except MCPUnavailableError:
+                    abort_on_trip(breaker)
+            
+            delta_plan = self.plan_delta(prefetched) if self.incremental else None
+            if delta_plan is not None and not delta_plan["changed"] and delta_plan["snapshot"].get("final_report"):
+                return self._reuse_previous_report(start_time, delta_plan)
+            
             # Create and run the crew
-            crew = self.create_crew()
+            crew = self.create_crew(prefetched, delta_plan)
+            self._progress("crew_ready", tasks=len(crew.tasks), execution_plan=self.execution_plan)
             
             self.console.print("\n[bold yellow]Agents are working...[/bold yellow]\n")
             
-            # Execute the crew
-            result = crew.kickoff()
+            # Execute the crew; a passed deadline or an open breaker yields a partial report instead
+            result = self._kickoff(crew, deadline)
+            partial = result is None
+            final_report = self._partial_report(crew, deadline) if partial else str(result)
             
             end_time = datetime.now()
             duration = (end_time - start_time).total_seconds()
             
             # Store results
             self.results = {
-                "status": "success",
+                "status": "partial" if partial else "success",
                 "timestamp": start_time.isoformat(),
                 "duration_seconds": duration,
-                "final_report": str(result),
+                "final_report": final_report,
                 "metadata": {
+                    "environment": self.environment or os.getenv("DT_ENVIRONMENT", ""),
+                    "inventory": self._inventory(prefetched),
                     "agents_count": len(crew.agents),
-                    "tasks_count": len(crew.tasks)
+                    "tasks_count": len(crew.tasks),
+                    "execution_plan": self.execution_plan,
+                    "prefetch": {
+                        tool_name: {"ok": outcome["ok"], "seconds": outcome["seconds"]}
+                        for tool_name, outcome in prefetched.items()
+                    },
+                    "tool_cache": stats_delta(cache_before, cache.stats()) if cache else None,
+                    "tool_coalescing": coalescing_delta(coalescing_before, get_single_flight().stats),
+                    "grail_budget": budget_meter.summary(),
+                    "tool_compaction": compaction_delta(compaction_before, get_output_compactor().stats()),
+                    "llm_cache": dict(
+                        llm_cache_delta(llm_cache_before, llm_cache.stats()),
+                        cache_sampled=cache_sampled_from_env()
+                    ) if llm_cache else None,
+                    "llm_routing": routing_delta(routing_before, get_routing_stats().stats()),
+                    "rate_limits": limiter_delta(limiters_before, limiter_stats()),
+                    "mcp_breaker": breaker_delta(breaker_before, breaker.stats()) if breaker else None,
+                    "hedging": hedge_delta(hedging_before, hedger.stats()) if hedger.tools else None,
+                    "delta": self._delta_summary(delta_plan, reused_report=False) if delta_plan else None,
+                    "deadline": {
+                        "budget_seconds": deadline.budget_seconds,
+                        "reached": partial,
+                        "aborted": deadline.reason or None,
+                        "completed_tasks": len(self._completed_outputs),
+                        "total_tasks": len(crew.tasks)
+                    } if self.time_budget or deadline.cancelled else None
                 }
             }
             
-            self.console.print(Panel.fit(
-                f"[bold green]✓ Analysis Complete![/bold green]\n"
-                f"[dim]Duration: {duration:.2f} seconds[/dim]",
-                border_style="green"
-            ))
+            # A partial run must not become the baseline for the next incremental run
+            if delta_plan is not None and not partial:
+                self._save_snapshot(delta_plan, final_report)
+            self._progress("completed", duration_seconds=duration, partial=partial, aborted=deadline.reason or None)
+            
+            if partial:
+                self.console.print(Panel.fit(
+                    f"[bold yellow]⚠ {deadline.reason or 'Time budget reached'} - partial report[/bold yellow]\n"
+                    f"[dim]{len(self._completed_outputs)} of {len(crew.tasks)} tasks completed "
+                    f"in {duration:.2f} seconds[/dim]",
+                    border_style="yellow"
+                ))
+            else:
+                self.console.print(Panel.fit(
+                    f"[bold green]✓ Analysis Complete![/bold green]\n"
+                    f"[dim]Duration: {duration:.2f} seconds[/dim]",
+                    border_style="green"
+                ))
             
             return self.results
             
@@ -166,6 +612,7 @@ class DynatraceObservabilityCrew:
                 "duration_seconds": duration,
                 "error": str(e)
             }
+            self._progress("failed", error=str(e), duration_seconds=duration)
             
             self.console.print(Panel.fit(
                 f"[bold red]✗ Analysis Failed[/bold red]\n"
@@ -174,6 +621,44 @@ class DynatraceObservabilityCrew:
             ))
             
             raise
+        
+        finally:
+            if breaker is not None:
+                breaker.remove_listener(abort_on_trip)
+            # Calls made between runs (e.g. tools used interactively) must not
+            # inherit this run's spent or cancelled deadline; an abandoned
+            # kickoff clears it itself once its last call has failed fast
+            if not self._kickoff_abandoned:
+                self._clear_deadline(deadline)
+    
+    def _reuse_previous_report(self, start_time: datetime, delta_plan: Dict[str, Any]) -> Dict[str, Any]:
+        """Nothing changed since the snapshot - return its report without running any agent"""
+        duration = (datetime.now() - start_time).total_seconds()
+        snapshot = delta_plan["snapshot"]
+        
+        self.results = {
+            "status": "success",
+            "timestamp": start_time.isoformat(),
+            "duration_seconds": duration,
+            "final_report": snapshot["final_report"],
+            "metadata": {
+                "environment": self.environment or os.getenv("DT_ENVIRONMENT", ""),
+                "inventory": {kind: len(plan["items"]) for kind, plan in delta_plan["kinds"].items()},
+                "agents_count": 0,
+                "tasks_count": 0,
+                "execution_plan": [],
+                "delta": self._delta_summary(delta_plan, reused_report=True)
+            }
+        }
+        
+        self.console.print(Panel.fit(
+            f"[bold green]✓ No changes since {snapshot.get('timestamp', 'the last run')}[/bold green]\n"
+            f"[dim]Reused the previous report ({duration:.2f} seconds)[/dim]",
+            border_style="green"
+        ))
+        self._progress("completed", duration_seconds=duration, reused_report=True)
+        
+        return self.results
     
     def save_report(self, output_path: str = "reports/observability_report.md"):
         """Save the analysis report to a file"""
@@ -206,6 +691,7 @@ class DynatraceObservabilityCrew:
         
         report = f"""# Dynatrace Observability Analysis Report
 
+**Environment:** {self.results.get('metadata', {}).get('environment') or 'N/A'}  
 **Generated:** {self.results.get('timestamp', 'N/A')}  
 **Duration:** {self.results.get('duration_seconds', 0):.2f} seconds  
 **Status:** {self.results.get('status', 'unknown').upper()}
@@ -222,7 +708,17 @@ class DynatraceObservabilityCrew:
 
 - **Agents Used:** {self.results.get('metadata', {}).get('agents_count', 'N/A')}
 - **Tasks Executed:** {self.results.get('metadata', {}).get('tasks_count', 'N/A')}
-- **Analysis Type:** Multi-Agent Sequential Workflow
+- **Analysis Type:** Multi-Agent Parallel DAG Workflow
+- **Tool Cache Hit Rate:** {self._format_cache_hit_rate()}
+- **Grail Data Scanned:** {self._format_grail_usage()}
+- **Tool Output Tokens Saved:** {self._format_compaction_savings()}
+- **LLM Cache Hit Rate:** {self._format_llm_cache()}
+- **LLM Models Used:** {self._format_llm_routing()}
+- **Throttling:** {self._format_rate_limits()}
+- **Time Budget:** {self._format_deadline()}
+- **MCP Circuit Breaker:** {self._format_breaker()}
+- **Hedged Requests:** {self._format_hedging()}
+- **Incremental Analysis:** {self._format_delta()}
 
 ---
 
@@ -231,6 +727,142 @@ class DynatraceObservabilityCrew:
         
         return report
     
+    def _format_cache_hit_rate(self) -> str:
+        """Format the MCP result cache hit rate for the report"""
+        cache_stats = self.results.get('metadata', {}).get('tool_cache')
+        if not cache_stats:
+            return 'N/A (cache disabled)'
+        return (
+            f"{cache_stats['hit_rate']:.0%} "
+            f"({cache_stats['hits']} hits / {cache_stats['misses']} misses)"
+        )
+    
+    def _format_grail_usage(self) -> str:
+        """Format Grail scan usage against the budget for the report"""
+        budget = self.results.get('metadata', {}).get('grail_budget')
+        if not budget:
+            return 'N/A'
+        return (
+            f"{budget['run']['gb_scanned']:.2f} GB of {budget['hard_limit_gb']:g} GB budget "
+            f"({budget['run']['queries']} queries, {budget['run']['refused']} refused, "
+            f"{budget['run']['downscoped']} downscoped)"
+        )
+    
+    def _format_compaction_savings(self) -> str:
+        """Format tokens saved by tool output compaction for the report"""
+        compaction = self.results.get('metadata', {}).get('tool_compaction')
+        if not compaction or not compaction['total']['calls']:
+            return 'N/A'
+        total = compaction['total']
+        return (
+            f"{total['tokens_saved']:,} of {total['tokens_in']:,} tokens "
+            f"({total['calls']} tool outputs, {total['truncated']} truncated)"
+        )
+    
+    def _format_llm_cache(self) -> str:
+        """Format LLM response cache hits, overall and per agent, for the report"""
+        llm_cache = self.results.get('metadata', {}).get('llm_cache')
+        if not llm_cache:
+            return 'N/A (cache disabled)'
+        per_agent = ", ".join(
+            f"{agent} {counts['hit_rate']:.0%}" + (" (bypassed)" if counts['bypassed'] else "")
+            for agent, counts in llm_cache['by_agent'].items()
+        )
+        policy = (
+            "all agents cached (DT_LLM_CACHE_SAMPLED)" if llm_cache.get('cache_sampled')
+            else "cached by default: analysts, onboarding guide and temperature-0 agents"
+        )
+        return (
+            f"{llm_cache['hit_rate']:.0%} ({llm_cache['hits']} hits / {llm_cache['misses']} misses)"
+            + (f" - {per_agent}" if per_agent else "") + f" [{policy}]"
+        )
+    
+    def _format_llm_routing(self) -> str:
+        """Format the models each agent was routed to with their average latency"""
+        routing = self.results.get('metadata', {}).get('llm_routing')
+        if not routing:
+            return 'N/A'
+        parts = []
+        for agent, models in routing.items():
+            for model, counts in models.items():
+                detail = f"{counts['calls']} calls, avg {counts['avg_seconds']:.1f}s"
+                if counts['timeouts']:
+                    detail += f", {counts['timeouts']} timed out"
+                parts.append(f"{agent} → {model} ({detail})")
+        return "; ".join(parts)
+    
+    def _format_rate_limits(self) -> str:
+        """Format per-backend throttling (429s, queueing, final concurrency window)"""
+        limits = self.results.get('metadata', {}).get('rate_limits')
+        if not limits:
+            return 'N/A'
+        return "; ".join(
+            f"{backend}: {stats['calls']} calls, {stats['throttled']} rate-limited, "
+            f"{stats['wait_seconds']:.1f}s queued (max depth {stats['max_queue_depth']}), "
+            f"window {stats['limit']:g}"
+            for backend, stats in limits.items()
+        )
+    
+    def _format_deadline(self) -> str:
+        """Format the run's time budget and whether it cut the run short"""
+        deadline = self.results.get('metadata', {}).get('deadline')
+        if not deadline:
+            return 'N/A (unlimited)'
+        if deadline.get('aborted'):
+            return (
+                f"aborted after {deadline['completed_tasks']} of {deadline['total_tasks']} tasks "
+                f"({deadline['aborted']}; partial report)"
+            )
+        if deadline['reached']:
+            return (
+                f"{deadline['budget_seconds']:.0f}s - reached after {deadline['completed_tasks']} of "
+                f"{deadline['total_tasks']} tasks (partial report)"
+            )
+        return f"{deadline['budget_seconds']:.0f}s - completed within budget"
+    
+    def _format_breaker(self) -> str:
+        """Format the MCP circuit breaker's state and what it short-circuited"""
+        breaker = self.results.get('metadata', {}).get('mcp_breaker')
+        if not breaker:
+            return 'N/A (disabled)'
+        summary = (
+            f"{breaker['state']} - {breaker['failures']} failed calls, {breaker['trips']} trips, "
+            f"{breaker['short_circuited']} calls short-circuited, {breaker['probes']} probes"
+        )
+        if breaker.get('last_error'):
+            summary += f" (last error: {breaker['last_error']})"
+        return summary
+    
+    def _format_hedging(self) -> str:
+        """Format how often slow MCP calls were hedged and how often the hedge answered first"""
+        hedging = self.results.get('metadata', {}).get('hedging')
+        if hedging is None:
+            return 'N/A (no tools opted in)'
+        if not hedging:
+            return 'no hedged tools called'
+        return "; ".join(
+            f"{tool_name}: {counts['hedged']} of {counts['calls']} calls hedged, "
+            f"{counts['hedge_wins']} won ({counts['win_rate']:.0%})"
+            + (f", {counts['budget_denied']} over budget" if counts['budget_denied'] else "")
+            for tool_name, counts in hedging.items()
+        )
+    
+    def _format_delta(self) -> str:
+        """Format what an incremental run re-analyzed for the report"""
+        delta = self.results.get('metadata', {}).get('delta')
+        if not delta:
+            return 'N/A (full analysis)'
+        if delta['reused_report']:
+            return f"no changes since {delta['baseline']}; previous report reused"
+        parts = []
+        for kind in ITEM_KINDS:
+            counts = delta[kind]
+            parts.append(
+                f"{kind}: {counts['new']} new, {counts['changed']} changed, "
+                f"{counts['unchanged']} reused, {counts['resolved']} resolved"
+            )
+        return "; ".join(parts)
+    
     def display_summary(self):
         """Display a summary of the analysis results"""
         
@@ -251,6 +883,9 @@ class DynatraceObservabilityCrew:
         if self.results.get('status') == 'success':
             self.console.print("\n[bold green]✓ Analysis completed successfully[/bold green]")
             self.console.print("\nFinal report has been generated. Use save_report() to export it.")
+        elif self.results.get('status') == 'partial':
+            reason = (self.results.get('metadata', {}).get('deadline') or {}).get('aborted') or "Time budget reached"
+            self.console.print(f"\n[bold yellow]⚠ {reason} - the report covers completed tasks only[/bold yellow]")
         else:
             self.console.print(f"\n[bold red]✗ Analysis failed: {self.results.get('error', 'Unknown error')}[/bold red]")
         
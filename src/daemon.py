@@ -0,0 +1,260 @@
+"""
+Analysis Daemon - Headless, scheduled analyses in one long-lived process
+Keeps the MCP session pool, LLM HTTP clients and the result caches warm between
+runs, fires DynatraceObservabilityCrew analyses on an interval or cron schedule,
+never lets two runs overlap and writes every report without prompting
+"""
+
+import logging
+import os
+import signal
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, List, Set
+
+from rich.console import Console
+
+from .crew_orchestrator import DynatraceObservabilityCrew
+from .tools.dql_optimizer import parse_duration
+from .tools.dynatrace_mcp_tools import get_session_pool, run_async
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_INTERVAL = "1h"
+DEFAULT_REPORT_DIR = "reports"
+DEFAULT_LOCK_PATH = ".cache/daemon.lock"
+
+CRON_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]  # day-of-week 0 and 7 are both Sunday
+
+
+class IntervalSchedule:
+    """Fire every `seconds`, measured from the start of the previous run"""
+
+    def __init__(self, seconds: float):
+        if seconds <= 0:
+            raise ValueError("Schedule interval must be positive")
+        self.seconds = seconds
+
+    def next_run(self, after: datetime) -> datetime:
+        return after + timedelta(seconds=self.seconds)
+
+    def __str__(self) -> str:
+        return f"every {self.seconds:g}s"
+
+
+def _parse_cron_field(field: str, low: int, high: int) -> Set[int]:
+    values: Set[int] = set()
+    for part in field.split(","):
+        body, _, step = part.partition("/")
+        if body == "*":
+            start, end = low, high
+        elif "-" in body:
+            start, end = (int(v) for v in body.split("-", 1))
+        else:
+            start = end = int(body)
+            if step:
+                end = high
+        if start < low or end > high or start > end:
+            raise ValueError(f"Cron field '{field}' out of range {low}-{high}")
+        values.update(range(start, end + 1, int(step) if step else 1))
+    return values
+
+
+class CronSchedule:
+    """
+    Standard five-field cron spec (minute hour day-of-month month day-of-week)
+    with *, lists, ranges and steps. As in cron, when both day fields are
+    restricted a day matches if either does.
+    """
+
+    def __init__(self, spec: str):
+        fields = spec.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron spec must have 5 fields, got '{spec}'")
+        self.spec = spec
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            _parse_cron_field(f, low, high) for f, (low, high) in zip(fields, CRON_RANGES)
+        )
+        self.weekdays = {d % 7 for d in weekdays}
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day = moment.day in self.days
+        weekday = (moment.weekday() + 1) % 7 in self.weekdays  # cron: 0 = Sunday
+        if self._any_day or self._any_weekday:
+            return day and weekday
+        return day or weekday
+
+    def next_run(self, after: datetime) -> datetime:
+        moment = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment + timedelta(days=366 * 4)
+        while moment < limit:
+            if moment.month not in self.months:
+                moment = (moment.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(moment):
+                moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+            elif moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment
+        raise ValueError(f"Cron spec '{self.spec}' never fires")
+
+    def __str__(self) -> str:
+        return f"cron '{self.spec}'"
+
+
+def schedule_from_config(interval: Optional[str] = None, cron: Optional[str] = None):
+    """Build a schedule from CLI values, falling back to DT_DAEMON_CRON / DT_DAEMON_INTERVAL"""
+    cron = cron or os.getenv("DT_DAEMON_CRON")
+    if cron:
+        return CronSchedule(cron)
+    interval = interval or os.getenv("DT_DAEMON_INTERVAL", DEFAULT_INTERVAL)
+    seconds = parse_duration(interval)
+    if seconds is None:
+        try:
+            seconds = float(interval)
+        except ValueError:
+            raise ValueError(f"Invalid daemon interval '{interval}' (use e.g. 900, 15m, 1h)")
+    return IntervalSchedule(seconds)
+
+
+class AnalysisDaemon:
+    """
+    Runs analyses on a schedule in the foreground thread.
+
+    Runs execute one at a time; a run that overruns its next slot causes the
+    missed slots to be skipped rather than queued. A lock file stops a second
+    daemon process from analyzing the same environment concurrently.
+    """
+
+    def __init__(
+        self,
+        schedule,
+        report_dir: str = DEFAULT_REPORT_DIR,
+        run_on_start: bool = True,
+        lock_path: str = DEFAULT_LOCK_PATH,
+        verbose: bool = False
+    ):
+        self.schedule = schedule
+        self.report_dir = report_dir
+        self.run_on_start = run_on_start
+        self.lock_path = lock_path
+        self.console = Console()
+        self.crew_system = DynatraceObservabilityCrew(verbose=verbose)
+        self._stop = threading.Event()
+        self._run_lock = threading.Lock()
+        self._lock_file = None
+        self.history: List[Dict[str, Any]] = []
+        self.stats = {"runs": 0, "failures": 0, "skipped_slots": 0}
+
+    def _acquire_process_lock(self) -> None:
+        if not FCNTL_AVAILABLE:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.lock_path)), exist_ok=True)
+        self._lock_file = open(self.lock_path, "w")
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            self._lock_file.close()
+            self._lock_file = None
+            raise RuntimeError(f"Another daemon holds {self.lock_path}; refusing to start")
+        self._lock_file.write(str(os.getpid()))
+        self._lock_file.flush()
+
+    def _release_process_lock(self) -> None:
+        if self._lock_file is not None:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+            self._lock_file.close()
+            self._lock_file = None
+
+    def warm_up(self) -> None:
+        """Open the MCP session pool to full size so runs start without connection setup"""
+        started = time.monotonic()
+        try:
+            sessions = run_async(get_session_pool().warm_up())
+            self.console.print(
+                f"[dim]MCP session pool warm: {sessions} session(s) "
+                f"({time.monotonic() - started:.2f}s)[/dim]"
+            )
+        except Exception as e:
+            self.console.print(f"[yellow]MCP warm-up failed ({e}); sessions will connect on demand[/yellow]")
+
+    def run_once(self) -> Optional[Dict[str, Any]]:
+        """Run one analysis and save its report; returns None if a run is already in progress"""
+        if not self._run_lock.acquire(blocking=False):
+            self.stats["skipped_slots"] += 1
+            logger.warning("Analysis still running - skipping this slot")
+            return None
+
+        started = datetime.now()
+        try:
+            self.warm_up()
+            results = self.crew_system.run_analysis()
+            timestamp = results.get('timestamp', started.isoformat()).replace(':', '-').split('.')[0]
+            os.makedirs(self.report_dir, exist_ok=True)
+            report_path = os.path.join(self.report_dir, f"observability_report_{timestamp}.md")
+            self.crew_system.save_report(report_path)
+            self.stats["runs"] += 1
+            outcome = {"started": started.isoformat(), "status": "success", "report": report_path}
+        except Exception as e:
+            self.stats["failures"] += 1
+            logger.exception("Scheduled analysis failed")
+            self.console.print(f"[red]Scheduled analysis failed: {e}[/red]")
+            outcome = {"started": started.isoformat(), "status": "error", "error": str(e)}
+        finally:
+            self._run_lock.release()
+
+        outcome["duration_seconds"] = (datetime.now() - started).total_seconds()
+        self.history = (self.history + [outcome])[-50:]
+        return outcome
+
+    def stop(self, *_args) -> None:
+        """Stop after the current run finishes (also used as the signal handler)"""
+        if not self._stop.is_set():
+            self.console.print("\n[yellow]Stopping daemon after the current run...[/yellow]")
+        self._stop.set()
+
+    def serve_forever(self) -> None:
+        """Main loop; returns after stop() or SIGINT/SIGTERM"""
+        self._acquire_process_lock()
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, self.stop)
+            signal.signal(signal.SIGINT, self.stop)
+
+        try:
+            self.console.print(f"[bold cyan]Daemon started[/bold cyan] [dim]({self.schedule})[/dim]")
+            self.warm_up()
+            next_run = datetime.now() if self.run_on_start else self.schedule.next_run(datetime.now())
+
+            while not self._stop.is_set():
+                wait = (next_run - datetime.now()).total_seconds()
+                if wait > 0:
+                    self.console.print(f"[dim]Next analysis at {next_run:%Y-%m-%d %H:%M:%S}[/dim]")
+                    if self._stop.wait(wait):
+                        break
+
+                slot = next_run
+                self.run_once()
+
+                # Skip slots that passed while the run was executing
+                next_run = self.schedule.next_run(slot)
+                while next_run <= datetime.now():
+                    self.stats["skipped_slots"] += 1
+                    next_run = self.schedule.next_run(next_run)
+        finally:
+            self._release_process_lock()
+            self.console.print(
+                f"[bold]Daemon stopped[/bold] [dim]({self.stats['runs']} runs, "
+                f"{self.stats['failures']} failed, {self.stats['skipped_slots']} slots skipped)[/dim]"
+            )
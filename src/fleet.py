@@ -0,0 +1,183 @@
+"""
+Fleet Orchestrator - Concurrent analysis of several Dynatrace environments
+Runs one DynatraceObservabilityCrew per tenant on a bounded worker pool; every
+tenant gets its own MCP session pool, Grail budget and report, and the results
+are merged into a fleet summary
+"""
+
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional, Dict, Any, List
+
+from rich.console import Console
+from rich.panel import Panel
+
+from .crew_orchestrator import DynatraceObservabilityCrew
+from .tools.environments import EnvironmentConfig
+
+
+DEFAULT_MAX_WORKERS = 4
+SUMMARY_EXCERPT_CHARS = 600
+
+
+def max_workers_from_env() -> int:
+    """Environments analyzed at the same time (DT_FLEET_MAX_WORKERS)"""
+    try:
+        return max(1, int(os.getenv("DT_FLEET_MAX_WORKERS", str(DEFAULT_MAX_WORKERS))))
+    except ValueError:
+        return DEFAULT_MAX_WORKERS
+
+
+def _excerpt(report: str) -> str:
+    """The executive summary of a final report, or its opening, for the fleet summary"""
+    match = re.search(r"executive summary\W*\n(.+?)(?=\n#|\Z)", report, re.IGNORECASE | re.DOTALL)
+    text = (match.group(1) if match else report).strip()
+    return text if len(text) <= SUMMARY_EXCERPT_CHARS else text[:SUMMARY_EXCERPT_CHARS].rsplit(" ", 1)[0] + " ..."
+
+
+class FleetAnalyzer:
+    """
+    Analyzes every configured environment with at most `max_workers` running
+    at once. One tenant failing never stops the others.
+    """
+
+    def __init__(
+        self,
+        environments: List[EnvironmentConfig],
+        max_workers: Optional[int] = None,
+        report_dir: str = "reports",
+        incremental: Optional[bool] = None
+    ):
+        if not environments:
+            raise ValueError("No environments configured for fleet analysis")
+        self.environments = environments
+        self.max_workers = max_workers or max_workers_from_env()
+        self.report_dir = report_dir
+        self.incremental = incremental
+        self.console = Console()
+        self.results: Dict[str, Any] = {}
+
+    def _analyze(self, config: EnvironmentConfig, timestamp: str) -> Dict[str, Any]:
+        crew_system = DynatraceObservabilityCrew(
+            verbose=False,
+            incremental=self.incremental,
+            environment=config.name
+        )
+        try:
+            results = crew_system.run_analysis()
+        except Exception as e:
+            return {"environment": config.name, "status": "error", "error": str(e)}
+        if results.get("status") not in ("success", "partial"):
+            return {"environment": config.name, **results}
+
+        tenant_dir = os.path.join(self.report_dir, re.sub(r"[^\w.-]", "_", config.name))
+        os.makedirs(tenant_dir, exist_ok=True)
+        report_path = os.path.join(tenant_dir, f"observability_report_{timestamp}.md")
+        crew_system.save_report(report_path)
+        return {"environment": config.name, "report": report_path, **results}
+
+    def run(self) -> Dict[str, Any]:
+        """Analyze all environments and write the merged fleet summary"""
+        start_time = datetime.now()
+        timestamp = start_time.isoformat().replace(':', '-').split('.')[0]
+
+        self.console.print(Panel.fit(
+            f"[bold magenta]Fleet analysis of {len(self.environments)} environments[/bold magenta]\n"
+            f"[dim]{self.max_workers} concurrent worker(s)[/dim]",
+            border_style="magenta"
+        ))
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="fleet") as executor:
+            futures = [executor.submit(self._analyze, config, timestamp) for config in self.environments]
+            tenants = [future.result() for future in futures]
+
+        duration = (datetime.now() - start_time).total_seconds()
+        succeeded = [t for t in tenants if t.get("status") in ("success", "partial")]
+        self.results = {
+            "status": "success" if len(succeeded) == len(tenants) else ("partial" if succeeded else "error"),
+            "timestamp": start_time.isoformat(),
+            "duration_seconds": duration,
+            "environments": len(tenants),
+            "succeeded": len(succeeded),
+            "tenants": tenants,
+            "totals": {
+                "problems": sum((t.get("metadata", {}).get("inventory", {}).get("problems") or 0) for t in succeeded),
+                "vulnerabilities": sum(
+                    (t.get("metadata", {}).get("inventory", {}).get("vulnerabilities") or 0) for t in succeeded
+                ),
+                "gb_scanned": round(sum(
+                    t.get("metadata", {}).get("grail_budget", {}).get("run", {}).get("gb_scanned", 0.0)
+                    for t in succeeded
+                ), 4),
+            }
+        }
+
+        summary_path = os.path.join(self.report_dir, f"fleet_summary_{timestamp}.md")
+        self.save_summary(summary_path)
+
+        self.console.print(Panel.fit(
+            f"[bold green]✓ Fleet analysis complete[/bold green]: "
+            f"{len(succeeded)}/{len(tenants)} environments\n"
+            f"[dim]Duration: {duration:.2f} seconds - summary: {summary_path}[/dim]",
+            border_style="green" if len(succeeded) == len(tenants) else "yellow"
+        ))
+        return self.results
+
+    def save_summary(self, output_path: str) -> None:
+        """Write the merged fleet summary as markdown and JSON"""
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(self._format_markdown_summary())
+        with open(output_path.replace('.md', '.json'), 'w', encoding='utf-8') as f:
+            json.dump(self.results, f, indent=2)
+
+    def _format_markdown_summary(self) -> str:
+        rows = []
+        highlights = []
+        for tenant in self.results["tenants"]:
+            metadata = tenant.get("metadata", {})
+            inventory = metadata.get("inventory", {})
+            budget = metadata.get("grail_budget", {}).get("run", {})
+            if tenant.get("status") in ("success", "partial"):
+                rows.append(
+                    f"| {tenant['environment']} | {tenant['status'].upper()} | {tenant.get('duration_seconds', 0):.1f}s "
+                    f"| {inventory.get('problems', 'N/A')} | {inventory.get('vulnerabilities', 'N/A')} "
+                    f"| {budget.get('gb_scanned', 0.0):.2f} | {tenant.get('report', '')} |"
+                )
+                highlights.append(f"### {tenant['environment']}\n\n{_excerpt(tenant.get('final_report', ''))}")
+            else:
+                rows.append(
+                    f"| {tenant['environment']} | ERROR | - | - | - | - | {tenant.get('error', '')[:120]} |"
+                )
+
+        totals = self.results["totals"]
+        return f"""# Dynatrace Fleet Observability Summary
+
+**Generated:** {self.results['timestamp']}
+**Duration:** {self.results['duration_seconds']:.2f} seconds
+**Environments:** {self.results['succeeded']} of {self.results['environments']} analyzed successfully
+**Open Problems:** {totals['problems']}
+**Vulnerabilities:** {totals['vulnerabilities']}
+**Grail Data Scanned:** {totals['gb_scanned']:.2f} GB
+
+---
+
+## Environments
+
+| Environment | Status | Duration | Problems | Vulnerabilities | Grail GB | Report |
+|---|---|---|---|---|---|---|
+{chr(10).join(rows)}
+
+---
+
+## Highlights
+
+{(chr(10) * 2).join(highlights) or 'No environment was analyzed successfully.'}
+
+---
+
+*This summary was generated by the Dynatrace Observability Multi-Agent System*
+"""
@@ -0,0 +1,112 @@
+"""
+Async Runtime - A single background event loop shared by the whole process
+Sync tool code submits coroutines here and waits on the returned futures, so
+pooled MCP sessions, concurrent calls and timeouts all live on one loop
+"""
+
+import asyncio
+import atexit
+import concurrent.futures
+import threading
+from typing import Any, Awaitable, Callable, List, Optional
+
+
+class AsyncRuntime:
+    """
+    Owns an asyncio event loop running forever on a daemon thread.
+
+    Any thread (the main thread, CrewAI worker threads, ...) can hand coroutines
+    to the loop with submit() or run(); the loop itself is never driven by the
+    calling thread, which avoids creating throwaway loops per call.
+    """
+
+    def __init__(self, name: str = "mcp-async-runtime"):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._started = threading.Event()
+        self._lock = threading.Lock()
+        self._shutdown_hooks: List[Callable[[], Awaitable[Any]]] = []
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        self.start()
+        return self._loop
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the background loop thread (idempotent)"""
+        with self._lock:
+            if not self.running:
+                self._started.clear()
+                self._thread = threading.Thread(target=self._run_loop, name=self.name, daemon=True)
+                self._thread.start()
+        # Callers racing the first start must still wait for the loop to exist
+        self._started.wait()
+
+    def _run_loop(self) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        self._started.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    def in_runtime_thread(self) -> bool:
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def submit(self, coro: Awaitable[Any]) -> concurrent.futures.Future:
+        """Schedule a coroutine on the background loop and return a thread-safe future"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the background loop and block until it finishes"""
+        if self.in_runtime_thread():
+            coro.close()
+            raise RuntimeError("AsyncRuntime.run() called from the runtime thread; await the coroutine instead")
+
+        future = self.submit(coro)
+        try:
+            return future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise TimeoutError(f"Operation did not complete within {timeout}s")
+
+    def add_shutdown_hook(self, hook: Callable[[], Awaitable[Any]]) -> None:
+        """Register a coroutine function to await on the loop before it stops"""
+        self._shutdown_hooks.append(hook)
+
+    def shutdown(self, timeout: float = 15.0) -> None:
+        """Run shutdown hooks, stop the loop and join the thread"""
+        if not self.running:
+            return
+
+        async def _drain():
+            for hook in self._shutdown_hooks:
+                try:
+                    await hook()
+                except Exception:
+                    pass
+
+        try:
+            self.submit(_drain()).result(timeout=timeout)
+        except Exception:
+            pass
+
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=timeout)
+
+
+_runtime = AsyncRuntime()
+atexit.register(_runtime.shutdown)
+
+
+def get_runtime() -> AsyncRuntime:
+    """Return the process-wide async runtime"""
+    return _runtime
@@ -0,0 +1,194 @@
+"""
+Circuit Breaker - Fail fast while an environment's MCP backend is down
+After a run of consecutive failed MCP calls the breaker opens and every further
+call is rejected at once with MCPUnavailableError instead of waiting out its
+timeout. Once the reset timeout has passed, one caller probes the backend with
+get_environment_info (half-open); a good answer closes the breaker again, a bad
+one keeps it open for another reset period
+"""
+
+import asyncio
+import os
+import re
+import threading
+import time
+from typing import Optional, Dict, Any, List, Callable, Awaitable
+
+
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_RESET_TIMEOUT = 30.0
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Tool error results that mean the backend itself is unusable (bad credentials,
+# unreachable tenant) rather than that one request was wrong
+BACKEND_FAILURE_PATTERN = re.compile(
+    r"\b(?:401|403)\b|unauthori[sz]ed|forbidden|invalid (?:api |access |platform )?token|token (?:has )?expired"
+    r"|authentication (?:failed|required|error)|connection refused|econnrefused|econnreset|enotfound"
+    r"|getaddrinfo|fetch failed|socket hang up|bad gateway|service unavailable|gateway timeout",
+    re.IGNORECASE
+)
+
+
+def is_backend_failure(text: str) -> bool:
+    """Recognize an MCP tool error caused by failed authentication or connectivity"""
+    return bool(BACKEND_FAILURE_PATTERN.search(text[:2000]))
+
+
+class MCPUnavailableError(ConnectionError):
+    """An environment's MCP backend is known to be down; the call was not attempted"""
+
+    def __init__(self, name: str, retry_in: float, last_error: str = ""):
+        self.name = name
+        self.retry_in = retry_in
+        self.last_error = last_error
+        super().__init__(
+            f"Dynatrace MCP backend '{name}' is unavailable (circuit open, next probe in {retry_in:.0f}s"
+            + (f", last error: {last_error}" if last_error else "") + ")"
+        )
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after `failure_threshold` consecutive failures; open ->
+    half-open after `reset_timeout` seconds, when a single `probe` decides
+    between closing and re-opening. Listeners are called with the breaker
+    every time it opens.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+        probe: Optional[Callable[[], Awaitable[bool]]] = None
+    ):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.probe = probe
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.last_error = ""
+        self._lock = threading.Lock()
+        self._probe_lock = asyncio.Lock()
+        self._listeners: List[Callable[["CircuitBreaker"], None]] = []
+        self._stats = {"failures": 0, "trips": 0, "short_circuited": 0, "probes": 0, "probe_failures": 0}
+
+    def add_listener(self, listener: Callable[["CircuitBreaker"], None]) -> None:
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[["CircuitBreaker"], None]) -> None:
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def retry_in(self) -> float:
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    @property
+    def is_open(self) -> bool:
+        return self.state != CLOSED
+
+    def _rejection(self) -> MCPUnavailableError:
+        with self._lock:
+            self._stats["short_circuited"] += 1
+        return MCPUnavailableError(self.name, self.retry_in(), self.last_error)
+
+    async def before_call(self) -> None:
+        """Let a call through, probing first when the reset timeout has passed; raise while open"""
+        if self.state == CLOSED:
+            return
+        if self.retry_in() > 0 or self.probe is None:
+            raise self._rejection()
+        async with self._probe_lock:
+            # Another caller may have probed while this one waited for the lock
+            if self.state != CLOSED and self.retry_in() <= 0:
+                await self._run_probe()
+        if self.state != CLOSED:
+            raise self._rejection()
+
+    async def _run_probe(self) -> None:
+        with self._lock:
+            self.state = HALF_OPEN
+            self._stats["probes"] += 1
+        try:
+            healthy = await self.probe()
+            error = "" if healthy else "probe returned an error"
+        except Exception as e:
+            healthy, error = False, str(e) or type(e).__name__
+        if healthy:
+            self.record_success()
+        else:
+            with self._lock:
+                self._stats["probe_failures"] += 1
+            self._trip(error)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = CLOSED
+            self.consecutive_failures = 0
+
+    def record_failure(self, error: BaseException) -> None:
+        with self._lock:
+            self._stats["failures"] += 1
+            self.consecutive_failures += 1
+            trip = self.state == CLOSED and self.consecutive_failures >= self.failure_threshold
+        if trip:
+            self._trip(str(error) or type(error).__name__)
+
+    def _trip(self, error: str) -> None:
+        with self._lock:
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+            self.last_error = error[:200]
+            self._stats["trips"] += 1
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener(self)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot.update({
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "last_error": self.last_error,
+            })
+            return snapshot
+
+
+def breaker_enabled() -> bool:
+    return os.getenv("DT_MCP_BREAKER_ENABLED", "true").lower() not in ("0", "false", "no")
+
+
+def failure_threshold_from_env() -> int:
+    """Consecutive failed MCP calls that open the breaker (DT_MCP_BREAKER_THRESHOLD)"""
+    try:
+        return max(1, int(os.getenv("DT_MCP_BREAKER_THRESHOLD", str(DEFAULT_FAILURE_THRESHOLD))))
+    except ValueError:
+        return DEFAULT_FAILURE_THRESHOLD
+
+
+def reset_timeout_from_env() -> float:
+    """Seconds the breaker stays open before probing again (DT_MCP_BREAKER_RESET_SECONDS)"""
+    try:
+        return max(1.0, float(os.getenv("DT_MCP_BREAKER_RESET_SECONDS", str(DEFAULT_RESET_TIMEOUT))))
+    except ValueError:
+        return DEFAULT_RESET_TIMEOUT
+
+
+def breaker_delta(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Any]:
+    """Counters accumulated between two stats() snapshots plus the current state"""
+    delta = {
+        field: after[field] - before.get(field, 0)
+        for field in ("failures", "trips", "short_circuited", "probes", "probe_failures")
+    }
+    delta["state"] = after["state"]
+    if after["last_error"] and delta["trips"]:
+        delta["last_error"] = after["last_error"]
+    return delta
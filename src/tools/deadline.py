@@ -0,0 +1,147 @@
+"""
+Run Deadlines - Whole-run time budgets propagated to every MCP and LLM call
+A run registers a Deadline for its environment; each tool call and LLM request
+then gets a timeout of min(its own limit, time left in the run), so nothing
+can outlive the run and a stuck MCP server or Grail query fails fast instead
+of hanging crew.kickoff()
+"""
+
+import os
+import threading
+import time
+from typing import Optional, Dict
+
+from .dql_optimizer import parse_duration
+from .environments import DEFAULT_ENVIRONMENT
+
+
+# Seconds a single MCP tool call may take before its session is recycled
+DEFAULT_TOOL_TIMEOUTS: Dict[str, float] = {
+    "get_environment_info": 30,
+    "list_problems": 60,
+    "list_vulnerabilities": 60,
+    "find_entity_by_name": 60,
+    "execute_dql": 180,
+    "verify_dql": 30,
+    "generate_dql_from_natural_language": 90,
+    "chat_with_davis_copilot": 120,
+}
+DEFAULT_TOOL_TIMEOUT = 120.0
+MIN_CALL_TIMEOUT = 1.0
+
+
+class DeadlineExceeded(TimeoutError):
+    """The run's time budget is spent; no further calls are started"""
+
+
+class Deadline:
+    """
+    Absolute end time of a run, measured on the monotonic clock. Without a
+    budget it never runs out on its own, but cancel() ends it early, e.g.
+    when the environment's MCP backend goes down mid-run.
+    """
+
+    def __init__(self, budget_seconds: Optional[float] = None):
+        self.budget_seconds = budget_seconds
+        self.started = time.monotonic()
+        self.expires_at = self.started + budget_seconds if budget_seconds else float("inf")
+        self.reason = ""
+        self._cancelled = threading.Event()
+
+    def remaining(self) -> float:
+        if self._cancelled.is_set():
+            return 0.0
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    @property
+    def expired(self) -> bool:
+        return self._cancelled.is_set() or time.monotonic() >= self.expires_at
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self, reason: str) -> None:
+        """End the run now; the first reason given is kept"""
+        if not self._cancelled.is_set():
+            self.reason = reason
+            self._cancelled.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until cancelled or `timeout` passes; True when cancelled"""
+        return self._cancelled.wait(timeout)
+
+    def check(self) -> None:
+        if self._cancelled.is_set():
+            raise DeadlineExceeded(
+                f"Analysis aborted: {self.reason} - "
+                "stop calling tools and finish with the data already collected"
+            )
+        if self.expired:
+            raise DeadlineExceeded(
+                f"Analysis time budget of {self.budget_seconds:.0f}s is exhausted - "
+                "stop calling tools and finish with the data already collected"
+            )
+
+    def timeout_for(self, limit: Optional[float]) -> Optional[float]:
+        """Timeout for one call: its own limit capped by the time left (raises when none is left)"""
+        self.check()
+        if self.budget_seconds is None:
+            return limit
+        remaining = max(MIN_CALL_TIMEOUT, self.remaining())
+        return min(limit, remaining) if limit else remaining
+
+
+def run_budget_from_env() -> Optional[float]:
+    """Whole-run budget from DT_RUN_TIME_BUDGET ("20m", "1h" or seconds); None = unlimited"""
+    value = os.getenv("DT_RUN_TIME_BUDGET", "").strip()
+    if not value:
+        return None
+    seconds = parse_duration(value)
+    if seconds is None:
+        try:
+            seconds = float(value)
+        except ValueError:
+            raise ValueError(f"Invalid DT_RUN_TIME_BUDGET '{value}' (use e.g. 900, 15m, 1h)")
+    return seconds if seconds > 0 else None
+
+
+def tool_timeouts_from_env() -> Dict[str, float]:
+    """Per-tool timeouts, overridable with DT_TOOL_TIMEOUTS="execute_dql=300,list_problems=30" """
+    timeouts = dict(DEFAULT_TOOL_TIMEOUTS)
+    for item in os.getenv("DT_TOOL_TIMEOUTS", "").split(","):
+        tool_name, _, seconds = item.partition("=")
+        try:
+            timeouts[tool_name.strip()] = float(seconds)
+        except ValueError:
+            continue
+    return timeouts
+
+
+_tool_timeouts = tool_timeouts_from_env()
+_deadlines: Dict[str, Deadline] = {}
+_deadlines_lock = threading.Lock()
+
+
+def set_deadline(environment: str, deadline: Optional[Deadline]) -> None:
+    """Register (or with None, clear) the running deadline of an environment"""
+    with _deadlines_lock:
+        if deadline is None:
+            _deadlines.pop(environment, None)
+        else:
+            _deadlines[environment] = deadline
+
+
+def get_deadline(environment: str = DEFAULT_ENVIRONMENT) -> Optional[Deadline]:
+    with _deadlines_lock:
+        return _deadlines.get(environment)
+
+
+def tool_call_timeout(tool_name: str, environment: str = DEFAULT_ENVIRONMENT) -> float:
+    """Timeout for one MCP call: the tool's limit capped by the environment's run deadline"""
+    limit = _tool_timeouts.get(tool_name, DEFAULT_TOOL_TIMEOUT)
+    deadline = get_deadline(environment)
+    return deadline.timeout_for(limit) if deadline else limit
@@ -0,0 +1,90 @@
+"""
+DQL Helpers - Lightweight manipulation of Dynatrace Query Language statements
+Splits statements into pipeline stages (respecting string literals) so other
+tool-layer components can inspect and adjust them
+"""
+
+import re
+from typing import List, Optional
+
+
+def split_pipeline(statement: str) -> List[str]:
+    """Split a DQL statement on top-level `|` into trimmed stages"""
+    stages: List[str] = []
+    current: List[str] = []
+    quote: Optional[str] = None
+
+    for index, char in enumerate(statement):
+        if quote:
+            current.append(char)
+            if char == quote and statement[index - 1] != "\\":
+                quote = None
+            continue
+        if char in ("\"", "'", "`"):
+            quote = char
+        if char == "|":
+            stages.append("".join(current).strip())
+            current = []
+            continue
+        current.append(char)
+
+    stages.append("".join(current).strip())
+    return [stage for stage in stages if stage]
+
+
+def join_pipeline(stages: List[str]) -> str:
+    """Join pipeline stages back into a single statement"""
+    return "\n| ".join(stages)
+
+
+def command_of(stage: str) -> str:
+    """The command keyword of a stage, e.g. 'fetch', 'filter', 'limit'"""
+    match = re.match(r"\s*([A-Za-z]+)", stage)
+    return match.group(1).lower() if match else ""
+
+
+def get_limit(stages: List[str]) -> Optional[int]:
+    """The smallest `limit` in the pipeline, or None when unbounded"""
+    limits = []
+    for stage in stages:
+        match = re.match(r"\s*limit\s+(\d+)\s*$", stage, re.IGNORECASE)
+        if match:
+            limits.append(int(match.group(1)))
+    return min(limits) if limits else None
+
+
+def ensure_limit(stages: List[str], max_records: int) -> List[str]:
+    """Append a `limit` stage, or lower existing ones, so at most `max_records` are returned"""
+    adjusted = []
+    found = False
+    for stage in stages:
+        match = re.match(r"\s*limit\s+(\d+)\s*$", stage, re.IGNORECASE)
+        if match:
+            found = True
+            stage = f"limit {min(int(match.group(1)), max_records)}"
+        adjusted.append(stage)
+    if not found:
+        adjusted.append(f"limit {max_records}")
+    return adjusted
+
+
+def set_fetch_option(stages: List[str], option: str, value: str) -> List[str]:
+    """Set (or tighten) an option such as `scanLimitGBytes` on the `fetch` stage"""
+    if not stages or command_of(stages[0]) != "fetch":
+        return stages
+
+    fetch = stages[0]
+    pattern = re.compile(rf"(,\s*{option}\s*:\s*)([^,]+)", re.IGNORECASE)
+    if pattern.search(fetch):
+        fetch = pattern.sub(rf"\g<1>{value}", fetch)
+    else:
+        fetch = f"{fetch}, {option}:{value}"
+    return [fetch] + stages[1:]
+
+
+def get_fetch_option(stages: List[str], option: str) -> Optional[str]:
+    """Read an option from the `fetch` stage"""
+    if not stages or command_of(stages[0]) != "fetch":
+        return None
+    match = re.search(rf",\s*{option}\s*:\s*([^,]+)", stages[0], re.IGNORECASE)
+    return match.group(1).strip() if match else None
@@ -0,0 +1,255 @@
+"""
+DQL Optimizer - Rewrite LLM-written DQL before it reaches Grail
+Adds a default `limit` and `fields` projection when absent, clamps the queried
+timeframe to the task's window and moves filters as early in the pipeline as is
+semantically safe
+"""
+
+import logging
+import os
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Any, List, Tuple
+
+from .dql import split_pipeline, join_pipeline, command_of, get_limit, ensure_limit
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_LIMIT = 200
+
+# Projection added to plain record queries that do not choose their own fields
+DEFAULT_PROJECTIONS: Dict[str, List[str]] = {
+    "logs": [
+        "timestamp", "status", "loglevel", "content", "log.source",
+        "dt.entity.service", "dt.entity.host", "dt.entity.process_group_instance"
+    ],
+    "spans": [
+        "start_time", "duration", "span.name", "span.kind", "request.is_failed",
+        "dt.entity.service", "trace_id", "span_id"
+    ],
+}
+
+# Commands after which we must not add a projection (they shape their own output
+# or create fields a default projection would drop)
+SHAPING_COMMANDS = {
+    "fields", "fieldskeep", "fieldsremove", "fieldsadd", "fieldsrename", "fieldssummary",
+    "summarize", "maketimeseries", "timeseries", "parse", "lookup", "join", "append", "expand"
+}
+
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+# Words in DQL expressions that are not field names
+NON_FIELD_WORDS = {"and", "or", "not", "xor", "asc", "desc", "true", "false", "null", "by", "in"}
+
+# A relative look-back such as "6h", "-6h", "now()-6h" or "now() - 6 h"
+LOOKBACK_PATTERN = r"(?:now\s*\(\s*\)\s*)?-?\s*(\d+(?:\.\d+)?)\s*([smhdw])\b"
+
+
+def parse_duration(text: str) -> Optional[float]:
+    """Seconds in a DQL duration such as '6h', '30m' or '7d'"""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([smhdw])\s*", text or "", re.IGNORECASE)
+    if not match:
+        return None
+    return float(match.group(1)) * DURATION_UNITS[match.group(2).lower()]
+
+
+def parse_lookback(text: str) -> Optional[float]:
+    """Seconds of a relative timeframe in any of its spellings ("6h", "-6h", "now()-6h")"""
+    match = re.fullmatch(r"\s*" + LOOKBACK_PATTERN + r"\s*", text or "", re.IGNORECASE)
+    if not match:
+        return None
+    return float(match.group(1)) * DURATION_UNITS[match.group(2).lower()]
+
+
+def format_duration(seconds: float) -> str:
+    """Shortest exact DQL duration for `seconds`, approximated in days when very long"""
+    for unit in ("d", "h", "m"):
+        if seconds >= DURATION_UNITS[unit] and seconds % DURATION_UNITS[unit] == 0:
+            return f"{int(seconds // DURATION_UNITS[unit])}{unit}"
+    if seconds > DURATION_UNITS["d"]:
+        return f"~{seconds / DURATION_UNITS['d']:.0f}d"
+    return f"{int(seconds)}s"
+
+
+def _fetch_bound(
+    fetch: str, option: str, now: datetime
+) -> Tuple[Optional[float], Optional[re.Match], Optional[datetime]]:
+    """
+    How many seconds ago a fetch stage's `from:` or `to:` option lies, the match
+    that produced it and, for absolute timestamps, the time itself. The seconds
+    are None when the option is absent or cannot be parsed (then the match is
+    only set if the option is present).
+    """
+    prefix = r"(,\s*" + option + r"\s*:\s*)"
+    relative = re.search(prefix + LOOKBACK_PATTERN, fetch, re.IGNORECASE)
+    if relative:
+        return float(relative.group(2)) * DURATION_UNITS[relative.group(3).lower()], relative, None
+
+    current = re.search(prefix + r"now\s*\(\s*\)(?=\s*(?:,|$))", fetch, re.IGNORECASE)
+    if current:
+        return 0.0, current, None
+
+    absolute = re.search(prefix + r"\"([^\"]+)\"", fetch, re.IGNORECASE)
+    if absolute:
+        try:
+            moment = datetime.fromisoformat(absolute.group(2).replace("Z", "+00:00"))
+            if moment.tzinfo is None:
+                moment = moment.replace(tzinfo=timezone.utc)
+            return (now - moment).total_seconds(), absolute, moment
+        except ValueError:
+            pass
+    return None, re.search(r",\s*" + option + r"\s*:", fetch, re.IGNORECASE), None
+
+
+def clamp_fetch_window(stages: List[str], max_window: float) -> Tuple[List[str], Optional[float]]:
+    """
+    Clamp a fetch stage's `from:`..`to:` window (`to:` defaults to now) to at
+    most `max_window` seconds by moving `from:` towards `to:`; returns the
+    original window. Statements whose bounds cannot be parsed are left alone.
+    """
+    if not stages or command_of(stages[0]) != "fetch":
+        return stages, None
+
+    fetch = stages[0]
+    now = datetime.now(timezone.utc)
+    start_ago, start, _ = _fetch_bound(fetch, "from", now)
+    end_ago, end, end_time = _fetch_bound(fetch, "to", now)
+    if start_ago is None or (end is not None and end_ago is None):
+        return stages, None
+
+    window = start_ago - (end_ago or 0.0)
+    if window <= max_window:
+        return stages, None
+
+    if end_time is not None:
+        clamped_start = f'"{(end_time - timedelta(seconds=max_window)).isoformat()}"'
+    else:
+        clamped_start = f"now()-{format_duration((end_ago or 0.0) + max_window)}"
+    fetch = fetch[:start.start()] + start.group(1) + clamped_start + fetch[start.end():]
+    return [fetch] + stages[1:], window
+
+
+def _added_field_names(stage: str) -> List[str]:
+    """Names assigned by a fieldsAdd stage, e.g. `fieldsAdd x = a + b, y = c`"""
+    body = re.sub(r"^\s*fieldsAdd\s+", "", stage, flags=re.IGNORECASE)
+    return [m.group(1) for m in re.finditer(r"([\w.]+)\s*=(?!=)", body)]
+
+
+def referenced_fields(stages: List[str]) -> set:
+    """
+    Field names referenced after the fetch stage. String literals, numbers,
+    function names, command keywords and operators are not fields.
+    """
+    fields = set()
+    for stage in stages[1:]:
+        body = re.sub(r'"(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\'', " ", stage)
+        body = re.sub(r"^\s*[A-Za-z]+", " ", body)
+        for match in re.finditer(r"`([^`]+)`|([A-Za-z_][\w.]*)(\s*\()?", body):
+            if match.group(1):
+                fields.add(match.group(1))
+            elif not match.group(3) and match.group(2).lower() not in NON_FIELD_WORDS:
+                fields.add(match.group(2))
+    return fields
+
+
+def push_filters_down(stages: List[str]) -> Tuple[List[str], int]:
+    """
+    Move `filter`/`filterOut` stages towards the data source.
+
+    A filter may hop over `sort` (order does not affect which rows match) and over
+    `fieldsAdd` stages whose new fields it does not reference. It never crosses
+    commands that change row membership or shape (limit, summarize, dedup, ...).
+    """
+    stages = list(stages)
+    moves = 0
+    for index in range(1, len(stages)):
+        if command_of(stages[index]) not in ("filter", "filterout"):
+            continue
+        position = index
+        while position > 1:
+            previous = stages[position - 1]
+            command = command_of(previous)
+            if command == "sort":
+                pass
+            elif command == "fieldsadd":
+                names = _added_field_names(previous)
+                if not names or any(re.search(rf"\b{re.escape(n)}\b", stages[position]) for n in names):
+                    break
+            else:
+                break
+            stages[position - 1], stages[position] = stages[position], previous
+            position -= 1
+            moves += 1
+    return stages, moves
+
+
+def optimize_dql(
+    statement: str,
+    timeframe: str = "",
+    max_window_hours: Optional[float] = None,
+    default_limit: int = DEFAULT_LIMIT
+) -> Dict[str, Any]:
+    """
+    Rewrite a DQL statement for cheaper, faster Grail scans.
+
+    Returns a dict with the rewritten `statement` and `timeframe`, the list of
+    `changes` applied and an `estimated_savings` summary. Statements that are not
+    plain `fetch` pipelines are returned unchanged.
+    """
+    stages = split_pipeline(statement)
+    changes: List[str] = []
+    savings: Dict[str, Any] = {}
+
+    if not stages or command_of(stages[0]) != "fetch":
+        return {"statement": statement, "timeframe": timeframe, "changes": [], "estimated_savings": {}}
+
+    if max_window_hours:
+        max_window = max_window_hours * 3600
+        stages, original_window = clamp_fetch_window(stages, max_window)
+        requested = parse_lookback(timeframe)
+        if requested and requested > max_window:
+            original_window = max(original_window or 0, requested)
+            timeframe = format_duration(max_window)
+        if original_window:
+            changes.append(f"clamped timeframe from {format_duration(original_window)} to {format_duration(max_window)}")
+            savings["scan_reduction_pct"] = round(100 * (1 - max_window / original_window), 1)
+
+    stages, moves = push_filters_down(stages)
+    if moves:
+        changes.append(f"moved filters {moves} stage(s) earlier")
+
+    commands = {command_of(stage) for stage in stages}
+    data_object = stages[0].split(",")[0].split()[-1].lower()
+    projection = DEFAULT_PROJECTIONS.get(data_object)
+    # Only project when every field the statement mentions survives it; a filter or
+    # sort on another field signals the agent wants to see that field too
+    if projection and not commands & SHAPING_COMMANDS and referenced_fields(stages) <= set(projection):
+        stages.append("fields " + ", ".join(projection))
+        changes.append(f"added projection of {len(projection)} fields")
+        savings["projected_fields"] = len(projection)
+
+    if get_limit(stages) is None and not commands & {"summarize", "maketimeseries", "timeseries"}:
+        stages = ensure_limit(stages, default_limit)
+        changes.append(f"added limit {default_limit}")
+        savings["max_records"] = default_limit
+
+    rewritten = join_pipeline(stages) if changes else statement
+    if changes:
+        logger.info(
+            "DQL rewritten (%s)\n  original: %s\n  rewritten: %s\n  estimated savings: %s",
+            "; ".join(changes), statement, rewritten, savings
+        )
+    return {"statement": rewritten, "timeframe": timeframe, "changes": changes, "estimated_savings": savings}
+
+
+def default_limit_from_env() -> int:
+    """Default row limit added to unbounded queries (DT_DQL_DEFAULT_LIMIT)"""
+    try:
+        return int(os.getenv("DT_DQL_DEFAULT_LIMIT", str(DEFAULT_LIMIT)))
+    except ValueError:
+        return DEFAULT_LIMIT
+
+
+def optimizer_enabled() -> bool:
+    return os.getenv("DT_DQL_OPTIMIZER_ENABLED", "true").lower() not in ("0", "false", "no")
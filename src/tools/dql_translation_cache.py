@@ -0,0 +1,210 @@
+"""
+DQL Translation Cache - Persistent memoization of natural-language -> DQL
+Prompts are normalized and their entity names and time ranges parameterized out,
+so "error logs from the last 6 hours for service checkout" and the same question
+for another service and window share one Davis CoPilot translation template
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Optional, Dict, Any, List, Tuple
+
+
+DEFAULT_PATH = ".cache/dql_translations.sqlite"
+DEFAULT_TTL_DAYS = 7.0
+
+TIME_UNITS = {
+    "second": "s", "seconds": "s", "sec": "s", "secs": "s",
+    "minute": "m", "minutes": "m", "min": "m", "mins": "m",
+    "hour": "h", "hours": "h", "hr": "h", "hrs": "h",
+    "day": "d", "days": "d",
+    "week": "w", "weeks": "w",
+}
+
+TIME_RANGE_PATTERN = re.compile(
+    r"\b(?:last|past|previous)\s+(?:(\d+)\s*)?(" + "|".join(sorted(TIME_UNITS, key=len, reverse=True)) + r")\b",
+    re.IGNORECASE
+)
+ENTITY_ID_PATTERN = re.compile(r"\b([A-Z_]+-[0-9A-F]{8,})\b")
+QUOTED_PATTERN = re.compile(r"[\"'`]([^\"'`]+)[\"'`]")
+ENTITY_KEYWORD_PATTERN = re.compile(
+    r"\b(service|host|process(?:[- ]group)?|application|app|pod|namespace|workload|cluster|container)"
+    r"\s+(?:named\s+|called\s+)?([A-Za-z0-9][\w.\-]*[\w])",
+    re.IGNORECASE
+)
+ENTITY_SUFFIX_PATTERN = re.compile(
+    r"\bthe\s+([A-Za-z0-9][\w.\-]*[\w])\s+(service|host|application|app|pod|namespace|workload|cluster)\b",
+    re.IGNORECASE
+)
+NOT_ENTITY_WORDS = {"the", "a", "an", "all", "any", "each", "every", "with", "for", "in", "on", "from", "of", "logs"}
+
+
+def _placeholder(name: str) -> str:
+    return "${" + name + "}"
+
+
+def parameterize_prompt(prompt: str) -> Tuple[str, Dict[str, str]]:
+    """
+    Normalize a prompt and replace time ranges and entity names with placeholders.
+
+    Returns the template and the extracted parameter values, e.g.
+    ("error logs from the ${timeframe} for service ${entity_0}", {"timeframe": "6h", "entity_0": "checkout"}).
+    """
+    params: Dict[str, str] = {}
+    text = " ".join(prompt.split())
+
+    match = TIME_RANGE_PATTERN.search(text)
+    if match:
+        params["timeframe"] = f"{match.group(1) or 1}{TIME_UNITS[match.group(2).lower()]}"
+        text = text[:match.start()] + "last " + _placeholder("timeframe") + text[match.end():]
+
+    entities: List[str] = []
+
+    def _entity(value: str) -> str:
+        if value not in entities:
+            entities.append(value)
+        return _placeholder(f"entity_{entities.index(value)}")
+
+    text = ENTITY_ID_PATTERN.sub(lambda m: _entity(m.group(1)), text)
+    text = QUOTED_PATTERN.sub(lambda m: _entity(m.group(1)), text)
+    text = ENTITY_KEYWORD_PATTERN.sub(
+        lambda m: m.group(0) if m.group(2).lower() in NOT_ENTITY_WORDS or m.group(2).startswith("$")
+        else f"{m.group(1)} {_entity(m.group(2))}",
+        text
+    )
+    text = ENTITY_SUFFIX_PATTERN.sub(
+        lambda m: m.group(0) if m.group(1).lower() in NOT_ENTITY_WORDS
+        else f"the {_entity(m.group(1))} {m.group(2)}",
+        text
+    )
+    for index, value in enumerate(entities):
+        params[f"entity_{index}"] = value
+
+    template = text.lower().rstrip(" ?.!")
+    for name in params:
+        template = template.replace(_placeholder(name).lower(), _placeholder(name))
+    return template, params
+
+
+def _duration_pattern(duration: str) -> re.Pattern:
+    return re.compile(rf"(?<![\w.]){re.escape(duration)}\b")
+
+
+def _value_pattern(value: str) -> re.Pattern:
+    """An entity value as a whole token, never as part of a longer name such as checkout-v2"""
+    return re.compile(rf"(?<![\w.\-]){re.escape(value)}(?![\w.\-])")
+
+
+def templatize_response(response: str, params: Dict[str, str]) -> Optional[str]:
+    """Replace parameter values in a translation with placeholders, or None if any value is missing"""
+    templated = response
+    for name, value in params.items():
+        pattern = _duration_pattern(value) if name == "timeframe" else _value_pattern(value)
+        if not pattern.search(templated):
+            return None
+        templated = pattern.sub(lambda _: _placeholder(name), templated)
+    return templated
+
+
+def bind_template(template: str, params: Dict[str, str]) -> str:
+    """Re-bind a stored translation template to new parameter values"""
+    bound = template
+    for name, value in params.items():
+        bound = bound.replace(_placeholder(name), value)
+    return bound
+
+
+class DQLTranslationCache:
+    """
+    SQLite-backed store of translations keyed on the parameterized prompt.
+
+    A translation is stored as a reusable template only when every parameter
+    value could be located in the generated DQL; otherwise it is stored under the
+    exact normalized prompt so only identical questions reuse it. Keys are scoped
+    by environment, since entity names and schemas differ between tenants.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, ttl_days: float = DEFAULT_TTL_DAYS):
+        self.path = path
+        self.ttl = ttl_days * 86400
+        self._lock = threading.Lock()
+        self.stats = {"template_hits": 0, "exact_hits": 0, "misses": 0, "stored_templates": 0}
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            "key TEXT PRIMARY KEY, template TEXT, parameterized INTEGER, created_at REAL)"
+        )
+        self._db.execute("DELETE FROM translations WHERE created_at < ?", (time.time() - self.ttl,))
+        self._db.commit()
+
+    def _get(self, key: str) -> Optional[str]:
+        row = self._db.execute(
+            "SELECT template, created_at FROM translations WHERE key = ?", (key,)
+        ).fetchone()
+        if row and row[1] >= time.time() - self.ttl:
+            return row[0]
+        return None
+
+    @staticmethod
+    def _key(kind: str, key: str, environment: str) -> str:
+        # The default environment keeps unprefixed keys so existing caches stay valid
+        return f"{environment}|{kind}:{key}" if environment else f"{kind}:{key}"
+
+    def get(self, prompt: str, environment: str = "") -> Optional[str]:
+        """Return a translation for the prompt, re-bound to its parameters, or None"""
+        template_key, params = parameterize_prompt(prompt)
+        with self._lock:
+            template = self._get(self._key("template", template_key, environment))
+            if template is not None:
+                self.stats["template_hits"] += 1
+                return bind_template(template, params)
+
+            exact = self._get(self._key("exact", bind_template(template_key, params), environment))
+            if exact is not None:
+                self.stats["exact_hits"] += 1
+                return exact
+
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, prompt: str, response: str, environment: str = "") -> None:
+        """Store a fresh translation"""
+        template_key, params = parameterize_prompt(prompt)
+        templated = templatize_response(response, params) if params else None
+
+        with self._lock:
+            if templated is not None:
+                key, value, parameterized = self._key("template", template_key, environment), templated, 1
+                self.stats["stored_templates"] += 1
+            else:
+                exact_key = bind_template(template_key, params)
+                key, value, parameterized = self._key("exact", exact_key, environment), response, 0
+            self._db.execute(
+                "INSERT OR REPLACE INTO translations (key, template, parameterized, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, parameterized, time.time())
+            )
+            self._db.commit()
+
+
+_translation_cache: Optional[DQLTranslationCache] = None
+_translation_cache_lock = threading.Lock()
+
+
+def get_translation_cache() -> Optional[DQLTranslationCache]:
+    """Process-wide translation cache, or None when DT_DQL_TRANSLATION_CACHE_ENABLED=false"""
+    global _translation_cache
+    if os.getenv("DT_DQL_TRANSLATION_CACHE_ENABLED", "true").lower() in ("0", "false", "no"):
+        return None
+    with _translation_cache_lock:
+        if _translation_cache is None:
+            _translation_cache = DQLTranslationCache(
+                path=os.getenv("DT_DQL_TRANSLATION_CACHE_PATH", DEFAULT_PATH),
+                ttl_days=float(os.getenv("DT_DQL_TRANSLATION_TTL_DAYS", str(DEFAULT_TTL_DAYS)))
+            )
+        return _translation_cache
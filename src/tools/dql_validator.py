@@ -0,0 +1,167 @@
+"""
+DQL Validator - Cheap validation of DQL before it is executed
+Combines a local syntax pre-check with the MCP server's `verify_dql` tool and
+memoizes verdicts per normalized statement, so invalid queries fail fast and
+previously validated queries skip the check entirely
+"""
+
+import json
+import re
+import threading
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional, Tuple
+
+from .dql import split_pipeline, command_of
+from .mcp_cache import normalize_whitespace
+
+
+# Commands that may start a DQL statement
+SOURCE_COMMANDS = {
+    "fetch", "timeseries", "data", "describe", "smartscapenodes", "smartscapeedges", "load"
+}
+
+DEFAULT_MEMO_SIZE = 1024
+
+Verdict = Tuple[bool, str]
+
+
+def local_syntax_check(statement: str) -> Optional[str]:
+    """Return an error message for obviously malformed DQL, or None if it looks plausible"""
+    if not statement or not statement.strip():
+        return "DQL statement is empty"
+
+    pairs = {")": "(", "]": "[", "}": "{"}
+    stack = []
+    quote: Optional[str] = None
+    segment_has_content = False
+    for index, char in enumerate(statement):
+        if quote:
+            if char == quote and statement[index - 1] != "\\":
+                quote = None
+            continue
+        if char == "|" and not stack:
+            if not segment_has_content:
+                return f"Empty pipeline stage before '|' at position {index}"
+            segment_has_content = False
+            continue
+        if not char.isspace():
+            segment_has_content = True
+        if char in ("\"", "'", "`"):
+            quote = char
+        elif char in "([{":
+            stack.append(char)
+        elif char in pairs:
+            if not stack or stack.pop() != pairs[char]:
+                return f"Unbalanced '{char}' at position {index}"
+    if quote:
+        return f"Unterminated string literal ({quote})"
+    if stack:
+        return f"Unclosed '{stack[-1]}'"
+    if not segment_has_content:
+        return "Statement ends with an empty pipeline stage (trailing '|')"
+
+    # Command names beyond the source are left to verify_dql, which knows the full grammar
+    stages = split_pipeline(statement)
+    if command_of(stages[0]) not in SOURCE_COMMANDS:
+        return f"Statement must start with a data source command such as 'fetch', got '{stages[0].split()[0]}'"
+    return None
+
+
+# Explicit verdicts in verify_dql output: a `"valid": true` field (also embedded in
+# text) or the server's "The DQL statement is valid/invalid" sentence
+VALID_FIELD_PATTERN = re.compile(r"[\"']?\bvalid[\"']?\s*[:=]\s*[\"']?(true|false)\b", re.IGNORECASE)
+VERDICT_SENTENCE_PATTERN = re.compile(r"\b(?:statement|query)\s+is\s+(valid|invalid|not\s+valid)\b", re.IGNORECASE)
+
+
+def _find_valid_field(payload) -> Optional[dict]:
+    """The (possibly nested) JSON object carrying a boolean `valid` field"""
+    if isinstance(payload, dict):
+        if isinstance(payload.get("valid"), bool):
+            return payload
+        payload = list(payload.values())
+    if isinstance(payload, list):
+        for item in payload:
+            found = _find_valid_field(item)
+            if found is not None:
+                return found
+    return None
+
+
+def parse_verify_response(text: str) -> Verdict:
+    """
+    Interpret a verify_dql response as (valid, message). The structured verdict
+    is used when present; keywords such as "invalid" only decide when the
+    response carries no explicit validity, since a valid statement's hints or
+    field values may mention them.
+    """
+    try:
+        payload = _find_valid_field(json.loads(text))
+        if payload is not None:
+            return payload["valid"], json.dumps(payload.get("notifications", ""))
+    except (ValueError, TypeError):
+        pass
+
+    field = VALID_FIELD_PATTERN.search(text)
+    if field:
+        return field.group(1).lower() == "true", text.strip()
+    sentence = VERDICT_SENTENCE_PATTERN.search(text)
+    if sentence:
+        return sentence.group(1).lower() == "valid", text.strip()
+
+    lowered = text.lower()
+    if "❌" in text or re.search(r"\b(invalid|not valid|syntax error)\b", lowered):
+        return False, text.strip()
+    return True, text.strip()
+
+
+class DQLValidator:
+    """
+    Memoizing validator. Verdicts are cached per normalized statement in a
+    bounded LRU; verification failures of the server itself are not memoized and
+    never block execution.
+    """
+
+    def __init__(
+        self,
+        verify: Callable[[str], Awaitable[str]],
+        memo_size: int = DEFAULT_MEMO_SIZE
+    ):
+        self.verify = verify
+        self.memo_size = memo_size
+        self._memo: "OrderedDict[str, Verdict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"memo_hits": 0, "local_rejections": 0, "server_checks": 0, "server_rejections": 0}
+
+    def _remember(self, key: str, verdict: Verdict) -> Verdict:
+        with self._lock:
+            self._memo[key] = verdict
+            self._memo.move_to_end(key)
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+        return verdict
+
+    async def validate(self, statement: str) -> Verdict:
+        """Return (valid, message) for a DQL statement"""
+        key = normalize_whitespace(statement)
+        with self._lock:
+            verdict = self._memo.get(key)
+            if verdict is not None:
+                self._memo.move_to_end(key)
+                self.stats["memo_hits"] += 1
+                return verdict
+
+        error = local_syntax_check(statement)
+        if error:
+            self.stats["local_rejections"] += 1
+            return self._remember(key, (False, error))
+
+        self.stats["server_checks"] += 1
+        try:
+            verdict = parse_verify_response(await self.verify(statement))
+        except Exception as e:
+            # Could not verify - let execution decide rather than blocking the query
+            return True, f"verification unavailable: {e}"
+
+        if not verdict[0]:
+            self.stats["server_rejections"] += 1
+        return self._remember(key, verdict)
@@ -5,56 +5,409 @@ These tools connect to the MCP server and call the available tools
 
 import asyncio
 import os
-from typing import Optional, Dict, Any
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Callable, Tuple
 from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 
+from .async_runtime import get_runtime
+from .mcp_cache import get_tool_cache, make_cache_key
+from .mcp_session_pool import (
+    MCP_AVAILABLE,
+    MCPSessionPool,
+    pool_size_from_env,
+    healthcheck_interval_from_env
+)
+from .single_flight import SingleFlight
+from .entity_batcher import EntityLookupBatcher, batch_window_from_env
+from .grail_budget import get_budget_meter, downscope_statement
+from .dql_optimizer import optimize_dql, optimizer_enabled, default_limit_from_env
+from .dql_validator import DQLValidator
+from .dql_translation_cache import get_translation_cache
+from .result_buffer import (
+    get_buffer_store,
+    buffer_result,
+    query_buffer,
+    iter_record_pages,
+    inline_max_chars_from_env
+)
+from .log_templates import LogTemplateMiner, format_templates
+from .output_compactor import compacted, get_output_compactor
+from .environments import DEFAULT_ENVIRONMENT, get_environment
+from .rate_limiter import limited_async, is_rate_limited
+from .deadline import DeadlineExceeded, tool_call_timeout
+from .circuit_breaker import (
+    CircuitBreaker,
+    MCPUnavailableError,
+    breaker_enabled,
+    is_backend_failure,
+    failure_threshold_from_env,
+    reset_timeout_from_env
+)
+from .request_hedger import RequestHedger, hedged_tools_from_env, hedge_budget_from_env, min_samples_from_env
+
 load_dotenv()
 
-try:
-    from mcp import ClientSession, StdioServerParameters
-    from mcp.client.stdio import stdio_client
-    MCP_AVAILABLE = True
-except ImportError:
-    MCP_AVAILABLE = False
+if not MCP_AVAILABLE:
     print("⚠️  MCP library not installed. Install with: pip install mcp")
 
 
-async def call_mcp_tool(tool_name: str, arguments: Dict[str, Any]) -> Any:
-    """Call an MCP tool - creates new connection each time"""
-    dt_environment = os.getenv("DT_ENVIRONMENT")
-    dt_token = os.getenv("DT_PLATFORM_TOKEN")
+# Per-environment state; "" is the default environment from the process env
+_session_pools: Dict[str, MCPSessionPool] = {}
+_entity_batchers: Dict[str, EntityLookupBatcher] = {}
+_dql_validators: Dict[str, DQLValidator] = {}
+_circuit_breakers: Dict[str, CircuitBreaker] = {}
+_request_hedgers: Dict[str, RequestHedger] = {}
+_registry_lock = threading.Lock()
+_single_flight = SingleFlight()
+
+# Conversational tools whose identical prompts should still get independent answers
+NON_COALESCED_TOOLS = {"chat_with_davis_copilot"}
+
+DEFAULT_DQL_BATCH_CONCURRENCY = 4
+DEFAULT_DQL_BATCH_MAX_QUERIES = 20
+
+# Dynatrace entity IDs, e.g. SERVICE-1A2B3C4D5E6F7890 or PROCESS_GROUP_INSTANCE-...
+ENTITY_ID_PATTERN = re.compile(r"[A-Z][A-Z_]*-[0-9A-F]{8,}")
+
+
+def dql_batch_concurrency_from_env() -> int:
+    """Queries of one batch executed at the same time (DT_DQL_BATCH_CONCURRENCY)"""
+    try:
+        return max(1, int(os.getenv("DT_DQL_BATCH_CONCURRENCY", str(DEFAULT_DQL_BATCH_CONCURRENCY))))
+    except ValueError:
+        return DEFAULT_DQL_BATCH_CONCURRENCY
+
+
+def dql_batch_max_queries_from_env() -> int:
+    """Most queries one batch call may run (DT_DQL_BATCH_MAX_QUERIES)"""
+    try:
+        return max(1, int(os.getenv("DT_DQL_BATCH_MAX_QUERIES", str(DEFAULT_DQL_BATCH_MAX_QUERIES))))
+    except ValueError:
+        return DEFAULT_DQL_BATCH_MAX_QUERIES
+
+
+def get_session_pool(environment: str = DEFAULT_ENVIRONMENT) -> MCPSessionPool:
+    """Return the MCP session pool of an environment, creating it on first use"""
+    with _registry_lock:
+        pool = _session_pools.get(environment)
+        if pool is None:
+            config = get_environment(environment)
+            pool = _session_pools[environment] = MCPSessionPool(
+                size=config.pool_size if config and config.pool_size else pool_size_from_env(),
+                healthcheck_interval=healthcheck_interval_from_env(),
+                server_env=config.server_env() if config else None
+            )
+            get_runtime().add_shutdown_hook(pool.close)
+        return pool
+
+
+async def _probe_backend(environment: str = DEFAULT_ENVIRONMENT) -> bool:
+    """Half-open probe of the circuit breaker: one get_environment_info call, past the breaker"""
+    result = await get_session_pool(environment).call_tool(
+        "get_environment_info", {}, timeout=tool_call_timeout("get_environment_info", environment)
+    )
+    return not getattr(result, "isError", False)
+
+
+# Tools whose timeouts mean a slow query rather than a backend in trouble
+SLOW_QUERY_TOOLS = {"execute_dql"}
+
+
+def get_circuit_breaker(environment: str = DEFAULT_ENVIRONMENT) -> Optional[CircuitBreaker]:
+    """Return the MCP circuit breaker of an environment; None when DT_MCP_BREAKER_ENABLED is off"""
+    if not breaker_enabled():
+        return None
+    with _registry_lock:
+        breaker = _circuit_breakers.get(environment)
+        if breaker is None:
+            breaker = _circuit_breakers[environment] = CircuitBreaker(
+                environment or os.getenv("DT_ENVIRONMENT", "") or "default",
+                failure_threshold=failure_threshold_from_env(),
+                reset_timeout=reset_timeout_from_env(),
+                probe=lambda: _probe_backend(environment)
+            )
+        return breaker
+
+
+def get_request_hedger(environment: str = DEFAULT_ENVIRONMENT) -> RequestHedger:
+    """Return the request hedger of an environment; tools opt in with DT_HEDGED_TOOLS"""
+    with _registry_lock:
+        hedger = _request_hedgers.get(environment)
+        if hedger is None:
+            hedger = _request_hedgers[environment] = RequestHedger(
+                hedged_tools_from_env(),
+                budget=hedge_budget_from_env(),
+                min_samples=min_samples_from_env()
+            )
+        return hedger
+
+
+async def call_mcp_tool(
+    tool_name: str,
+    arguments: Dict[str, Any],
+    environment: str = DEFAULT_ENVIRONMENT
+) -> Any:
+    """
+    Call an MCP tool on a pooled, long-lived server session of the environment,
+    within the environment's rate and adaptive concurrency limits. The call is
+    abandoned after the tool's timeout or when the run's deadline passes, and
+    refused with MCPUnavailableError while the environment's breaker is open.
+    Opted-in tools are hedged on a second session when slower than their p95.
+    """
+    tool_call_timeout(tool_name, environment)  # Fail fast once the run deadline has passed
+    breaker = get_circuit_breaker(environment)
+    if breaker is not None:
+        await breaker.before_call()
+    pool = get_session_pool(environment)
+    # A window wider than the pool would only queue calls inside the pool, unseen by the limiter
+    async with limited_async(f"mcp:{environment or 'default'}", max_concurrency=pool.size) as outcome:
+        hedger = get_request_hedger(environment)
+        
+        def make_call():
+            return pool.call_tool(tool_name, arguments, timeout=tool_call_timeout(tool_name, environment))
+        
+        try:
+            if hedger.enabled_for(tool_name):
+                result = await hedger.call(tool_name, make_call, can_hedge=pool.has_spare)
+            else:
+                result = await make_call()
+        except DeadlineExceeded:
+            raise
+        except TimeoutError as e:
+            if breaker is not None and tool_name not in SLOW_QUERY_TOOLS:
+                breaker.record_failure(e)
+            raise
+        except Exception as e:
+            if breaker is not None:
+                breaker.record_failure(e)
+            raise
+        error_text = result_to_text(result) if getattr(result, "isError", False) else ""
+        if breaker is not None:
+            # A tool error or a 429 still means the backend is reachable - unless
+            # it reports that the credentials or the tenant connection failed
+            if error_text and is_backend_failure(error_text):
+                breaker.record_failure(RuntimeError(error_text[:200]))
+            else:
+                breaker.record_success()
+        if error_text and is_rate_limited(text=error_text):
+            outcome["rate_limited"] = True
+        return result
+
+
+def _scoped(arguments: Dict[str, Any], environment: str) -> Dict[str, Any]:
+    """Arguments used for cache and coalescing keys, so tenants never share results"""
+    return dict(arguments, __environment=environment) if environment else arguments
+
+
+def run_async(coro, timeout: Optional[float] = None):
+    """Run a coroutine on the shared background event loop and wait for its result"""
+    return get_runtime().run(coro, timeout=timeout)
+
+
+def result_to_text(result: Any) -> str:
+    """Extract the text payload from an MCP CallToolResult"""
+    if hasattr(result, 'content'):
+        content = result.content
+        if isinstance(content, list) and len(content) > 0:
+            return content[0].text if hasattr(content[0], 'text') else str(content[0])
     
-    if not dt_environment or not dt_token:
-        raise ValueError("DT_ENVIRONMENT and DT_PLATFORM_TOKEN must be set")
+    return str(result)
+
+
+class ToolErrorText(str):
+    """Text of a result the MCP server flagged with isError; behaves like the plain text"""
+
+
+# Errors raised before Dynatrace is reached; tools answer them without a traceback
+FAST_FAIL_ERRORS = (MCPUnavailableError, DeadlineExceeded)
+
+
+def fast_fail_message(error: BaseException) -> str:
+    """Compact, typed tool result for a call refused by the circuit breaker or the run deadline"""
+    if isinstance(error, MCPUnavailableError):
+        return (
+            f"Error [MCP_UNAVAILABLE]: {error}. Do not retry Dynatrace tools; "
+            f"report the missing data and finish with what you already have."
+        )
+    return f"Error [RUN_DEADLINE]: {error}"
+
+
+def get_single_flight() -> SingleFlight:
+    """Return the in-flight request table shared by all tools"""
+    return _single_flight
+
+
+async def fetch_tool_text(
+    tool_name: str,
+    arguments: Dict[str, Any],
+    on_upstream: Optional[Callable[[str], None]] = None,
+    environment: str = DEFAULT_ENVIRONMENT
+) -> str:
+    """
+    Return a tool's text result, served from the result cache when still fresh.
+    On a miss, concurrent identical calls share a single upstream request.
     
-    server_params = StdioServerParameters(
-        command="npx",
-        args=["-y", "@dynatrace-oss/dynatrace-mcp-server@latest"],
-        env={
-            "DT_ENVIRONMENT": dt_environment,
-            "DT_PLATFORM_TOKEN": dt_token,
-            "DT_MCP_DISABLE_TELEMETRY": "true"
-        }
+    `on_upstream` is called with the text of a successful result only when the
+    MCP server was actually queried (not for cache hits or coalesced callers).
+    """
+    cache = get_tool_cache()
+    if cache is not None:
+        cached = cache.get(tool_name, _scoped(arguments, environment))
+        if cached is not None:
+            return cached
+    
+    if tool_name in NON_COALESCED_TOOLS:
+        return await _fetch_upstream(tool_name, arguments, on_upstream, environment)
+    
+    return await _single_flight.do(
+        make_cache_key(tool_name, _scoped(arguments, environment)),
+        lambda: _fetch_upstream(tool_name, arguments, on_upstream, environment)
     )
+
+
+async def _fetch_upstream(
+    tool_name: str,
+    arguments: Dict[str, Any],
+    on_upstream: Optional[Callable[[str], None]] = None,
+    environment: str = DEFAULT_ENVIRONMENT
+) -> str:
+    """Call the MCP server and store a successful result in the cache"""
+    cache = get_tool_cache()
+    result = await call_mcp_tool(tool_name, arguments, environment)
+    text = result_to_text(result)
+    
+    # Never cache server-side errors
+    if getattr(result, 'isError', False):
+        return ToolErrorText(text)
+    if cache is not None:
+        cache.put(tool_name, _scoped(arguments, environment), text)
+    if on_upstream is not None:
+        on_upstream(text)
+    return text
+
+
+async def _fetch_entity_batch(entity_names: List[str], environment: str = DEFAULT_ENVIRONMENT) -> str:
+    """Send one batched find_entity_by_name call for the micro-batcher"""
+    result = await call_mcp_tool("find_entity_by_name", {"entityNames": entity_names}, environment)
+    text = result_to_text(result)
+    if getattr(result, 'isError', False):
+        raise RuntimeError(text)
+    return text
+
+
+def _get_entity_batcher(environment: str = DEFAULT_ENVIRONMENT) -> EntityLookupBatcher:
+    with _registry_lock:
+        batcher = _entity_batchers.get(environment)
+        if batcher is None:
+            batcher = _entity_batchers[environment] = EntityLookupBatcher(
+                lambda names: _fetch_entity_batch(names, environment),
+                window=batch_window_from_env()
+            )
+        return batcher
+
+
+async def lookup_entities(entity_names: List[str], environment: str = DEFAULT_ENVIRONMENT) -> Dict[str, str]:
+    """
+    Resolve entity names to their lookup results. Cached names are answered
+    locally; the rest join the current micro-batch. Only results attributed to
+    a name are cached for it; the others get the full batched response.
+    """
+    cache = get_tool_cache()
+    results: Dict[str, str] = {}
+    missing: List[str] = []
+    
+    for name in dict.fromkeys(entity_names):
+        key_arguments = _scoped({"entityNames": [name]}, environment)
+        cached = cache.get("find_entity_by_name", key_arguments) if cache else None
+        if cached is not None:
+            results[name] = cached
+        else:
+            missing.append(name)
     
-    # Create connection, call tool, close connection
-    async with stdio_client(server_params) as (read, write):
-        async with ClientSession(read, write) as session:
-            await session.initialize()
-            result = await session.call_tool(tool_name, arguments)
-            return result
+    if missing:
+        looked_up = await _get_entity_batcher(environment).lookup_many(missing)
+        for name, (text, attributed) in looked_up.items():
+            if not attributed:
+                results[name] = f"Result for '{name}' could not be isolated; full batched lookup response:\n{text}"
+                continue
+            if cache is not None:
+                cache.put("find_entity_by_name", _scoped({"entityNames": [name]}, environment), text)
+            results[name] = text
+    
+    return {name: results[name] for name in dict.fromkeys(entity_names)}
+
+
+async def _verify_dql(dql_statement: str, environment: str = DEFAULT_ENVIRONMENT) -> str:
+    """
+    Ask the MCP server to syntactically verify a DQL statement. A server-side
+    error (auth, connection, ...) raises, so the validator reports verification
+    as unavailable instead of reading the error text as a verdict.
+    """
+    arguments = {"dqlStatement": dql_statement}
+
+    async def verify() -> str:
+        result = await call_mcp_tool("verify_dql", arguments, environment)
+        text = result_to_text(result)
+        if getattr(result, "isError", False):
+            raise RuntimeError(text)
+        return text
 
+    return await _single_flight.do(make_cache_key("verify_dql", _scoped(arguments, environment)), verify)
 
-def run_async(coro):
-    """Helper to run async code in sync context"""
+
+def get_dql_validator(environment: str = DEFAULT_ENVIRONMENT) -> DQLValidator:
+    """Return the memoizing DQL validator shared by all DQL tools of an environment"""
+    with _registry_lock:
+        validator = _dql_validators.get(environment)
+        if validator is None:
+            validator = _dql_validators[environment] = DQLValidator(
+                lambda statement: _verify_dql(statement, environment)
+            )
+        return validator
+
+
+def invoke_mcp_tool(tool_name: str, arguments: Dict[str, Any], environment: str = DEFAULT_ENVIRONMENT) -> str:
+    """Call an MCP tool from a sync tool `_run` and return its text result"""
+    return run_async(fetch_tool_text(tool_name, arguments, environment=environment))
+
+
+async def _timed_fetch(
+    tool_name: str,
+    arguments: Dict[str, Any],
+    environment: str = DEFAULT_ENVIRONMENT
+) -> Dict[str, Any]:
+    """Fetch one tool result, capturing the outcome and latency instead of raising"""
+    start = time.monotonic()
     try:
-        loop = asyncio.get_event_loop()
-    except RuntimeError:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+        text = await fetch_tool_text(tool_name, arguments, environment=environment)
+        return {"ok": True, "text": text, "seconds": round(time.monotonic() - start, 3)}
+    except Exception as e:
+        return {"ok": False, "error": str(e), "seconds": round(time.monotonic() - start, 3)}
+
+
+def prefetch_tool_results(
+    calls: Dict[str, Dict[str, Any]],
+    environment: str = DEFAULT_ENVIRONMENT
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Run several MCP tool calls concurrently outside of any agent.
+
+    `calls` maps tool names to their arguments. Each entry of the result holds
+    `ok`, `seconds` and either `text` or `error`; one failing call never fails
+    the others.
+    """
+    async def _gather():
+        results = await asyncio.gather(*(
+            _timed_fetch(tool_name, arguments, environment) for tool_name, arguments in calls.items()
+        ))
+        return dict(zip(calls, results))
     
-    return loop.run_until_complete(coro)
+    return run_async(_gather())
 
 
 # ============================================================================
@@ -68,23 +421,19 @@ class ListProblemsTool(BaseTool):
         "Use this to identify active issues affecting services and infrastructure. "
         "Call this tool without any parameters to get all problems."
     )
+    environment: str = ""  # Dynatrace environment (tenant) to query; "" = DT_ENVIRONMENT
     
+    @compacted("list_problems")
     def _run(self) -> str:
         """List problems from Dynatrace"""
         try:
             # Call with empty arguments - MCP server will use defaults
             arguments = {}
             
-            result = run_async(call_mcp_tool("list_problems", arguments))
-            
-            # Parse and format the result
-            if hasattr(result, 'content'):
-                content = result.content
-                if isinstance(content, list) and len(content) > 0:
-                    return content[0].text if hasattr(content[0], 'text') else str(content[0])
-            
-            return str(result)
+            return invoke_mcp_tool("list_problems", arguments, self.environment)
             
+        except FAST_FAIL_ERRORS as e:
+            return fast_fail_message(e)
         except Exception as e:
             import traceback
             error_details = traceback.format_exc()
@@ -102,23 +451,19 @@ class ListVulnerabilitiesTool(BaseTool):
         "Use this to identify security risks, CVEs, and vulnerable components. "
         "Call this tool without any parameters to get all vulnerabilities with risk score >= 8.0."
     )
+    environment: str = ""  # Dynatrace environment (tenant) to query; "" = DT_ENVIRONMENT
     
+    @compacted("list_vulnerabilities")
     def _run(self) -> str:
         """List vulnerabilities from Dynatrace"""
         try:
             # Call with empty arguments - MCP server will use defaults (risk score 8.0)
             arguments = {}
             
-            result = run_async(call_mcp_tool("list_vulnerabilities", arguments))
-            
-            # Parse and format the result
-            if hasattr(result, 'content'):
-                content = result.content
-                if isinstance(content, list) and len(content) > 0:
-                    return content[0].text if hasattr(content[0], 'text') else str(content[0])
-            
-            return str(result)
+            return invoke_mcp_tool("list_vulnerabilities", arguments, self.environment)
             
+        except FAST_FAIL_ERRORS as e:
+            return fast_fail_message(e)
         except Exception as e:
             import traceback
             error_details = traceback.format_exc()
@@ -137,28 +482,309 @@ class ExecuteDQLTool(BaseTool):
         "Input should be a valid DQL query string. "
         "Example: 'fetch logs | filter status == \"ERROR\" | limit 10'"
     )
+    environment: str = ""  # Dynatrace environment (tenant) to query; "" = DT_ENVIRONMENT
+    agent_role: str = ""  # Attribution for Grail budget metering
+    max_window_hours: Optional[float] = None  # Timeframe queries are clamped to
+    
+    def _execute(self, dql_statement: str, timeframe: str = "") -> Tuple[Optional[str], str, List[str]]:
+        """
+        Validate, optimize, budget-check and execute a statement.
+        
+        Returns (response_text, executed_statement, notes); response_text is None
+        and notes holds the reason when the statement was not executed.
+        """
+        notes = []
+        
+        # Fail fast on malformed queries; verdicts are memoized per statement
+        valid, message = run_async(get_dql_validator(self.environment).validate(dql_statement))
+        if not valid:
+            return None, dql_statement, [
+                f"Error executing DQL: the statement is invalid and was not executed.\n"
+                f"Statement: {dql_statement}\nReason: {message}"
+            ]
+        
+        if optimizer_enabled():
+            rewrite = optimize_dql(
+                dql_statement,
+                timeframe,
+                max_window_hours=self.max_window_hours,
+                default_limit=default_limit_from_env()
+            )
+            dql_statement, timeframe = rewrite["statement"], rewrite["timeframe"]
+            if rewrite["changes"]:
+                notes.append(f"Query optimized ({'; '.join(rewrite['changes'])})")
+        
+        meter = get_budget_meter(self.environment)
+        decision = meter.check()
+        
+        if decision == "hard":
+            meter.record_decision(decision, self.agent_role)
+            return None, dql_statement, [
+                f"Error executing DQL: Grail scan budget exhausted for this run "
+                f"({meter.gb_scanned:.2f} of {meter.hard_limit_gb:g} GB scanned). "
+                f"No further queries will be executed; work with the data already collected."
+            ]
+        if decision == "soft":
+            dql_statement = downscope_statement(dql_statement, meter.remaining_gb)
+            meter.record_decision(decision, self.agent_role)
+            notes.append("Grail scan budget soft limit reached - query was downscoped")
+        
+        arguments = {"dqlStatement": dql_statement}
+        if timeframe:
+            arguments["timeframe"] = timeframe
+        
+        text = run_async(fetch_tool_text(
+            "execute_dql",
+            arguments,
+            on_upstream=lambda result_text: meter.record(result_text, self.agent_role),
+            environment=self.environment
+        ))
+        return text, dql_statement, notes
     
+    def _query(self, dql_statement: str, timeframe: str = "") -> Tuple[str, bool]:
+        """
+        Execute one statement and render its result as returned to the agent.
+        
+        Returns (text, ok); ok is False when the statement was refused or the
+        server answered with an error.
+        """
+        text, dql_statement, notes = self._execute(dql_statement, timeframe)
+        if text is None:
+            return notes[0], False
+        if isinstance(text, ToolErrorText):
+            return text, False
+        
+        # Large results stay in a local columnar buffer; the agent gets a
+        # bounded summary and a handle for follow-up filtering
+        if len(text) > inline_max_chars_from_env():
+            summary = buffer_result(text, dql_statement, environment=self.environment)
+            if summary is not None:
+                text = summary
+        
+        if notes:
+            return f"Note: {'. '.join(notes)}. Executed:\n{dql_statement}\n\n{text}", True
+        return text, True
+    
+    @compacted("execute_dql")
     def _run(self, dql_statement: str, timeframe: str = "") -> str:
         """Execute DQL query"""
         try:
-            arguments = {"dqlStatement": dql_statement}
-            if timeframe:
-                arguments["timeframe"] = timeframe
+            return self._query(dql_statement, timeframe)[0]
             
-            result = run_async(call_mcp_tool("execute_dql", arguments))
+        except FAST_FAIL_ERRORS as e:
+            return fast_fail_message(e)
+        except Exception as e:
+            import traceback
+            error_details = traceback.format_exc()
+            return f"Error executing DQL: {str(e)}\n\nDetails:\n{error_details}"
+
+
+class BatchExecuteDQLInput(BaseModel):
+    dql_statements: Optional[List[str]] = Field(
+        default=None, description="DQL statements to run, one result section per statement"
+    )
+    dql_template: str = Field(
+        default="", description="DQL statement containing {entity_id}, run once per entry of entity_ids"
+    )
+    entity_ids: Optional[List[str]] = Field(
+        default=None, description="Dynatrace entity IDs substituted into dql_template"
+    )
+    timeframe: str = Field(default="", description="Optional timeframe applied to every query")
+
+
+class BatchExecuteDQLTool(ExecuteDQLTool):
+    name: str = "Execute DQL Query Batch"
+    description: str = (
+        "Execute several DQL queries concurrently in one step and get every result labeled by query. "
+        "Either pass a list of statements in dql_statements, or one dql_template containing "
+        "{entity_id} plus a list of entity_ids - the template is run once per entity. "
+        "Use this instead of calling 'Execute DQL Query' once per problem or entity. "
+        "Example: dql_template='fetch logs | filter dt.entity.service == \"{entity_id}\" "
+        "| filter loglevel == \"ERROR\" | limit 50', "
+        "entity_ids=['SERVICE-1A2B3C4D5E6F7890', 'SERVICE-0987F6E5D4C3B2A1']"
+    )
+    args_schema: type[BaseModel] = BatchExecuteDQLInput
+    
+    @compacted("execute_dql_batch")
+    def _run(
+        self,
+        dql_statements: Optional[List[str]] = None,
+        dql_template: str = "",
+        entity_ids: Optional[List[str]] = None,
+        timeframe: str = ""
+    ) -> str:
+        """Execute a batch of DQL queries with bounded parallelism"""
+        try:
+            if dql_template:
+                if "{entity_id}" not in dql_template or not entity_ids:
+                    return (
+                        "Error executing DQL batch: dql_template must contain {entity_id} "
+                        "and entity_ids must list at least one entity."
+                    )
+                unique_ids = list(dict.fromkeys(e.strip() for e in entity_ids if e and e.strip()))
+                # Only well-formed IDs are spliced into the statement
+                rejected = [e for e in unique_ids if not ENTITY_ID_PATTERN.fullmatch(e)]
+                queries = [
+                    (entity_id, dql_template.replace("{entity_id}", entity_id))
+                    for entity_id in unique_ids if entity_id not in rejected
+                ]
+            else:
+                rejected = []
+                queries = [
+                    (f"query {index}", statement)
+                    for index, statement in enumerate(
+                        dict.fromkeys(s.strip() for s in (dql_statements or []) if s and s.strip()), start=1
+                    )
+                ]
+            if not queries and not rejected:
+                return "Error executing DQL batch: provide dql_statements or dql_template with entity_ids."
             
-            # Parse and format the result
-            if hasattr(result, 'content'):
-                content = result.content
-                if isinstance(content, list) and len(content) > 0:
-                    return content[0].text if hasattr(content[0], 'text') else str(content[0])
+            max_queries = dql_batch_max_queries_from_env()
+            skipped = queries[max_queries:]
+            queries = queries[:max_queries]
             
-            return str(result)
+            def run_one(statement: str) -> Tuple[str, bool]:
+                try:
+                    return self._query(statement, timeframe)
+                except FAST_FAIL_ERRORS as e:
+                    return fast_fail_message(e), False
+                except Exception as e:
+                    return f"Error executing DQL: {str(e)}", False
             
+            results = []
+            if queries:
+                # Each query is still validated, optimized and Grail-budgeted on its own;
+                # the MCP rate limiter bounds what reaches the server
+                with ThreadPoolExecutor(
+                    max_workers=min(dql_batch_concurrency_from_env(), len(queries)),
+                    thread_name_prefix="dql-batch"
+                ) as executor:
+                    results = list(executor.map(lambda query: run_one(query[1]), queries))
+            
+            sections = [
+                f"### {label}\nStatement: {statement}\n\n{result}"
+                for (label, statement), (result, _) in zip(queries, results)
+            ] + [
+                f"### {entity_id}\nError: '{entity_id}' is not a Dynatrace entity ID "
+                f"(e.g. SERVICE-1A2B3C4D5E6F7890); the query was not run."
+                for entity_id in rejected
+            ]
+            failed = sum(not ok for _, ok in results) + len(rejected)
+            total = len(queries) + len(rejected)
+            header = f"Executed {len(queries)} DQL queries ({total - failed} succeeded, {failed} failed)."
+            if skipped:
+                header += (
+                    f" {len(skipped)} more were not run (batch limit {max_queries}): "
+                    f"{', '.join(label for label, _ in skipped)}"
+                )
+            return header + "\n\n" + "\n\n".join(sections)
+            
+        except FAST_FAIL_ERRORS as e:
+            return fast_fail_message(e)
         except Exception as e:
             import traceback
             error_details = traceback.format_exc()
-            return f"Error executing DQL: {str(e)}\n\nDetails:\n{error_details}"
+            return f"Error executing DQL batch: {str(e)}\n\nDetails:\n{error_details}"
+
+
+class MineLogTemplatesTool(ExecuteDQLTool):
+    name: str = "Mine Log Templates"
+    description: str = (
+        "Cluster log lines into message templates with counts, first/last seen timestamps "
+        "and sample record numbers - far cheaper and more precise than reading raw logs. "
+        "Either pass a DQL statement over logs (it is executed with the usual optimizations; "
+        "add e.g. '| limit 10000' to mine more lines) or the handle of a buffered result. "
+        "Example: dql_statement='fetch logs, from:now()-2h | filter loglevel == \"ERROR\" | limit 10000'"
+    )
+    
+    @compacted("mine_log_templates")
+    def _run(
+        self,
+        dql_statement: str = "",
+        handle: str = "",
+        content_field: str = "content",
+        timestamp_field: str = "timestamp",
+        max_templates: int = 20
+    ) -> str:
+        """Mine templates from a DQL result"""
+        try:
+            miner = LogTemplateMiner()
+            
+            if handle:
+                buffer = get_buffer_store().get(handle, self.environment)
+                if buffer is None:
+                    return f"Error mining log templates: unknown or expired handle '{handle}'."
+                if content_field not in buffer.columns:
+                    return (
+                        f"Error mining log templates: field '{content_field}' not in buffered result. "
+                        f"Available: {', '.join(buffer.columns)}"
+                    )
+                content = buffer.columns[content_field]
+                timestamps = buffer.columns.get(timestamp_field)
+                miner.add_many(
+                    (str(content.get(i)), timestamps.get(i) if timestamps else None, i + 1)
+                    for i in range(buffer.row_count) if content.get(i) is not None
+                )
+                return format_templates(miner, int(max_templates), source=f"buffer {handle}")
+            
+            if not dql_statement:
+                return "Error mining log templates: provide a dql_statement or a buffer handle."
+            
+            text, dql_statement, notes = self._execute(dql_statement)
+            if text is None:
+                return notes[0]
+            
+            record_number = 0
+            for page in iter_record_pages(text):
+                for record in page:
+                    record_number += 1
+                    if record.get(content_field) is not None:
+                        miner.add(str(record[content_field]), record.get(timestamp_field), record_number)
+            if not record_number:
+                # Not a JSON records response - mine the raw lines
+                miner.add_many((line, None, n) for n, line in enumerate(text.splitlines(), 1) if line.strip())
+            
+            report = format_templates(miner, int(max_templates), source="query result")
+            if notes:
+                return f"Note: {'. '.join(notes)}. Executed:\n{dql_statement}\n\n{report}"
+            return report
+            
+        except FAST_FAIL_ERRORS as e:
+            return fast_fail_message(e)
+        except Exception as e:
+            import traceback
+            error_details = traceback.format_exc()
+            return f"Error mining log templates: {str(e)}\n\nDetails:\n{error_details}"
+
+
+class QueryResultBufferTool(BaseTool):
+    name: str = "Query DQL Result Buffer"
+    description: str = (
+        "Filter, group or list records of a large DQL result that was buffered locally. "
+        "Use the handle returned by 'Execute DQL Query' instead of re-running the query. "
+        "where: conditions joined with 'and', e.g. 'loglevel == \"ERROR\" and content contains timeout'. "
+        "group_by: field to count records by. fields: comma-separated fields to show. "
+        "Example: handle='dql-1a2b3c4d', where='status == \"ERROR\"', group_by='dt.entity.service'"
+    )
+    environment: str = ""  # Dynatrace environment (tenant) whose buffers are visible; "" = DT_ENVIRONMENT
+    
+    @compacted("query_result_buffer")
+    def _run(self, handle: str, where: str = "", group_by: str = "", fields: str = "", limit: int = 20) -> str:
+        """Query a buffered DQL result locally"""
+        try:
+            buffer = get_buffer_store().get(handle, self.environment)
+            if buffer is None:
+                return (
+                    f"Error querying result buffer: unknown or expired handle '{handle}'. "
+                    f"Re-run the DQL query to buffer it again."
+                )
+            field_list = [f.strip() for f in fields.split(",") if f.strip()] or None
+            return query_buffer(buffer, where=where, group_by=group_by, fields=field_list, limit=int(limit))
+            
+        except Exception as e:
+            import traceback
+            error_details = traceback.format_exc()
+            return f"Error querying result buffer: {str(e)}\n\nDetails:\n{error_details}"
 
 
 class GenerateDQLTool(BaseTool):
@@ -168,30 +794,55 @@ class GenerateDQLTool(BaseTool):
         "Use this when you need to create a DQL query but don't know the exact syntax. "
         "Example: 'Show me error logs from the payment service in the last hour'"
     )
+    environment: str = ""  # Dynatrace environment (tenant) to query; "" = DT_ENVIRONMENT
     
+    @compacted("generate_dql_from_natural_language")
     def _run(self, natural_language_query: str, context: str = "") -> str:
         """Generate DQL from natural language"""
         try:
+            # Repeat questions are answered from the persistent translation cache,
+            # re-bound to this prompt's entity names and time range
+            translations = get_translation_cache()
+            if translations is not None:
+                cached = translations.get(natural_language_query, self.environment)
+                if cached is not None:
+                    return cached
+            
             # MCP server expects "text" parameter, not "naturalLanguageQuery"
             arguments = {"text": natural_language_query}
             # Note: context is not supported by this tool
             
-            result = run_async(call_mcp_tool("generate_dql_from_natural_language", arguments))
-            
-            # Parse and format the result
-            if hasattr(result, 'content'):
-                content = result.content
-                if isinstance(content, list) and len(content) > 0:
-                    return content[0].text if hasattr(content[0], 'text') else str(content[0])
-            
-            return str(result)
+            text = invoke_mcp_tool("generate_dql_from_natural_language", arguments, self.environment)
+            if translations is not None and not isinstance(text, ToolErrorText):
+                translations.put(natural_language_query, text, self.environment)
+            return text
             
+        except FAST_FAIL_ERRORS as e:
+            return fast_fail_message(e)
         except Exception as e:
             import traceback
             error_details = traceback.format_exc()
             return f"Error generating DQL: {str(e)}\n\nDetails:\n{error_details}"
 
 
+class ReadFullToolOutputTool(BaseTool):
+    name: str = "Read Full Tool Output"
+    description: str = (
+        "Read the complete output of an earlier tool call that was truncated to save tokens. "
+        "Pass the handle from the '[Output truncated ...]' notice and a page number (starting at 1). "
+        "Example: handle='out-1a2b3c4d', page=2"
+    )
+    environment: str = ""  # Dynatrace environment (tenant) whose outputs are visible; "" = DT_ENVIRONMENT
+    
+    def _run(self, handle: str, page: int = 1) -> str:
+        """Page through a stored full output"""
+        try:
+            return get_output_compactor().read(handle, page, self.environment)
+            
+        except Exception as e:
+            return f"Error reading tool output: {str(e)}"
+
+
 # ============================================================================
 # ENTITY DISCOVERY TOOLS
 # ============================================================================
@@ -201,25 +852,29 @@ class FindEntityByNameTool(BaseTool):
     description: str = (
         "Find the entityId and type of a monitored entity (service, host, process-group, "
         "application, kubernetes-node, etc.) based on name. "
-        "Use this to discover entity IDs before querying logs or metrics for specific entities."
+        "Use this to discover entity IDs before querying logs or metrics for specific entities. "
+        "To resolve several entities at once (e.g. all affected entities of a problem listing), "
+        "pass them as a list in entity_names - they are looked up in a single round trip."
     )
+    environment: str = ""  # Dynatrace environment (tenant) to query; "" = DT_ENVIRONMENT
     
-    def _run(self, entity_name: str) -> str:
+    @compacted("find_entity_by_name")
+    def _run(self, entity_name: str = "", entity_names: Optional[List[str]] = None) -> str:
         """Find entity by name"""
         try:
-            # MCP server expects "entityNames" (array), not "entityName" (string)
-            arguments = {"entityNames": [entity_name]}
-            
-            result = run_async(call_mcp_tool("find_entity_by_name", arguments))
+            names = [n for n in [entity_name, *(entity_names or [])] if n and n.strip()]
+            if not names:
+                return "Error finding entity: provide entity_name or entity_names"
             
-            # Parse and format the result
-            if hasattr(result, 'content'):
-                content = result.content
-                if isinstance(content, list) and len(content) > 0:
-                    return content[0].text if hasattr(content[0], 'text') else str(content[0])
+            # Lookups are micro-batched into one "entityNames" array call
+            results = run_async(lookup_entities(names, self.environment))
             
-            return str(result)
+            if len(results) == 1:
+                return next(iter(results.values()))
+            return "\n\n".join(f"### {name}\n{text}" for name, text in results.items())
             
+        except FAST_FAIL_ERRORS as e:
+            return fast_fail_message(e)
         except Exception as e:
             import traceback
             error_details = traceback.format_exc()
@@ -237,7 +892,9 @@ class ChatWithDavisCopilotTool(BaseTool):
         "Use this for general guidance, best practices, or when no other specific tool is available. "
         "Example: 'How can I investigate slow database queries in Dynatrace?'"
     )
+    environment: str = ""  # Dynatrace environment (tenant) to query; "" = DT_ENVIRONMENT
     
+    @compacted("chat_with_davis_copilot")
     def _run(self, message: str, context: str = "", instruction: str = "") -> str:
         """Chat with Davis CoPilot"""
         try:
@@ -248,16 +905,10 @@ class ChatWithDavisCopilotTool(BaseTool):
             if instruction:
                 arguments["instruction"] = instruction
             
-            result = run_async(call_mcp_tool("chat_with_davis_copilot", arguments))
-            
-            # Parse and format the result
-            if hasattr(result, 'content'):
-                content = result.content
-                if isinstance(content, list) and len(content) > 0:
-                    return content[0].text if hasattr(content[0], 'text') else str(content[0])
-            
-            return str(result)
+            return invoke_mcp_tool("chat_with_davis_copilot", arguments, self.environment)
             
+        except FAST_FAIL_ERRORS as e:
+            return fast_fail_message(e)
         except Exception as e:
             import traceback
             error_details = traceback.format_exc()
@@ -274,20 +925,16 @@ class GetEnvironmentInfoTool(BaseTool):
         "Get information about the connected Dynatrace Environment and verify the connection. "
         "Use this to confirm connectivity before running other queries."
     )
+    environment: str = ""  # Dynatrace environment (tenant) to query; "" = DT_ENVIRONMENT
     
+    @compacted("get_environment_info")
     def _run(self) -> str:
         """Get environment info"""
         try:
-            result = run_async(call_mcp_tool("get_environment_info", {}))
-            
-            # Parse and format the result
-            if hasattr(result, 'content'):
-                content = result.content
-                if isinstance(content, list) and len(content) > 0:
-                    return content[0].text if hasattr(content[0], 'text') else str(content[0])
-            
-            return str(result)
+            return invoke_mcp_tool("get_environment_info", {}, self.environment)
             
+        except FAST_FAIL_ERRORS as e:
+            return fast_fail_message(e)
         except Exception as e:
             import traceback
             error_details = traceback.format_exc()
@@ -299,8 +946,12 @@ __all__ = [
     'ListProblemsTool',
     'ListVulnerabilitiesTool',
     'ExecuteDQLTool',
+    'BatchExecuteDQLTool',
+    'QueryResultBufferTool',
+    'MineLogTemplatesTool',
     'GenerateDQLTool',
     'FindEntityByNameTool',
     'ChatWithDavisCopilotTool',
-    'GetEnvironmentInfoTool'
+    'GetEnvironmentInfoTool',
+    'ReadFullToolOutputTool'
 ]
@@ -0,0 +1,177 @@
+"""
+Entity Lookup Batcher - Micro-batch `find_entity_by_name` calls
+Entity-name lookups arriving within a short window (from one or more agents) are
+sent as a single call using the tool's `entityNames` array parameter, and the
+response is split back to each caller
+"""
+
+import asyncio
+import json
+import os
+import re
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+DEFAULT_BATCH_WINDOW = 0.025
+DEFAULT_MAX_BATCH_SIZE = 50
+
+
+ENTITY_NAME_FIELDS = ("name", "entityName", "entity.name", "displayName")
+
+
+def _entity_owners(entity: Any, names: List[str]) -> List[str]:
+    """
+    Names an entity (JSON object or text line) is attributed to. Exact matches
+    win - a name field equal to the name, or the name as a whole token of a line;
+    only without one is the entity given to the longest names it contains, so
+    "cartservice" never also counts as a result for "cart".
+    """
+    if isinstance(entity, dict):
+        values = [v.lower() for v in (entity.get(k) for k in ENTITY_NAME_FIELDS) if isinstance(v, str)]
+        exact = [name for name in names if name.lower() in values]
+    else:
+        values = [str(entity).lower()]
+        exact = [
+            name for name in names
+            if re.search(rf"(?<![\w.\-]){re.escape(name.lower())}(?![\w.\-])", values[0])
+        ]
+    if exact:
+        return exact
+    contained = [name for name in names if any(name.lower() in value for value in values)]
+    longest = max((len(name) for name in contained), default=0)
+    return [name for name in contained if len(name) == longest]
+
+
+def split_entity_response(text: str, names: List[str]) -> Dict[str, Optional[str]]:
+    """
+    Split a batched `find_entity_by_name` response into one result per name.
+
+    JSON payloads are split by entity name fields; text payloads are split by the
+    lines that mention each name, keeping non-entity lines as shared context.
+    A name is None when its result cannot be attributed: nothing mentions it,
+    yet some entities match no name (the server may have matched it fuzzily).
+    A name is only reported as not found when every returned entity belongs to
+    another name.
+    """
+    if len(names) == 1:
+        return {names[0]: text}
+
+    try:
+        payload = json.loads(text)
+    except (ValueError, TypeError):
+        payload = None
+
+    if isinstance(payload, dict):
+        payload = next((v for v in payload.values() if isinstance(v, list)), None)
+    if isinstance(payload, list):
+        owners = [_entity_owners(e, names) for e in payload]
+        matches = {name: [e for e, owner in zip(payload, owners) if name in owner] for name in names}
+        leftover = not all(owners)
+        return {
+            name: json.dumps(matches[name], indent=2) if matches[name] or not leftover else None
+            for name in names
+        }
+
+    lines = text.splitlines()
+    entity_lines = [line for line in lines if line.lstrip().startswith(("-", "*", "|"))]
+    owners = [_entity_owners(line, names) for line in entity_lines]
+    if not any(owners):
+        return {name: None for name in names}
+
+    context = [line for line in lines if line not in entity_lines and line.strip()]
+    leftover = not all(owners)
+    split: Dict[str, Optional[str]] = {}
+    for name in names:
+        matches = [line for line, owner in zip(entity_lines, owners) if name in owner]
+        if matches:
+            split[name] = "\n".join(context[:1] + matches)
+        elif leftover:
+            split[name] = None
+        else:
+            split[name] = f"No monitored entity found matching '{name}'."
+    return split
+
+
+class EntityLookupBatcher:
+    """
+    Collects entity names on the async runtime loop and flushes them as one call.
+
+    A flush happens `window` seconds after the first name of a batch arrives, or
+    immediately once `max_batch_size` distinct names are pending. Duplicate names
+    within a batch are looked up once and share the result.
+    """
+
+    def __init__(
+        self,
+        fetch_batch: Callable[[List[str]], Awaitable[str]],
+        window: float = DEFAULT_BATCH_WINDOW,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE
+    ):
+        self.fetch_batch = fetch_batch
+        self.window = window
+        self.max_batch_size = max(1, max_batch_size)
+        self._pending: Dict[str, List[asyncio.Future]] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self.stats = {"lookups": 0, "batches": 0, "names_sent": 0}
+
+    async def lookup(self, name: str) -> Tuple[str, bool]:
+        """
+        Queue one entity name and wait for its share of the batched response.
+        Returns (text, attributed); a name that could not be attributed gets the
+        full batched text, which must not be cached as that name's answer.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.setdefault(name, []).append(future)
+        self.stats["lookups"] += 1
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+
+        return await future
+
+    async def lookup_many(self, names: List[str]) -> Dict[str, Tuple[str, bool]]:
+        """Resolve several names; they join the current batch together"""
+        unique = list(dict.fromkeys(names))
+        results = await asyncio.gather(*(self.lookup(name) for name in unique))
+        return dict(zip(unique, results))
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, {}
+        asyncio.ensure_future(self._send(batch))
+
+    async def _send(self, batch: Dict[str, List[asyncio.Future]]) -> None:
+        names = list(batch)
+        self.stats["batches"] += 1
+        self.stats["names_sent"] += len(names)
+        try:
+            text = await self.fetch_batch(names)
+            results = split_entity_response(text, names)
+        except Exception as e:
+            for futures in batch.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+
+        for name, futures in batch.items():
+            for future in futures:
+                if not future.done():
+                    split = results[name]
+                    future.set_result((text, False) if split is None else (split, True))
+
+
+def batch_window_from_env() -> float:
+    """Configured batching window in seconds (DT_MCP_ENTITY_BATCH_WINDOW_MS)"""
+    try:
+        return float(os.getenv("DT_MCP_ENTITY_BATCH_WINDOW_MS", str(DEFAULT_BATCH_WINDOW * 1000))) / 1000
+    except ValueError:
+        return DEFAULT_BATCH_WINDOW
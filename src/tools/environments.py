@@ -0,0 +1,110 @@
+"""
+Dynatrace Environments - Registry of the tenants the tools can talk to
+The default environment ("") comes from DT_ENVIRONMENT / DT_PLATFORM_TOKEN;
+additional named environments are loaded from a JSON fleet file so one process
+can analyze several tenants, each with its own MCP sessions and Grail budget
+"""
+
+import json
+import os
+import threading
+from typing import Optional, Dict, Any, List
+
+
+DEFAULT_ENVIRONMENTS_FILE = "environments.json"
+DEFAULT_ENVIRONMENT = ""
+
+
+class EnvironmentConfig:
+    """
+    Connection settings and limits for one Dynatrace tenant.
+
+    `token` may be given directly or via `token_env`, the name of the variable
+    holding it, so fleet files can be committed without secrets.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        url: str,
+        token: Optional[str] = None,
+        token_env: Optional[str] = None,
+        grail_budget_gb: Optional[float] = None,
+        grail_soft_limit_gb: Optional[float] = None,
+        pool_size: Optional[int] = None
+    ):
+        self.name = name
+        self.url = url
+        self.token_env = token_env
+        self._token = token
+        self.grail_budget_gb = grail_budget_gb
+        self.grail_soft_limit_gb = grail_soft_limit_gb
+        self.pool_size = pool_size
+
+    @property
+    def token(self) -> Optional[str]:
+        return self._token or (os.getenv(self.token_env) if self.token_env else None)
+
+    def server_env(self) -> Dict[str, str]:
+        """Variables handed to this tenant's MCP server processes"""
+        if not self.url or not self.token:
+            raise ValueError(
+                f"Environment '{self.name}' needs a url and a token"
+                + (f" (is {self.token_env} set?)" if self.token_env else "")
+            )
+        return {"DT_ENVIRONMENT": self.url, "DT_PLATFORM_TOKEN": self.token}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "EnvironmentConfig":
+        if not data.get("name") or not data.get("url"):
+            raise ValueError(f"Environment entries need 'name' and 'url': {data}")
+        return cls(
+            name=data["name"],
+            url=data["url"],
+            token=data.get("token"),
+            token_env=data.get("token_env"),
+            grail_budget_gb=data.get("grail_budget_gb"),
+            grail_soft_limit_gb=data.get("grail_soft_limit_gb"),
+            pool_size=data.get("pool_size")
+        )
+
+
+_environments: Dict[str, EnvironmentConfig] = {}
+_environments_lock = threading.Lock()
+
+
+def register_environment(config: EnvironmentConfig) -> EnvironmentConfig:
+    with _environments_lock:
+        _environments[config.name] = config
+    return config
+
+
+def get_environment(name: str = DEFAULT_ENVIRONMENT) -> Optional[EnvironmentConfig]:
+    """Registered config for a named environment; None for the default (process env) one"""
+    if not name:
+        return None
+    with _environments_lock:
+        config = _environments.get(name)
+    if config is None:
+        raise KeyError(f"Unknown Dynatrace environment '{name}'")
+    return config
+
+
+def load_environments(path: Optional[str] = None) -> List[EnvironmentConfig]:
+    """
+    Load and register the environments in a fleet file (DT_ENVIRONMENTS_FILE).
+
+    The file holds a list of objects, or {"environments": [...]}, each with
+    name, url, token or token_env and optional grail_budget_gb,
+    grail_soft_limit_gb and pool_size.
+    """
+    path = path or os.getenv("DT_ENVIRONMENTS_FILE", DEFAULT_ENVIRONMENTS_FILE)
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    entries = data.get("environments", []) if isinstance(data, dict) else data
+
+    configs = [EnvironmentConfig.from_dict(entry) for entry in entries]
+    names = [config.name for config in configs]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate environment names in {path}")
+    return [register_environment(config) for config in configs]
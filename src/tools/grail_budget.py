@@ -0,0 +1,178 @@
+"""
+Grail Budget Meter - Metering and enforcement of Grail scan volume
+Records bytes scanned and records returned per DQL query (as reported by the
+MCP server), keeps running totals per run and per agent, and tells
+ExecuteDQLTool when to downscope or refuse queries
+"""
+
+import json
+import os
+import re
+import threading
+from typing import Optional, Dict, Any
+
+from .dql import split_pipeline, join_pipeline, ensure_limit, set_fetch_option
+from .environments import get_environment
+
+
+BYTES_PER_GB = 1_000_000_000
+UNIT_FACTORS = {"b": 1, "kb": 1e3, "mb": 1e6, "gb": 1e9, "tb": 1e12}
+
+DEFAULT_BUDGET_GB = 1000.0
+DEFAULT_SOFT_LIMIT_RATIO = 0.8
+DOWNSCOPED_MAX_RECORDS = 100
+
+
+def _to_number(raw: str) -> float:
+    return float(raw.replace(",", "").replace("_", ""))
+
+
+def parse_scan_stats(text: str) -> Dict[str, Optional[float]]:
+    """
+    Extract scan statistics from an execute_dql response.
+
+    Understands both the server's markdown summary ("Scanned Bytes: 1.2 GB",
+    "Scanned Records: 1,234") and JSON metadata (`scannedBytes`, `scannedRecords`).
+    Records returned are counted from the JSON records array when present.
+    """
+    stats: Dict[str, Optional[float]] = {
+        "bytes_scanned": None, "records_scanned": None, "records_returned": None
+    }
+
+    match = re.search(r"scanned\W*bytes\W*([\d.,_]+)\s*([kmgt]?b)?", text, re.IGNORECASE)
+    if match:
+        unit = (match.group(2) or "b").lower()
+        stats["bytes_scanned"] = _to_number(match.group(1)) * UNIT_FACTORS[unit]
+
+    match = re.search(r"scanned\W*records\W*([\d.,_]+)", text, re.IGNORECASE)
+    if match:
+        stats["records_scanned"] = _to_number(match.group(1))
+
+    start = text.find("[")
+    if start != -1:
+        try:
+            records = json.loads(text[start:text.rfind("]") + 1])
+            if isinstance(records, list):
+                stats["records_returned"] = float(len(records))
+        except ValueError:
+            pass
+    if stats["records_returned"] is None:
+        match = re.search(r"([\d,]+)\s+records?\b", text, re.IGNORECASE)
+        if match:
+            stats["records_returned"] = _to_number(match.group(1))
+
+    return stats
+
+
+def _empty_totals() -> Dict[str, float]:
+    return {
+        "queries": 0, "bytes_scanned": 0.0, "records_scanned": 0.0,
+        "records_returned": 0.0, "refused": 0, "downscoped": 0
+    }
+
+
+class GrailBudgetMeter:
+    """
+    Running Grail scan totals for the current run, overall and per agent.
+
+    Once the run has scanned `soft_limit_gb`, queries are downscoped (row limit
+    and `scanLimitGBytes` on the fetch); at `hard_limit_gb` they are refused.
+    """
+
+    def __init__(self, hard_limit_gb: float = DEFAULT_BUDGET_GB, soft_limit_gb: Optional[float] = None):
+        self.hard_limit_gb = hard_limit_gb
+        self.soft_limit_gb = soft_limit_gb if soft_limit_gb is not None else hard_limit_gb * DEFAULT_SOFT_LIMIT_RATIO
+        self._lock = threading.Lock()
+        self.start_run()
+
+    def start_run(self) -> None:
+        """Reset the per-run totals"""
+        with self._lock:
+            self._run = _empty_totals()
+            self._by_agent: Dict[str, Dict[str, float]] = {}
+
+    @property
+    def gb_scanned(self) -> float:
+        return self._run["bytes_scanned"] / BYTES_PER_GB
+
+    @property
+    def remaining_gb(self) -> float:
+        return max(0.0, self.hard_limit_gb - self.gb_scanned)
+
+    def check(self) -> str:
+        """'ok', 'soft' (downscope) or 'hard' (refuse) for the next query"""
+        scanned = self.gb_scanned
+        if scanned >= self.hard_limit_gb:
+            return "hard"
+        if scanned >= self.soft_limit_gb:
+            return "soft"
+        return "ok"
+
+    def _agent_totals(self, agent: str) -> Dict[str, float]:
+        return self._by_agent.setdefault(agent or "unattributed", _empty_totals())
+
+    def record(self, text: str, agent: str = "") -> Dict[str, Optional[float]]:
+        """Record the scan statistics reported in an execute_dql response"""
+        stats = parse_scan_stats(text)
+        with self._lock:
+            for totals in (self._run, self._agent_totals(agent)):
+                totals["queries"] += 1
+                for field in ("bytes_scanned", "records_scanned", "records_returned"):
+                    totals[field] += stats[field] or 0.0
+        return stats
+
+    def record_decision(self, decision: str, agent: str = "") -> None:
+        """Count a refused or downscoped query"""
+        field = {"hard": "refused", "soft": "downscoped"}.get(decision)
+        if not field:
+            return
+        with self._lock:
+            self._run[field] += 1
+            self._agent_totals(agent)[field] += 1
+
+    def summary(self) -> Dict[str, Any]:
+        """Totals for the run metadata"""
+        def _format(totals: Dict[str, float]) -> Dict[str, Any]:
+            formatted = {k: int(v) for k, v in totals.items()}
+            formatted["gb_scanned"] = round(totals["bytes_scanned"] / BYTES_PER_GB, 4)
+            return formatted
+
+        with self._lock:
+            return {
+                "hard_limit_gb": self.hard_limit_gb,
+                "soft_limit_gb": self.soft_limit_gb,
+                "status": self.check(),
+                "run": _format(self._run),
+                "by_agent": {agent: _format(totals) for agent, totals in self._by_agent.items()}
+            }
+
+
+_meters: Dict[str, GrailBudgetMeter] = {}
+_meter_lock = threading.Lock()
+
+
+def get_budget_meter(environment: str = "") -> GrailBudgetMeter:
+    """
+    Meter for one environment. The default environment is configured from
+    DT_GRAIL_QUERY_BUDGET_GB / DT_GRAIL_QUERY_SOFT_LIMIT_GB; named environments
+    use their own budget from the fleet file when set.
+    """
+    with _meter_lock:
+        meter = _meters.get(environment)
+        if meter is None:
+            hard = float(os.getenv("DT_GRAIL_QUERY_BUDGET_GB", str(DEFAULT_BUDGET_GB)))
+            soft_env = os.getenv("DT_GRAIL_QUERY_SOFT_LIMIT_GB")
+            soft = float(soft_env) if soft_env else None
+            config = get_environment(environment)
+            if config is not None and config.grail_budget_gb is not None:
+                hard, soft = config.grail_budget_gb, config.grail_soft_limit_gb
+            meter = _meters[environment] = GrailBudgetMeter(hard_limit_gb=hard, soft_limit_gb=soft)
+        return meter
+
+
+def downscope_statement(dql_statement: str, remaining_gb: float) -> str:
+    """Cap rows returned and bytes scanned so a query fits the remaining budget"""
+    stages = split_pipeline(dql_statement)
+    stages = ensure_limit(stages, DOWNSCOPED_MAX_RECORDS)
+    stages = set_fetch_option(stages, "scanLimitGBytes", f"{max(remaining_gb, 0.1):g}")
+    return join_pipeline(stages)
@@ -0,0 +1,177 @@
+"""
+Log Template Miner - Drain-style streaming clustering of log lines into templates
+Variable parts (numbers, IDs, IPs, hex, UUIDs) are masked and lines are routed
+through a fixed-depth prefix tree to a small set of candidate clusters, so each
+line costs a few dictionary lookups and hundreds of thousands of lines cluster
+in seconds
+"""
+
+import re
+from typing import Optional, Dict, Any, List, Iterable, Tuple
+
+
+WILDCARD = "<*>"
+
+DEFAULT_DEPTH = 4
+DEFAULT_SIMILARITY = 0.4
+DEFAULT_MAX_CHILDREN = 100
+DEFAULT_SAMPLE_IDS = 3
+
+# Applied in order; earlier masks win over later, more general ones
+MASKS: List[Tuple[re.Pattern, str]] = [
+    (re.compile(r"\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b"), "<UUID>"),
+    (re.compile(r"\b\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?\b"), "<TS>"),
+    (re.compile(r"\b(?:\d{1,3}\.){3}\d{1,3}(?::\d+)?\b"), "<IP>"),
+    (re.compile(r"\b[A-Z_]+-[0-9A-F]{8,}\b"), "<ENTITY>"),
+    (re.compile(r"\b0x[0-9a-fA-F]+\b|\b[0-9a-fA-F]{16,}\b"), "<HEX>"),
+    (re.compile(r"(?<![\w.])[-+]?\d+(?:\.\d+)?(?:ms|s|kb|mb|gb|%)?(?![\w.])", re.IGNORECASE), "<NUM>"),
+]
+
+
+def mask_line(line: str) -> str:
+    for pattern, token in MASKS:
+        line = pattern.sub(token, line)
+    return line
+
+
+class LogCluster:
+    """One template and the statistics of the lines it absorbed"""
+
+    __slots__ = ("cluster_id", "tokens", "count", "first_seen", "last_seen", "sample_ids")
+
+    def __init__(self, cluster_id: int, tokens: List[str]):
+        self.cluster_id = cluster_id
+        self.tokens = tokens
+        self.count = 0
+        self.first_seen: Any = None
+        self.last_seen: Any = None
+        self.sample_ids: List[Any] = []
+
+    @property
+    def template(self) -> str:
+        return " ".join(self.tokens)
+
+    def observe(self, timestamp: Any, record_id: Any, max_samples: int) -> None:
+        self.count += 1
+        if timestamp is not None:
+            if self.first_seen is None or timestamp < self.first_seen:
+                self.first_seen = timestamp
+            if self.last_seen is None or timestamp > self.last_seen:
+                self.last_seen = timestamp
+        if record_id is not None and len(self.sample_ids) < max_samples:
+            self.sample_ids.append(record_id)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "template": self.template,
+            "count": self.count,
+            "first_seen": self.first_seen,
+            "last_seen": self.last_seen,
+            "sample_ids": list(self.sample_ids),
+        }
+
+
+class LogTemplateMiner:
+    """
+    Streaming Drain clustering (He et al., ICWS 2017).
+
+    Lines are grouped by token count, then by their first `depth - 2` tokens
+    (tokens containing digits share a wildcard branch); within a leaf the most
+    similar cluster absorbs the line if at least `similarity` of its tokens
+    match, otherwise a new cluster is started. Identical masked lines are
+    memoized so repeated messages skip the tree entirely.
+    """
+
+    def __init__(
+        self,
+        depth: int = DEFAULT_DEPTH,
+        similarity: float = DEFAULT_SIMILARITY,
+        max_children: int = DEFAULT_MAX_CHILDREN,
+        max_samples: int = DEFAULT_SAMPLE_IDS
+    ):
+        self.depth = max(depth, 3)
+        self.similarity = similarity
+        self.max_children = max_children
+        self.max_samples = max_samples
+        self.clusters: List[LogCluster] = []
+        self.lines = 0
+        self._root: Dict[Any, Any] = {}
+        self._memo: Dict[str, LogCluster] = {}
+
+    def _leaf(self, tokens: List[str]) -> List[LogCluster]:
+        node = self._root.setdefault(len(tokens), {})
+        for token in tokens[:self.depth - 2]:
+            key = WILDCARD if any(c.isdigit() for c in token) or token.startswith("<") else token
+            if key not in node:
+                key = key if len(node) < self.max_children else WILDCARD
+            node = node.setdefault(key, {})
+        return node.setdefault(None, [])
+
+    @staticmethod
+    def _score(template: List[str], tokens: List[str]) -> Tuple[float, int]:
+        same = wildcards = 0
+        for a, b in zip(template, tokens):
+            if a == WILDCARD:
+                wildcards += 1
+            elif a == b:
+                same += 1
+        return same / len(tokens), wildcards
+
+    def add(self, line: str, timestamp: Any = None, record_id: Any = None) -> LogCluster:
+        """Cluster one log line and return its cluster"""
+        self.lines += 1
+        masked = mask_line(line.strip())
+        cluster = self._memo.get(masked)
+
+        if cluster is None:
+            tokens = masked.split() or [""]
+            leaf = self._leaf(tokens)
+            best, best_score = None, (-1.0, -1)
+            for candidate in leaf:
+                score = self._score(candidate.tokens, tokens)
+                if score > best_score:
+                    best, best_score = candidate, score
+
+            if best is not None and best_score[0] >= self.similarity:
+                best.tokens = [a if a == b else WILDCARD for a, b in zip(best.tokens, tokens)]
+                cluster = best
+            else:
+                cluster = LogCluster(len(self.clusters) + 1, tokens)
+                self.clusters.append(cluster)
+                leaf.append(cluster)
+            if len(self._memo) < 100_000:
+                self._memo[masked] = cluster
+
+        cluster.observe(timestamp, record_id, self.max_samples)
+        return cluster
+
+    def add_many(self, lines: Iterable[Tuple[str, Any, Any]]) -> None:
+        """Cluster (line, timestamp, record_id) tuples"""
+        for line, timestamp, record_id in lines:
+            self.add(line, timestamp, record_id)
+
+    def top(self, limit: int = 20) -> List[LogCluster]:
+        return sorted(self.clusters, key=lambda c: c.count, reverse=True)[:limit]
+
+
+def format_templates(miner: LogTemplateMiner, limit: int = 20, source: str = "") -> str:
+    """Text report of the most frequent templates"""
+    if not miner.lines:
+        return f"No log lines found to mine{f' in {source}' if source else ''}."
+
+    lines = [
+        f"Mined {miner.lines} log lines{f' from {source}' if source else ''} into "
+        f"{len(miner.clusters)} templates (showing top {min(limit, len(miner.clusters))}):"
+    ]
+    for rank, cluster in enumerate(miner.top(limit), 1):
+        share = 100 * cluster.count / miner.lines
+        seen = ""
+        if cluster.first_seen is not None:
+            seen = f" | first seen {cluster.first_seen} | last seen {cluster.last_seen}"
+        samples = f" | sample records {cluster.sample_ids}" if cluster.sample_ids else ""
+        template = cluster.template if len(cluster.template) <= 300 else cluster.template[:297] + "..."
+        lines.append(f"{rank}. [{cluster.count} lines, {share:.1f}%{seen}{samples}]\n   {template}")
+    if len(miner.clusters) > limit:
+        rest = sum(c.count for c in miner.clusters) - sum(c.count for c in miner.top(limit))
+        lines.append(f"... {len(miner.clusters) - limit} more templates covering {rest} lines")
+    return "\n".join(lines)
@@ -0,0 +1,251 @@
+"""
+MCP Result Cache - TTL + LRU cache for Dynatrace MCP tool results
+Entries are keyed on the tool name plus canonicalized arguments, expire after a
+per-tool TTL, and can optionally be persisted to SQLite to survive restarts
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
+
+
+# Seconds each tool's results stay fresh. 0 disables caching for that tool.
+DEFAULT_TTLS: Dict[str, float] = {
+    "get_environment_info": 3600,
+    "list_problems": 120,
+    "list_vulnerabilities": 600,
+    "find_entity_by_name": 1800,
+    "execute_dql": 300,
+    "generate_dql_from_natural_language": 3600,
+    "chat_with_davis_copilot": 0,
+}
+DEFAULT_MAX_ENTRIES = 512
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+
+def normalize_whitespace(text: str) -> str:
+    """Strip and collapse whitespace runs, leaving quoted string literals untouched"""
+    text = text.strip()
+    out = []
+    quote: Optional[str] = None
+    pending_space = False
+
+    for index, char in enumerate(text):
+        if quote:
+            out.append(char)
+            if char == quote and text[index - 1] != "\\":
+                quote = None
+            continue
+        if char.isspace():
+            pending_space = True
+            continue
+        if pending_space and out:
+            out.append(" ")
+        pending_space = False
+        out.append(char)
+        if char in ("\"", "'"):
+            quote = char
+
+    return "".join(out)
+
+
+def canonicalize(value: Any) -> Any:
+    """Canonical form of tool arguments so equivalent calls share a cache key"""
+    if isinstance(value, dict):
+        return {str(k): canonicalize(v) for k, v in sorted(value.items()) if v not in (None, "")}
+    if isinstance(value, (list, tuple)):
+        return [canonicalize(v) for v in value]
+    if isinstance(value, str):
+        return normalize_whitespace(value)
+    return value
+
+
+def make_cache_key(tool_name: str, arguments: Dict[str, Any]) -> str:
+    """Stable key for a tool call: tool name plus canonical JSON arguments"""
+    return tool_name + ":" + json.dumps(canonicalize(arguments), sort_keys=True, separators=(",", ":"))
+
+
+def ttls_from_env() -> Dict[str, float]:
+    """Per-tool TTLs, overridable with DT_MCP_CACHE_TTLS="list_problems=60,execute_dql=0" """
+    ttls = dict(DEFAULT_TTLS)
+    for item in os.getenv("DT_MCP_CACHE_TTLS", "").split(","):
+        if "=" not in item:
+            continue
+        tool_name, _, seconds = item.partition("=")
+        try:
+            ttls[tool_name.strip()] = float(seconds)
+        except ValueError:
+            continue
+    return ttls
+
+
+class ToolResultCache:
+    """
+    Thread-safe in-memory LRU with per-entry expiry and an optional SQLite store.
+
+    The in-memory tier is bounded by both entry count and total text size; the
+    disk tier is consulted on a memory miss and repopulates the memory tier.
+    """
+
+    def __init__(
+        self,
+        ttls: Optional[Dict[str, float]] = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        path: Optional[str] = None
+    ):
+        self.ttls = ttls if ttls is not None else dict(DEFAULT_TTLS)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.path = path
+        self._entries: "OrderedDict[str, Tuple[str, float, str]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._stats: Dict[str, Any] = {
+            "hits": 0, "misses": 0, "disk_hits": 0, "evictions": 0, "expired": 0, "by_tool": {}
+        }
+
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS tool_results ("
+                "key TEXT PRIMARY KEY, tool TEXT, value TEXT, expires_at REAL)"
+            )
+            self._db.execute("DELETE FROM tool_results WHERE expires_at < ?", (time.time(),))
+            self._db.commit()
+
+    def ttl_for(self, tool_name: str) -> float:
+        return self.ttls.get(tool_name, 0)
+
+    def _count(self, tool_name: str, field: str) -> None:
+        self._stats[field] += 1
+        per_tool = self._stats["by_tool"].setdefault(tool_name, {"hits": 0, "misses": 0})
+        per_tool[field] += 1
+
+    def get(self, tool_name: str, arguments: Dict[str, Any]) -> Optional[str]:
+        """Return a fresh cached result, or None on a miss"""
+        if self.ttl_for(tool_name) <= 0:
+            return None
+
+        key = make_cache_key(tool_name, arguments)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at, _ = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._count(tool_name, "hits")
+                    return value
+                self._drop(key)
+                self._stats["expired"] += 1
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, expires_at FROM tool_results WHERE key = ?", (key,)
+                ).fetchone()
+                if row and row[1] > now:
+                    self._store(key, row[0], row[1], tool_name)
+                    self._stats["disk_hits"] += 1
+                    self._count(tool_name, "hits")
+                    return row[0]
+
+            self._count(tool_name, "misses")
+            return None
+
+    def put(self, tool_name: str, arguments: Dict[str, Any], value: str) -> None:
+        """Store a result under the tool's TTL"""
+        ttl = self.ttl_for(tool_name)
+        if ttl <= 0:
+            return
+
+        key = make_cache_key(tool_name, arguments)
+        expires_at = time.time() + ttl
+
+        with self._lock:
+            self._store(key, value, expires_at, tool_name)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO tool_results (key, tool, value, expires_at) VALUES (?, ?, ?, ?)",
+                    (key, tool_name, value, expires_at)
+                )
+                self._db.commit()
+
+    def _store(self, key: str, value: str, expires_at: float, tool_name: str) -> None:
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = (value, expires_at, tool_name)
+        self._bytes += len(value)
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self._stats["evictions"] += 1
+
+    def _drop(self, key: str) -> None:
+        value, _, _ = self._entries.pop(key)
+        self._bytes -= len(value)
+
+    def invalidate(self, tool_name: Optional[str] = None) -> None:
+        """Drop every entry, or only the entries of one tool"""
+        with self._lock:
+            for key in [k for k, v in self._entries.items() if tool_name in (None, v[2])]:
+                self._drop(key)
+            if self._db is not None:
+                if tool_name is None:
+                    self._db.execute("DELETE FROM tool_results")
+                else:
+                    self._db.execute("DELETE FROM tool_results WHERE tool = ?", (tool_name,))
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of the cumulative hit/miss counters"""
+        with self._lock:
+            snapshot = json.loads(json.dumps(self._stats))
+            snapshot["entries"] = len(self._entries)
+            snapshot["bytes"] = self._bytes
+            return snapshot
+
+
+def stats_delta(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Any]:
+    """Counters accumulated between two stats() snapshots, e.g. for a single run"""
+    delta: Dict[str, Any] = {
+        field: after.get(field, 0) - before.get(field, 0)
+        for field in ("hits", "misses", "disk_hits", "evictions", "expired")
+    }
+    delta["by_tool"] = {}
+    for tool_name, counts in after.get("by_tool", {}).items():
+        previous = before.get("by_tool", {}).get(tool_name, {})
+        hits = counts["hits"] - previous.get("hits", 0)
+        misses = counts["misses"] - previous.get("misses", 0)
+        if hits or misses:
+            delta["by_tool"][tool_name] = {"hits": hits, "misses": misses}
+    lookups = delta["hits"] + delta["misses"]
+    delta["hit_rate"] = round(delta["hits"] / lookups, 3) if lookups else 0.0
+    return delta
+
+
+_cache: Optional[ToolResultCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_tool_cache() -> Optional[ToolResultCache]:
+    """Process-wide result cache configured from the environment, or None when disabled"""
+    global _cache
+    if os.getenv("DT_MCP_CACHE_ENABLED", "true").lower() in ("0", "false", "no"):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ToolResultCache(
+                ttls=ttls_from_env(),
+                max_entries=int(os.getenv("DT_MCP_CACHE_MAX_ENTRIES", str(DEFAULT_MAX_ENTRIES))),
+                max_bytes=int(os.getenv("DT_MCP_CACHE_MAX_BYTES", str(DEFAULT_MAX_BYTES))),
+                path=os.getenv("DT_MCP_CACHE_PATH") or None
+            )
+        return _cache
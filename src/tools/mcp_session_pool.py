@@ -0,0 +1,320 @@
+"""
+MCP Session Pool - Long-lived, pooled connections to the Dynatrace MCP Server
+Keeps a small set of initialized sessions open so each tool call costs a single
+JSON-RPC round trip instead of an `npx` spawn plus handshake
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Optional, Dict, Any, List, Deque
+
+try:
+    from mcp import ClientSession, StdioServerParameters
+    from mcp.client.stdio import stdio_client
+    MCP_AVAILABLE = True
+except ImportError:
+    MCP_AVAILABLE = False
+
+
+DEFAULT_POOL_SIZE = 2
+DEFAULT_HEALTHCHECK_INTERVAL = 60.0
+DEFAULT_CONNECT_TIMEOUT = 120.0
+MIN_CALL_TIMEOUT = 1.0
+
+
+def build_server_params(env: Optional[Dict[str, str]] = None) -> "StdioServerParameters":
+    """
+    Build the stdio parameters used to launch the Dynatrace MCP server.
+    `env` overrides the process environment, e.g. with another tenant's
+    DT_ENVIRONMENT / DT_PLATFORM_TOKEN.
+    """
+    server_env = {
+        "DT_ENVIRONMENT": os.getenv("DT_ENVIRONMENT", ""),
+        "DT_PLATFORM_TOKEN": os.getenv("DT_PLATFORM_TOKEN", ""),
+        "DT_MCP_DISABLE_TELEMETRY": "true"
+    }
+    if env:
+        server_env.update(env)
+
+    if not server_env["DT_ENVIRONMENT"] or not server_env["DT_PLATFORM_TOKEN"]:
+        raise ValueError("DT_ENVIRONMENT and DT_PLATFORM_TOKEN must be set")
+
+    return StdioServerParameters(
+        command="npx",
+        args=["-y", "@dynatrace-oss/dynatrace-mcp-server@latest"],
+        env=server_env
+    )
+
+
+class PooledSession:
+    """
+    A single MCP server process with an initialized ClientSession.
+
+    The stdio transport uses anyio cancel scopes that must be entered and exited
+    from the same task, so each session is owned by a dedicated runner task that
+    holds the context managers open until close() is requested.
+    """
+
+    def __init__(self, server_params: "StdioServerParameters", connect_timeout: float):
+        self.server_params = server_params
+        self.connect_timeout = connect_timeout
+        self.session: Optional["ClientSession"] = None
+        self.last_used = 0.0
+        self.calls = 0
+        self._ready = asyncio.Event()
+        self._closing = asyncio.Event()
+        self._error: Optional[BaseException] = None
+        self._runner: Optional[asyncio.Task] = None
+
+    @property
+    def alive(self) -> bool:
+        return (
+            self.session is not None
+            and self._runner is not None
+            and not self._runner.done()
+        )
+
+    async def open(self) -> None:
+        """Start the server process and wait for the MCP handshake"""
+        self._runner = asyncio.create_task(self._run())
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout=self.connect_timeout)
+        except asyncio.TimeoutError:
+            await self.close()
+            raise TimeoutError(
+                f"MCP server did not initialize within {self.connect_timeout:.0f}s"
+            )
+        if self._error is not None:
+            raise self._error
+        self.last_used = time.monotonic()
+
+    async def _run(self) -> None:
+        try:
+            async with stdio_client(self.server_params) as (read, write):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    self.session = session
+                    self._ready.set()
+                    await self._closing.wait()
+        except Exception as e:
+            self._error = e
+        finally:
+            self.session = None
+            self._ready.set()
+
+    async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
+        if not self.alive:
+            raise ConnectionError("MCP session is not connected")
+        result = await self.session.call_tool(tool_name, arguments)
+        self.last_used = time.monotonic()
+        self.calls += 1
+        return result
+
+    async def ping(self) -> bool:
+        """Cheap liveness check using the MCP ping request"""
+        if not self.alive:
+            return False
+        try:
+            await asyncio.wait_for(self.session.send_ping(), timeout=10.0)
+            self.last_used = time.monotonic()
+            return True
+        except Exception:
+            return False
+
+    async def close(self) -> None:
+        self._closing.set()
+        if self._runner is not None and not self._runner.done():
+            try:
+                await asyncio.wait_for(self._runner, timeout=10.0)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                self._runner.cancel()
+        self.session = None
+
+
+class MCPSessionPool:
+    """
+    Fixed-size pool of MCP sessions bound to one event loop.
+
+    Every borrower holds one of `size` slots, so at most `size` sessions exist.
+    Sessions are created lazily, health-checked with a ping when they have been
+    idle longer than `healthcheck_interval`, and transparently replaced when a
+    call fails because the underlying server went away. A slot is handed back
+    even when its session could not be replaced, so a waiting caller can open
+    a new session instead of waiting for one that will never return.
+    """
+
+    def __init__(
+        self,
+        size: int = DEFAULT_POOL_SIZE,
+        healthcheck_interval: float = DEFAULT_HEALTHCHECK_INTERVAL,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        server_env: Optional[Dict[str, str]] = None
+    ):
+        if not MCP_AVAILABLE:
+            raise ImportError("MCP library not installed. Install with: pip install mcp")
+
+        self.size = max(1, size)
+        self.healthcheck_interval = healthcheck_interval
+        self.connect_timeout = connect_timeout
+        self.server_env = server_env
+        self._slots = asyncio.Semaphore(self.size)
+        self._idle: Deque[PooledSession] = deque()
+        self._sessions: List[PooledSession] = []
+        self._closed = False
+        self.stats = {"connects": 0, "reconnects": 0, "calls": 0, "failed_healthchecks": 0, "timeouts": 0}
+
+    async def _connect(self) -> PooledSession:
+        pooled = PooledSession(build_server_params(self.server_env), self.connect_timeout)
+        await pooled.open()
+        self.stats["connects"] += 1
+        return pooled
+
+    async def acquire(self, timeout: Optional[float] = None) -> PooledSession:
+        """
+        Borrow a healthy session, creating one if no idle session is left.
+        Waiting for a free slot is bounded by `timeout` (TimeoutError).
+        """
+        if self._closed:
+            raise RuntimeError("MCP session pool is closed")
+
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"No MCP session became free within {timeout:.1f}s")
+
+        try:
+            if self._closed:
+                raise RuntimeError("MCP session pool is closed")
+            if self._idle:
+                pooled = self._idle.popleft()
+            else:
+                pooled = await self._connect()
+                self._sessions.append(pooled)
+
+            idle_for = time.monotonic() - pooled.last_used
+            if not pooled.alive or (idle_for > self.healthcheck_interval and not await pooled.ping()):
+                self.stats["failed_healthchecks"] += 1
+                pooled = await self._replace(pooled)
+            return pooled
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def has_spare(self) -> bool:
+        """True when a call could start now without waiting for a busy session"""
+        return not self._slots.locked()
+
+    def release(self, pooled: Optional[PooledSession] = None) -> None:
+        """Return a borrowed slot, with its session unless that session was dropped"""
+        if pooled is not None and pooled in self._sessions and not self._closed:
+            self._idle.append(pooled)
+        self._slots.release()
+
+    async def _replace(self, pooled: PooledSession) -> PooledSession:
+        await pooled.close()
+        try:
+            fresh = await self._connect()
+        except BaseException:
+            if pooled in self._sessions:
+                self._sessions.remove(pooled)
+            raise
+        self.stats["reconnects"] += 1
+        self._sessions[self._sessions.index(pooled)] = fresh
+        return fresh
+
+    async def _recycle(self, pooled: PooledSession) -> None:
+        """Kill a session whose call was abandoned and put a fresh one in its place"""
+        try:
+            fresh = await self._replace(pooled)
+        except Exception:
+            self.release()
+            return
+        self.release(fresh)
+
+    async def call_tool(
+        self,
+        tool_name: str,
+        arguments: Dict[str, Any],
+        timeout: Optional[float] = None
+    ) -> Any:
+        """
+        Call a tool on a pooled session, reconnecting once if the session died.
+
+        `timeout` covers both waiting for a free session and the call itself.
+        A call still running when it expires (or cancelled by its caller) is
+        abandoned: its server process is terminated and replaced in the
+        background, since a stuck server would otherwise poison the session.
+        """
+        started = time.monotonic()
+        pooled: Optional[PooledSession] = await self.acquire(timeout)
+        if timeout is not None:
+            timeout = max(MIN_CALL_TIMEOUT, timeout - (time.monotonic() - started))
+        abandoned = False
+        try:
+            for attempt in range(2):
+                try:
+                    result = await asyncio.wait_for(pooled.call_tool(tool_name, arguments), timeout=timeout)
+                    break
+                except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+                    abandoned = True
+                    self.stats["timeouts"] += 1
+                    asyncio.get_running_loop().create_task(self._recycle(pooled))
+                    if isinstance(e, asyncio.CancelledError):
+                        raise
+                    raise TimeoutError(f"MCP tool '{tool_name}' did not respond within {timeout:.1f}s")
+                except Exception:
+                    if attempt or (pooled.alive and await pooled.ping()):
+                        raise
+                    # The server process went away - reconnect and retry once
+                    try:
+                        pooled = await self._replace(pooled)
+                    except BaseException:
+                        pooled = None
+                        raise
+            self.stats["calls"] += 1
+            return result
+        finally:
+            # An abandoned session's slot is handed back by _recycle
+            if not abandoned:
+                self.release(pooled)
+
+    async def warm_up(self) -> int:
+        """
+        Open the pool to full size and health-check every session, so the next
+        burst of calls pays no connection setup. Returns the number of sessions.
+        """
+        borrowed = []
+        try:
+            for _ in range(self.size):
+                borrowed.append(await self.acquire())
+        finally:
+            for pooled in borrowed:
+                self.release(pooled)
+        return len(self._sessions)
+
+    async def close(self) -> None:
+        """Shut down every session in the pool and fail any caller still waiting for one"""
+        self._closed = True
+        sessions, self._sessions = self._sessions, []
+        self._idle.clear()
+        for _ in range(self.size):
+            self._slots.release()
+        await asyncio.gather(*(s.close() for s in sessions), return_exceptions=True)
+
+
+def pool_size_from_env() -> int:
+    """Configured pool size (DT_MCP_POOL_SIZE)"""
+    try:
+        return int(os.getenv("DT_MCP_POOL_SIZE", str(DEFAULT_POOL_SIZE)))
+    except ValueError:
+        return DEFAULT_POOL_SIZE
+
+
+def healthcheck_interval_from_env() -> float:
+    """Configured idle time before a session is pinged (DT_MCP_HEALTHCHECK_INTERVAL)"""
+    try:
+        return float(os.getenv("DT_MCP_HEALTHCHECK_INTERVAL", str(DEFAULT_HEALTHCHECK_INTERVAL)))
+    except ValueError:
+        return DEFAULT_HEALTHCHECK_INTERVAL
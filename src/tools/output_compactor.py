@@ -0,0 +1,344 @@
+"""
+Tool Output Compactor - Token-budgeted compaction of tool results for the LLM
+Collapses Python tracebacks to one line, dedupes repeated rows, and truncates
+JSON and tables structurally (whole items and rows, never mid-token) until the
+output fits the tool's token budget. The full text stays available through a
+"more available" handle, and tokens saved are counted per call and per tool
+"""
+
+import functools
+import json
+import logging
+import os
+import re
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Callable, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+
+DEFAULT_TOKEN_BUDGET = 2000
+DEFAULT_TOKEN_BUDGETS: Dict[str, int] = {
+    "list_problems": 3000,
+    "list_vulnerabilities": 3000,
+    "execute_dql": 2500,
+    "execute_dql_batch": 5000,
+    "mine_log_templates": 2000,
+    "query_result_buffer": 1500,
+    "find_entity_by_name": 1000,
+    "generate_dql_from_natural_language": 800,
+    "chat_with_davis_copilot": 1500,
+    "get_environment_info": 600,
+}
+DEFAULT_MAX_STORED = 50
+PAGE_TOKENS = 2000
+MAX_STRING_CHARS = 500
+
+TRACEBACK_PATTERN = re.compile(r"Traceback \(most recent call last\):\n(?:[ \t]+.*\n)*(?P<error>.*)")
+FRAME_PATTERN = re.compile(r'File "([^"]+)", line (\d+), in (\S+)')
+
+_encoding: Any = None
+_encoding_failed = False
+
+
+def estimate_tokens(text: str) -> int:
+    """Token count with tiktoken when its encoding is available, else ~4 characters per token"""
+    global _encoding, _encoding_failed
+    if TIKTOKEN_AVAILABLE and not _encoding_failed:
+        try:
+            if _encoding is None:
+                _encoding = tiktoken.get_encoding("o200k_base")
+            return len(_encoding.encode(text, disallowed_special=()))
+        except Exception:
+            # Encoding files are downloaded on first use; offline we fall back
+            _encoding_failed = True
+    return (len(text) + 3) // 4
+
+
+def collapse_tracebacks(text: str) -> str:
+    """Replace each Python traceback with one line naming the exception and its innermost frame"""
+    def _collapse(match: re.Match) -> str:
+        frames = FRAME_PATTERN.findall(match.group(0))
+        where = f" (at {os.path.basename(frames[-1][0])}:{frames[-1][1]} in {frames[-1][2]})" if frames else ""
+        error = (match.group("error") or "exception").strip()
+        return f"[traceback collapsed] {error}{where}"
+    return TRACEBACK_PATTERN.sub(_collapse, text)
+
+
+def dedupe_lines(text: str) -> str:
+    """Collapse runs of identical lines and repeated table rows into one line with a count"""
+    out: List[str] = []
+    seen_rows: Dict[str, int] = {}
+    previous, run = None, 0
+
+    def _flush():
+        if previous is not None:
+            out.append(previous if run == 1 else f"{previous}  (x{run})")
+
+    for line in text.split("\n"):
+        if line.lstrip().startswith("|") and not set(line.strip()) <= set("|-: "):
+            if line in seen_rows:
+                seen_rows[line] += 1
+                continue
+            seen_rows[line] = 1
+        if line == previous and line.strip():
+            run += 1
+            continue
+        _flush()
+        previous, run = line, 1
+    _flush()
+
+    if any(count > 1 for count in seen_rows.values()):
+        out = [f"{line}  (x{seen_rows[line]})" if seen_rows.get(line, 1) > 1 else line for line in out]
+    return "\n".join(out)
+
+
+def _dedupe_items(items: List[Any]) -> List[Any]:
+    counts: "OrderedDict[str, List[Any]]" = OrderedDict()
+    for item in items:
+        key = json.dumps(item, sort_keys=True, default=str)
+        if key in counts:
+            counts[key][1] += 1
+        else:
+            counts[key] = [item, 1]
+    if len(counts) == len(items):
+        return items
+    return [
+        dict(item, _repeated=count) if count > 1 and isinstance(item, dict) else item
+        for item, count in counts.values()
+    ]
+
+
+def _shrink(value: Any, max_items: int) -> Any:
+    """Keep the first `max_items` of every list (with a marker) and cap long strings"""
+    if isinstance(value, list):
+        value = _dedupe_items(value)
+        kept = [_shrink(item, max_items) for item in value[:max_items]]
+        if len(value) > max_items:
+            kept.append(f"... {len(value) - max_items} more items")
+        return kept
+    if isinstance(value, dict):
+        return {key: _shrink(item, max_items) for key, item in value.items()}
+    if isinstance(value, str) and len(value) > MAX_STRING_CHARS:
+        return value[:MAX_STRING_CHARS] + f"... ({len(value) - MAX_STRING_CHARS} more chars)"
+    return value
+
+
+def _find_json(text: str) -> Optional[Dict[str, Any]]:
+    """Locate the largest parseable JSON document in the text"""
+    for match in re.finditer(r"[\[{]", text):
+        start = match.start()
+        try:
+            value, end = json.JSONDecoder().raw_decode(text, start)
+        except ValueError:
+            continue
+        if isinstance(value, (list, dict)) and end - start > len(text) // 4:
+            return {"value": value, "start": start, "end": end}
+    return None
+
+
+def _truncate_json(text: str, budget: int) -> Optional[str]:
+    found = _find_json(text)
+    if found is None:
+        return None
+    prefix, suffix = text[:found["start"]], text[found["end"]:]
+
+    low, high, best = 1, 200, None
+    while low <= high:
+        max_items = (low + high) // 2
+        candidate = prefix + json.dumps(_shrink(found["value"], max_items), indent=1, default=str) + suffix
+        if estimate_tokens(candidate) <= budget:
+            best, low = candidate, max_items + 1
+        else:
+            high = max_items - 1
+    return best
+
+
+def _truncate_lines(text: str, budget: int) -> str:
+    """Keep leading lines (and any table header) up to the budget, noting how many rows were dropped"""
+    lines = text.split("\n")
+    header = []
+    for index, line in enumerate(lines[:-1]):
+        if line.lstrip().startswith("|") and set(lines[index + 1].strip()) <= set("|-: ") and lines[index + 1].strip():
+            header = [line, lines[index + 1]]
+            break
+
+    kept: List[str] = []
+    used = 0
+    for line in lines:
+        cost = estimate_tokens(line) + 1
+        if used + cost > budget:
+            break
+        kept.append(line)
+        used += cost
+    if len(kept) < len(lines):
+        dropped = len(lines) - len(kept)
+        if header and header[0] not in kept:
+            kept = header + kept
+        if not kept:
+            kept = [lines[0][:budget * 4]]
+        kept.append(f"... {dropped} more lines")
+    return "\n".join(kept)
+
+
+class OutputStore:
+    """Bounded LRU of full tool outputs that were truncated, with handles scoped by environment"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_STORED):
+        self.max_entries = max_entries
+        self._outputs: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, text: str, environment: str = "") -> str:
+        handle = f"out-{uuid.uuid4().hex[:8]}"
+        with self._lock:
+            self._outputs[(environment, handle)] = text
+            while len(self._outputs) > self.max_entries:
+                self._outputs.popitem(last=False)
+        return handle
+
+    def get(self, handle: str, environment: str = "") -> Optional[str]:
+        with self._lock:
+            return self._outputs.get((environment, handle.strip()))
+
+
+def budgets_from_env() -> Dict[str, int]:
+    """Per-tool token budgets with overrides from DT_TOOL_TOKEN_BUDGETS (e.g. "execute_dql=4000,list_problems=2000")"""
+    budgets = dict(DEFAULT_TOKEN_BUDGETS)
+    for item in os.getenv("DT_TOOL_TOKEN_BUDGETS", "").split(","):
+        if "=" in item:
+            tool_name, value = item.split("=", 1)
+            try:
+                budgets[tool_name.strip()] = int(value)
+            except ValueError:
+                pass
+    return budgets
+
+
+class OutputCompactor:
+    """Applies the compaction passes and keeps per-tool token accounting"""
+
+    def __init__(self, budgets: Optional[Dict[str, int]] = None, default_budget: int = DEFAULT_TOKEN_BUDGET):
+        self.budgets = budgets if budgets is not None else dict(DEFAULT_TOKEN_BUDGETS)
+        self.default_budget = default_budget
+        self.store = OutputStore()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def compact(self, tool_name: str, text: str, environment: str = "") -> str:
+        """Compact one tool output to its budget; a truncated full output is stored under `environment`"""
+        if not isinstance(text, str):
+            return text
+        budget = self.budgets.get(tool_name, self.default_budget)
+        tokens_in = estimate_tokens(text)
+
+        compacted = dedupe_lines(collapse_tracebacks(text))
+        handle = None
+        if estimate_tokens(compacted) > budget:
+            handle = self.store.add(text, environment)
+            notice = (
+                f"\n\n[Output truncated to ~{budget} tokens. More available: call "
+                f"'Read Full Tool Output' with handle '{handle}'.]"
+            )
+            body_budget = max(budget - estimate_tokens(notice), 50)
+            compacted = (_truncate_json(compacted, body_budget) or _truncate_lines(compacted, body_budget)) + notice
+
+        tokens_out = estimate_tokens(compacted)
+        if tokens_out >= tokens_in:
+            compacted, tokens_out = text, tokens_in
+        self._record(tool_name, tokens_in, tokens_out, handle is not None)
+        if tokens_out < tokens_in:
+            logger.info(
+                "Compacted %s output: %d -> %d tokens (%d saved)%s",
+                tool_name, tokens_in, tokens_out, tokens_in - tokens_out,
+                f", full output at {handle}" if handle else ""
+            )
+        return compacted
+
+    def _record(self, tool_name: str, tokens_in: int, tokens_out: int, truncated: bool) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(
+                tool_name, {"calls": 0, "compacted": 0, "truncated": 0, "tokens_in": 0, "tokens_out": 0}
+            )
+            stats["calls"] += 1
+            stats["compacted"] += int(tokens_out < tokens_in)
+            stats["truncated"] += int(truncated)
+            stats["tokens_in"] += tokens_in
+            stats["tokens_out"] += tokens_out
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Per-tool counters including tokens_saved"""
+        with self._lock:
+            return {
+                tool_name: dict(stats, tokens_saved=stats["tokens_in"] - stats["tokens_out"])
+                for tool_name, stats in self._stats.items()
+            }
+
+    def read(self, handle: str, page: int = 1, environment: str = "") -> str:
+        """One page (PAGE_TOKENS) of a stored full output of the environment"""
+        text = self.store.get(handle, environment)
+        if text is None:
+            return f"Error reading tool output: unknown or expired handle '{handle}'."
+        page_chars = PAGE_TOKENS * 4
+        pages = max(1, -(-len(text) // page_chars))
+        page = min(max(1, int(page)), pages)
+        chunk = text[(page - 1) * page_chars:page * page_chars]
+        more = f"\n\n[Page {page} of {pages}" + (f"; request page {page + 1} for more]" if page < pages else "]")
+        return chunk + more
+
+
+def compaction_delta(before: Dict[str, Dict[str, int]], after: Dict[str, Dict[str, int]]) -> Dict[str, Any]:
+    """Token accounting accumulated between two stats snapshots, per tool and in total"""
+    by_tool = {}
+    for tool_name, stats in after.items():
+        previous = before.get(tool_name, {})
+        by_tool[tool_name] = {field: value - previous.get(field, 0) for field, value in stats.items()}
+    totals = {
+        field: sum(stats[field] for stats in by_tool.values())
+        for field in ("calls", "truncated", "tokens_in", "tokens_out", "tokens_saved")
+    }
+    return {"total": totals, "by_tool": by_tool}
+
+
+_compactor: Optional[OutputCompactor] = None
+_compactor_lock = threading.Lock()
+
+
+def get_output_compactor() -> OutputCompactor:
+    """Process-wide compactor configured from DT_TOOL_TOKEN_BUDGETS / DT_TOOL_TOKEN_BUDGET_DEFAULT"""
+    global _compactor
+    with _compactor_lock:
+        if _compactor is None:
+            _compactor = OutputCompactor(
+                budgets=budgets_from_env(),
+                default_budget=int(os.getenv("DT_TOOL_TOKEN_BUDGET_DEFAULT", str(DEFAULT_TOKEN_BUDGET)))
+            )
+        return _compactor
+
+
+def compaction_enabled() -> bool:
+    return os.getenv("DT_TOOL_COMPACTION_ENABLED", "true").lower() not in ("0", "false", "no")
+
+
+def compacted(tool_name: str) -> Callable:
+    """
+    Decorator for a tool's `_run` that compacts whatever string it returns,
+    storing full outputs under the tool's `environment`
+    """
+    def decorator(run: Callable) -> Callable:
+        @functools.wraps(run)
+        def wrapper(self, *args, **kwargs):
+            output = run(self, *args, **kwargs)
+            if not compaction_enabled():
+                return output
+            return get_output_compactor().compact(tool_name, output, getattr(self, "environment", ""))
+        return wrapper
+    return decorator
@@ -0,0 +1,366 @@
+"""
+Rate Limiter - Per-backend token buckets with adaptive (AIMD) concurrency
+Every MCP tool call and every uncached LLM call passes through the limiter of
+its backend: a token bucket caps the request rate and a concurrency window
+grows by one slot per window of fast successes and halves on a 429, so the
+system settles at the highest throughput a backend accepts without piling up
+retries. Callers waiting for a slot are counted as queue depth and sleep until
+a call releases one
+"""
+
+import asyncio
+import os
+import threading
+import time
+from contextlib import contextmanager, asynccontextmanager
+from typing import Optional, Dict, Any, List, Tuple
+
+
+# Defaults per backend kind ("mcp" covers "mcp:<environment>", "llm" covers "llm:<model>")
+DEFAULT_LIMITS: Dict[str, Dict[str, float]] = {
+    "mcp": {"rate": 10.0, "burst": 20, "concurrency": 4, "max_concurrency": 16, "latency_target": 10.0},
+    "llm": {"rate": 5.0, "burst": 10, "concurrency": 4, "max_concurrency": 16, "latency_target": 45.0},
+}
+MIN_CONCURRENCY = 1.0
+DECREASE_FACTOR = 0.5        # on a 429 / rate-limit error
+LATENCY_DECREASE_FACTOR = 0.9  # on a success slower than the latency target
+RATE_LIMIT_COOLDOWN = 1.0    # seconds new calls wait after a 429 when no Retry-After is known
+MIN_COUNTED_WAIT = 0.01      # waits shorter than this are not counted in the stats
+
+
+class RateLimitedError(Exception):
+    """Raised by callers to report that a backend answered 429 / rate limited"""
+
+
+def is_rate_limited(error: Optional[BaseException] = None, text: str = "") -> bool:
+    """Recognize rate limiting from litellm/OpenAI exceptions or MCP error text"""
+    if error is not None:
+        if isinstance(error, RateLimitedError) or "ratelimit" in type(error).__name__.lower():
+            return True
+        if getattr(error, "status_code", None) == 429:
+            return True
+        text = text or str(error)
+    lowered = text[:2000].lower()
+    return "429" in lowered and ("too many requests" in lowered or "rate limit" in lowered) \
+        or "rate limit exceeded" in lowered
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, holding at most `burst`"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+
+    def try_take(self, now: float) -> float:
+        """Take a token if available; otherwise return seconds until one is (0 = taken)"""
+        if self.rate <= 0:
+            return 0.0
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+
+class AdaptiveLimiter:
+    """
+    Token bucket plus an AIMD concurrency window for one backend.
+
+    Additive increase: each successful call within the latency target widens
+    the window by 1/window (about one slot per window of calls). Multiplicative
+    decrease: a rate-limited call halves it and pauses new calls briefly; a call
+    slower than the latency target shrinks it by 10%.
+
+    Callers blocked by the window wait on a condition (threads) or a future
+    (coroutines) that release() wakes; token and pause waits are timed.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate: float,
+        burst: float,
+        concurrency: float,
+        max_concurrency: float,
+        latency_target: float
+    ):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst)
+        self.limit = float(concurrency)
+        self.max_limit = float(max_concurrency)
+        self._configured_max_limit = self.max_limit
+        self.latency_target = latency_target
+        self.in_flight = 0
+        self.waiting = 0
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self._released = threading.Condition(self._lock)
+        self._async_waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self._stats = {
+            "calls": 0, "throttled": 0, "slow": 0, "waits": 0, "wait_seconds": 0.0,
+            "max_queue_depth": 0, "min_limit": self.limit, "max_limit_reached": self.limit
+        }
+
+    def cap(self, ceiling: float) -> None:
+        """Keep the window at or below `ceiling`, e.g. the number of sessions behind the backend"""
+        with self._lock:
+            self.max_limit = max(MIN_CONCURRENCY, min(self._configured_max_limit, float(ceiling)))
+            self.limit = min(self.limit, self.max_limit)
+
+    def _try_acquire(self) -> Optional[float]:
+        """
+        Claim a slot if allowed now (0 = acquired). Otherwise return the seconds
+        until a token or the end of a pause, or None while the window is full,
+        in which case only a release() can help. Called with the lock held.
+        """
+        now = time.monotonic()
+        if now < self._paused_until:
+            return self._paused_until - now
+        if self.in_flight >= int(self.limit):
+            return None
+        wait = self.bucket.try_take(now)
+        if wait:
+            return wait
+        self.in_flight += 1
+        return 0.0
+
+    def _wake_waiters(self) -> None:
+        """Wake every caller waiting for the window (called with the lock held)"""
+        self._released.notify_all()
+        waiters, self._async_waiters = self._async_waiters, []
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(_resolve, waiter)
+            except RuntimeError:
+                pass  # The waiter's event loop has been closed
+
+    def _enter_queue(self) -> float:
+        with self._lock:
+            self.waiting += 1
+            self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], self.waiting)
+        return time.monotonic()
+
+    def _leave_queue(self, started: float, acquired: bool) -> None:
+        waited = time.monotonic() - started
+        with self._lock:
+            self.waiting -= 1
+            if acquired and waited >= MIN_COUNTED_WAIT:
+                self._stats["waits"] += 1
+                self._stats["wait_seconds"] += waited
+
+    def acquire(self) -> None:
+        started = self._enter_queue()
+        acquired = False
+        try:
+            with self._released:
+                while True:
+                    wait = self._try_acquire()
+                    if wait == 0:
+                        acquired = True
+                        return
+                    self._released.wait(wait)
+        finally:
+            self._leave_queue(started, acquired)
+
+    async def acquire_async(self) -> None:
+        loop = asyncio.get_running_loop()
+        started = self._enter_queue()
+        acquired = False
+        try:
+            while True:
+                waiter = None
+                with self._lock:
+                    wait = self._try_acquire()
+                    if wait is None:
+                        # Registered under the lock, so a release cannot slip in unnoticed
+                        waiter = loop.create_future()
+                        self._async_waiters.append((loop, waiter))
+                if wait == 0:
+                    acquired = True
+                    return
+                if waiter is None:
+                    await asyncio.sleep(wait)
+                    continue
+                try:
+                    await waiter
+                finally:
+                    with self._lock:
+                        if (loop, waiter) in self._async_waiters:
+                            self._async_waiters.remove((loop, waiter))
+        finally:
+            self._leave_queue(started, acquired)
+
+    def release(self, latency: float, rate_limited: bool = False, retry_after: Optional[float] = None) -> None:
+        """Return a slot and adapt the window to how the call went"""
+        with self._lock:
+            self.in_flight -= 1
+            self._stats["calls"] += 1
+            if rate_limited:
+                self._stats["throttled"] += 1
+                self.limit = max(MIN_CONCURRENCY, self.limit * DECREASE_FACTOR)
+                self._paused_until = max(
+                    self._paused_until, time.monotonic() + (retry_after or RATE_LIMIT_COOLDOWN)
+                )
+            elif latency > self.latency_target:
+                self._stats["slow"] += 1
+                self.limit = max(MIN_CONCURRENCY, self.limit * LATENCY_DECREASE_FACTOR)
+            else:
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            self._stats["min_limit"] = min(self._stats["min_limit"], self.limit)
+            self._stats["max_limit_reached"] = max(self._stats["max_limit_reached"], self.limit)
+            self._wake_waiters()
+
+    @contextmanager
+    def slot(self):
+        """Hold a slot around a blocking call; set `outcome["rate_limited"]` to report a 429"""
+        self.acquire()
+        outcome = {"rate_limited": False, "retry_after": None}
+        started = time.monotonic()
+        try:
+            yield outcome
+        except Exception as e:
+            outcome["rate_limited"] = outcome["rate_limited"] or is_rate_limited(e)
+            raise
+        finally:
+            self.release(time.monotonic() - started, outcome["rate_limited"], outcome["retry_after"])
+
+    @asynccontextmanager
+    async def async_slot(self):
+        """Async counterpart of slot() for calls made on the event loop"""
+        await self.acquire_async()
+        outcome = {"rate_limited": False, "retry_after": None}
+        started = time.monotonic()
+        try:
+            yield outcome
+        except Exception as e:
+            outcome["rate_limited"] = outcome["rate_limited"] or is_rate_limited(e)
+            raise
+        finally:
+            self.release(time.monotonic() - started, outcome["rate_limited"], outcome["retry_after"])
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot.update({
+                "limit": round(self.limit, 2),
+                "in_flight": self.in_flight,
+                "queue_depth": self.waiting,
+                "wait_seconds": round(self._stats["wait_seconds"], 3),
+                "min_limit": round(self._stats["min_limit"], 2),
+                "max_limit_reached": round(self._stats["max_limit_reached"], 2),
+            })
+            return snapshot
+
+
+def _resolve(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+def _parse_overrides(variable: str) -> Dict[str, float]:
+    """"mcp=5,llm:gpt-4o=2" -> {"mcp": 5.0, "llm:gpt-4o": 2.0}"""
+    overrides = {}
+    for item in os.getenv(variable, "").split(","):
+        name, _, value = item.partition("=")
+        try:
+            overrides[name.strip()] = float(value)
+        except ValueError:
+            continue
+    return overrides
+
+
+def limits_for(name: str) -> Dict[str, float]:
+    """
+    Settings for a backend: kind defaults, then DT_RATE_LIMITS (requests/second),
+    DT_RATE_BURSTS and DT_CONCURRENCY_LIMITS (max window) overrides, where an
+    exact name ("llm:gpt-4o") wins over its kind ("llm").
+    """
+    kind = name.split(":", 1)[0]
+    limits = dict(DEFAULT_LIMITS.get(kind, DEFAULT_LIMITS["mcp"]))
+    for variable, field in (
+        ("DT_RATE_LIMITS", "rate"),
+        ("DT_RATE_BURSTS", "burst"),
+        ("DT_CONCURRENCY_LIMITS", "max_concurrency")
+    ):
+        overrides = _parse_overrides(variable)
+        for key in (kind, name):
+            if key in overrides:
+                limits[field] = overrides[key]
+    limits["concurrency"] = min(limits["concurrency"], limits["max_concurrency"])
+    return limits
+
+
+def limiter_enabled() -> bool:
+    return os.getenv("DT_RATE_LIMITER_ENABLED", "true").lower() not in ("0", "false", "no")
+
+
+_limiters: Dict[str, AdaptiveLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(name: str) -> Optional[AdaptiveLimiter]:
+    """Process-wide limiter for a backend such as "mcp:prod-eu" or "llm:gpt-4o-mini"; None when disabled"""
+    if not limiter_enabled():
+        return None
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            limiter = AdaptiveLimiter(name, **limits_for(name))
+            _limiters[name] = limiter
+        return limiter
+
+
+@contextmanager
+def limited(name: str):
+    """slot() of the backend's limiter, or a no-op when limiting is disabled"""
+    limiter = get_limiter(name)
+    if limiter is None:
+        yield {"rate_limited": False, "retry_after": None}
+        return
+    with limiter.slot() as outcome:
+        yield outcome
+
+
+@asynccontextmanager
+async def limited_async(name: str, max_concurrency: Optional[float] = None):
+    """
+    async_slot() of the backend's limiter, or a no-op when limiting is disabled.
+    `max_concurrency` caps the window, e.g. at the number of sessions in a pool.
+    """
+    limiter = get_limiter(name)
+    if limiter is None:
+        yield {"rate_limited": False, "retry_after": None}
+        return
+    if max_concurrency is not None:
+        limiter.cap(max_concurrency)
+    async with limiter.async_slot() as outcome:
+        yield outcome
+
+
+def limiter_stats() -> Dict[str, Dict[str, Any]]:
+    """Current window, queue depth and counters of every backend limiter"""
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.name: limiter.stats() for limiter in limiters}
+
+
+def limiter_delta(before: Dict[str, Dict[str, Any]], after: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Per-backend counters accumulated between two limiter_stats() snapshots"""
+    delta = {}
+    for name, stats in after.items():
+        previous = before.get(name, {})
+        entry = {
+            field: stats[field] - previous.get(field, 0)
+            for field in ("calls", "throttled", "slow", "waits")
+        }
+        if not entry["calls"]:
+            continue
+        entry["wait_seconds"] = round(stats["wait_seconds"] - previous.get("wait_seconds", 0.0), 3)
+        for field in ("limit", "max_queue_depth", "min_limit", "max_limit_reached"):
+            entry[field] = stats[field]
+        delta[name] = entry
+    return delta
@@ -0,0 +1,177 @@
+"""
+Request Hedger - Duplicate slow idempotent MCP calls to cut tail latency
+For opted-in tools, a call still running after that tool's observed p95
+latency gets a second, identical request on another pooled session and the
+first answer wins. Hedges are capped by a budget relative to the number of
+calls, so a backend that is slow across the board never sees double traffic
+"""
+
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Optional, Dict, Any, Callable, Awaitable, Set
+
+
+DEFAULT_BUDGET = 0.1        # hedges allowed per call made
+HEDGE_BURST = 2             # hedges allowed before the budget has accrued
+DEFAULT_MIN_SAMPLES = 20    # latencies needed before p95 is trusted
+LATENCY_WINDOW = 200
+MIN_HEDGE_DELAY = 0.05
+
+
+def hedged_tools_from_env() -> Set[str]:
+    """Tools opted in to hedging (DT_HEDGED_TOOLS="list_problems,find_entity_by_name"); none by default"""
+    return {name.strip() for name in os.getenv("DT_HEDGED_TOOLS", "").split(",") if name.strip()}
+
+
+def hedge_budget_from_env() -> float:
+    """Hedges allowed per call as a fraction (DT_HEDGE_BUDGET, 0.1 = at most 10% extra requests)"""
+    try:
+        return max(0.0, float(os.getenv("DT_HEDGE_BUDGET", str(DEFAULT_BUDGET))))
+    except ValueError:
+        return DEFAULT_BUDGET
+
+
+def min_samples_from_env() -> int:
+    """Latency samples a tool needs before it is hedged (DT_HEDGE_MIN_SAMPLES)"""
+    try:
+        return max(1, int(os.getenv("DT_HEDGE_MIN_SAMPLES", str(DEFAULT_MIN_SAMPLES))))
+    except ValueError:
+        return DEFAULT_MIN_SAMPLES
+
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))]
+
+
+class RequestHedger:
+    """
+    Hedges calls of the opted-in `tools` once they exceed the tool's p95
+    latency over the last LATENCY_WINDOW requests.
+
+    The losing request is not cancelled: cancelling an MCP call makes the pool
+    recycle its server process, which costs far more than letting a cheap,
+    idempotent call finish and return its session to the pool.
+    """
+
+    def __init__(
+        self,
+        tools: Set[str],
+        budget: float = DEFAULT_BUDGET,
+        min_samples: int = DEFAULT_MIN_SAMPLES
+    ):
+        self.tools = tools
+        self.budget = budget
+        self.min_samples = min_samples
+        self._latencies: Dict[str, deque] = {}
+        self._calls = 0
+        self._hedges = 0
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def enabled_for(self, tool_name: str) -> bool:
+        return tool_name in self.tools
+
+    def _tool_stats(self, tool_name: str) -> Dict[str, int]:
+        return self._stats.setdefault(
+            tool_name, {"calls": 0, "hedged": 0, "hedge_wins": 0, "budget_denied": 0}
+        )
+
+    def record_latency(self, tool_name: str, seconds: float) -> None:
+        with self._lock:
+            self._latencies.setdefault(tool_name, deque(maxlen=LATENCY_WINDOW)).append(seconds)
+
+    def hedge_delay(self, tool_name: str) -> Optional[float]:
+        """The tool's p95 latency, or None while too few calls have been seen"""
+        with self._lock:
+            latencies = self._latencies.get(tool_name)
+            if not latencies or len(latencies) < self.min_samples:
+                return None
+            return max(MIN_HEDGE_DELAY, percentile(latencies, 0.95))
+
+    def _take_hedge(self, tool_name: str) -> bool:
+        with self._lock:
+            if self._hedges >= self._calls * self.budget + HEDGE_BURST:
+                self._tool_stats(tool_name)["budget_denied"] += 1
+                return False
+            self._hedges += 1
+            self._tool_stats(tool_name)["hedged"] += 1
+            return True
+
+    def _timed(self, tool_name: str, make_call: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        async def run():
+            started = time.monotonic()
+            result = await make_call()
+            self.record_latency(tool_name, time.monotonic() - started)
+            return result
+
+        task = asyncio.ensure_future(run())
+        # A losing request may fail after the winner answered; never log it as unretrieved
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return task
+
+    async def call(
+        self,
+        tool_name: str,
+        make_call: Callable[[], Awaitable[Any]],
+        can_hedge: Callable[[], bool] = lambda: True
+    ) -> Any:
+        """
+        Await `make_call()`, issuing a second `make_call()` if the first is slower
+        than the tool's p95 and `can_hedge()` confirms another session is free.
+        """
+        with self._lock:
+            self._calls += 1
+            self._tool_stats(tool_name)["calls"] += 1
+
+        primary = self._timed(tool_name, make_call)
+        delay = self.hedge_delay(tool_name)
+        if delay is None:
+            return await primary
+
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done or not can_hedge() or not self._take_hedge(tool_name):
+            return await primary
+
+        hedge = self._timed(tool_name, make_call)
+        pending = {primary, hedge}
+        while True:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            winner = next((t for t in (primary, hedge) if t in done and t.exception() is None), None)
+            if winner is not None:
+                if winner is hedge:
+                    with self._lock:
+                        self._tool_stats(tool_name)["hedge_wins"] += 1
+                return winner.result()
+            if not pending:
+                # Both failed - surface the original request's error
+                return primary.result()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            snapshot = {tool_name: dict(counts) for tool_name, counts in self._stats.items()}
+        for tool_name, counts in snapshot.items():
+            delay = self.hedge_delay(tool_name)
+            counts["p95_seconds"] = round(delay, 3) if delay is not None else None
+        return snapshot
+
+
+def hedge_delta(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Any]:
+    """Per-tool hedging counters between two stats() snapshots with the hedge win rate"""
+    delta = {}
+    for tool_name, counts in after.items():
+        previous = before.get(tool_name, {})
+        entry = {
+            field: counts[field] - previous.get(field, 0)
+            for field in ("calls", "hedged", "hedge_wins", "budget_denied")
+        }
+        if not entry["calls"]:
+            continue
+        entry["win_rate"] = round(entry["hedge_wins"] / entry["hedged"], 3) if entry["hedged"] else 0.0
+        entry["p95_seconds"] = counts["p95_seconds"]
+        delta[tool_name] = entry
+    return delta
@@ -0,0 +1,399 @@
+"""
+DQL Result Buffer - Streaming ingestion of DQL records into local columnar storage
+Records are decoded page by page from the execute_dql response into compact
+typed columns (float arrays, dictionary-encoded strings), so only a bounded
+summary and a handle need to reach the LLM; later calls filter or aggregate the
+buffered data locally instead of re-querying Grail
+"""
+
+import json
+import math
+import os
+import re
+import threading
+import uuid
+from array import array
+from collections import Counter, OrderedDict
+from typing import Optional, Dict, Any, List, Iterator, Iterable, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    import pyarrow as pa
+    ARROW_AVAILABLE = True
+except ImportError:
+    ARROW_AVAILABLE = False
+
+
+DEFAULT_PAGE_SIZE = 1000
+DEFAULT_MAX_BUFFERS = 20
+DEFAULT_INLINE_MAX_CHARS = 8000
+SUMMARY_SAMPLE_ROWS = 5
+SUMMARY_TOP_VALUES = 3
+
+_RECORDS_START = re.compile(r"\[\s*(\{|\])")
+
+
+def iter_record_pages(text: str, page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Decode the JSON records array embedded in an execute_dql response one record
+    at a time, yielding pages of at most `page_size` records. The full list of
+    decoded records is never materialized.
+    """
+    match = _RECORDS_START.search(text)
+    if not match:
+        return
+
+    decoder = json.JSONDecoder()
+    position = match.start() + 1
+    page: List[Dict[str, Any]] = []
+
+    while True:
+        while position < len(text) and text[position] in " \t\r\n,":
+            position += 1
+        if position >= len(text) or text[position] == "]":
+            break
+        try:
+            record, position = decoder.raw_decode(text, position)
+        except ValueError:
+            break
+        if isinstance(record, dict):
+            page.append(record)
+        if len(page) >= page_size:
+            yield page
+            page = []
+
+    if page:
+        yield page
+
+
+def _as_text(value: Any) -> Optional[str]:
+    """Text form of a mixed-type column value: strings as-is, scalars via str(), the rest as JSON"""
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, (bool, int, float)):
+        return str(value)
+    return json.dumps(value, default=str)
+
+
+class Column:
+    """
+    One typed column. Numbers are stored in a float array (NaN for null),
+    strings are dictionary-encoded into an int array (-1 for null), and anything
+    else falls back to a list of text values (see _as_text).
+    """
+
+    def __init__(self, name: str, length: int = 0):
+        self.name = name
+        self.kind: Optional[str] = None
+        self.values: Any = [None] * length
+        self.dictionary: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def _set_kind(self, value: Any) -> None:
+        nulls = len(self.values)
+        if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+            self.kind, self.values = "json", [None] * nulls
+        elif isinstance(value, str):
+            self.kind, self.values = "str", array("l", [-1] * nulls)
+        else:
+            self.kind, self.values = "num", array("d", [math.nan] * nulls)
+
+    def _demote(self) -> None:
+        existing = [self.get(i) for i in range(len(self.values))]
+        self.kind = "json"
+        self.values = [_as_text(v) for v in existing]
+        self.dictionary, self._codes = [], {}
+
+    def append(self, value: Any) -> None:
+        if value is not None and self.kind is None:
+            self._set_kind(value)
+
+        if value is None:
+            if self.kind == "num":
+                self.values.append(math.nan)
+            elif self.kind == "str":
+                self.values.append(-1)
+            else:
+                self.values.append(None)
+            return
+
+        if self.kind == "num" and isinstance(value, (int, float)) and not isinstance(value, bool):
+            self.values.append(float(value))
+        elif self.kind == "str" and isinstance(value, str):
+            code = self._codes.get(value)
+            if code is None:
+                code = self._codes[value] = len(self.dictionary)
+                self.dictionary.append(value)
+            self.values.append(code)
+        else:
+            if self.kind != "json":
+                self._demote()
+            self.values.append(_as_text(value))
+
+    def get(self, index: int) -> Any:
+        raw = self.values[index]
+        if self.kind == "num":
+            return None if math.isnan(raw) else raw
+        if self.kind == "str":
+            return None if raw < 0 else self.dictionary[raw]
+        return raw
+
+    def nbytes(self) -> int:
+        if isinstance(self.values, array):
+            return self.values.itemsize * len(self.values) + sum(len(v) for v in self.dictionary)
+        return sum(len(v) for v in self.values if v)
+
+
+class ColumnarBuffer:
+    """Append-only columnar table of DQL records"""
+
+    def __init__(self, statement: str = ""):
+        self.statement = statement
+        self.columns: "OrderedDict[str, Column]" = OrderedDict()
+        self.row_count = 0
+        self.pages = 0
+
+    def append_page(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Ingest one page of records; returns the number of rows added"""
+        added = 0
+        for record in records:
+            for name in record:
+                if name not in self.columns:
+                    self.columns[name] = Column(name, self.row_count)
+            for name, column in self.columns.items():
+                column.append(record.get(name))
+            self.row_count += 1
+            added += 1
+        self.pages += 1
+        return added
+
+    def row(self, index: int, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        names = fields or list(self.columns)
+        return {name: self.columns[name].get(index) for name in names if name in self.columns}
+
+    def nbytes(self) -> int:
+        return sum(column.nbytes() for column in self.columns.values())
+
+    def to_numpy(self) -> Dict[str, Any]:
+        """Columns as NumPy arrays (numeric columns zero-copy from the float buffers)"""
+        if not NUMPY_AVAILABLE:
+            raise ImportError("numpy is not installed")
+        out = {}
+        for name, column in self.columns.items():
+            if column.kind == "num":
+                out[name] = np.frombuffer(column.values, dtype=np.float64)
+            else:
+                out[name] = np.array([column.get(i) for i in range(self.row_count)], dtype=object)
+        return out
+
+    def to_arrow(self) -> "pa.Table":
+        """Columns as a PyArrow table (strings as dictionary arrays)"""
+        if not ARROW_AVAILABLE:
+            raise ImportError("pyarrow is not installed")
+        arrays, names = [], []
+        for name, column in self.columns.items():
+            if column.kind == "str":
+                indices = pa.array([None if c < 0 else c for c in column.values], type=pa.int32())
+                arrays.append(pa.DictionaryArray.from_arrays(indices, pa.array(column.dictionary)))
+            elif column.kind == "num":
+                arrays.append(pa.array([column.get(i) for i in range(self.row_count)], type=pa.float64()))
+            else:
+                arrays.append(pa.array([column.get(i) for i in range(self.row_count)], type=pa.string()))
+            names.append(name)
+        return pa.Table.from_arrays(arrays, names=names)
+
+
+def _column_summary(column: Column, row_count: int) -> str:
+    values = [column.get(i) for i in range(row_count)]
+    present = [v for v in values if v is not None]
+    nulls = row_count - len(present)
+
+    if column.kind == "num" and present:
+        detail = f"min={min(present):g}, max={max(present):g}, mean={sum(present) / len(present):.4g}"
+    elif present:
+        top = Counter(present).most_common(SUMMARY_TOP_VALUES)
+        shown = ", ".join(f"{_truncate(str(v), 60)!r} x{c}" for v, c in top)
+        detail = f"{len(set(present))} distinct; top: {shown}"
+    else:
+        detail = "all null"
+    return f"  - {column.name} ({column.kind or 'null'}, {nulls} null): {detail}"
+
+
+def _truncate(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+def summarize_buffer(handle: str, buffer: ColumnarBuffer) -> str:
+    """Bounded text summary of a buffer for the LLM context"""
+    lines = [
+        f"Result buffered locally as handle '{handle}': {buffer.row_count} records, "
+        f"{len(buffer.columns)} columns, {buffer.pages} page(s), ~{buffer.nbytes() / 1024:.0f} KB.",
+        "Columns:"
+    ]
+    lines += [_column_summary(column, buffer.row_count) for column in buffer.columns.values()]
+    if buffer.row_count:
+        lines.append(f"First {min(SUMMARY_SAMPLE_ROWS, buffer.row_count)} records:")
+        for index in range(min(SUMMARY_SAMPLE_ROWS, buffer.row_count)):
+            lines.append("  " + _truncate(json.dumps(buffer.row(index), default=str), 400))
+    lines.append(
+        f"Use the 'Query DQL Result Buffer' tool with handle '{handle}' to filter, group or "
+        f"list more records without re-querying Grail."
+    )
+    return "\n".join(lines)
+
+
+_CONDITION = re.compile(r"^\s*([\w.\-]+)\s*(==|!=|>=|<=|>|<|contains|startswith)\s*(.+?)\s*$", re.IGNORECASE)
+
+
+def _parse_literal(raw: str) -> Any:
+    raw = raw.strip()
+    if len(raw) >= 2 and raw[0] == raw[-1] and raw[0] in "\"'":
+        return raw[1:-1]
+    try:
+        return float(raw)
+    except ValueError:
+        return raw
+
+
+def _matches(value: Any, operator: str, literal: Any) -> bool:
+    if value is None:
+        return operator == "!="
+    operator = operator.lower()
+    if operator == "contains":
+        return str(literal).lower() in str(value).lower()
+    if operator == "startswith":
+        return str(value).lower().startswith(str(literal).lower())
+    left, right = str(value), str(literal)
+    if isinstance(literal, float):
+        # Cells of a string column may still hold numbers, e.g. "200" for == 200
+        try:
+            left, right = float(value), literal
+        except (TypeError, ValueError):
+            # A non-numeric cell is neither above nor below a number
+            if operator not in ("==", "!="):
+                return False
+    return {
+        "==": left == right, "!=": left != right,
+        ">": left > right, "<": left < right, ">=": left >= right, "<=": left <= right
+    }[operator]
+
+
+def query_buffer(
+    buffer: ColumnarBuffer,
+    where: str = "",
+    group_by: str = "",
+    fields: Optional[List[str]] = None,
+    limit: int = 20
+) -> str:
+    """
+    Filter and aggregate a buffer locally.
+
+    `where` is a list of conditions joined with ' and ', each `field op value`
+    with op one of ==, !=, >, <, >=, <=, contains, startswith. With `group_by`
+    the result is record counts per value; otherwise up to `limit` matching rows.
+    """
+    conditions: List[Tuple[str, str, Any]] = []
+    for clause in re.split(r"\s+and\s+", where.strip(), flags=re.IGNORECASE) if where.strip() else []:
+        match = _CONDITION.match(clause)
+        if not match:
+            return f"Error: cannot parse condition '{clause}'. Use: field == value, field contains text, ..."
+        if match.group(1) not in buffer.columns:
+            return f"Error: unknown field '{match.group(1)}'. Available: {', '.join(buffer.columns)}"
+        conditions.append((match.group(1), match.group(2), _parse_literal(match.group(3))))
+
+    matching = [
+        index for index in range(buffer.row_count)
+        if all(_matches(buffer.columns[f].get(index), op, lit) for f, op, lit in conditions)
+    ]
+
+    if group_by:
+        if group_by not in buffer.columns:
+            return f"Error: unknown field '{group_by}'. Available: {', '.join(buffer.columns)}"
+        counts = Counter(buffer.columns[group_by].get(i) for i in matching)
+        lines = [f"{len(matching)} matching records grouped by {group_by} ({len(counts)} groups):"]
+        lines += [f"  {_truncate(str(v), 120)}: {c}" for v, c in counts.most_common(limit)]
+        if len(counts) > limit:
+            lines.append(f"  ... {len(counts) - limit} more groups")
+        return "\n".join(lines)
+
+    lines = [f"{len(matching)} matching records (showing up to {limit}):"]
+    for index in matching[:limit]:
+        lines.append("  " + _truncate(json.dumps(buffer.row(index, fields), default=str), 600))
+    return "\n".join(lines)
+
+
+class ResultBufferStore:
+    """
+    Bounded LRU of buffers addressable by handle. Handles are scoped by
+    environment: a tool of one tenant never reads another tenant's records.
+    """
+
+    def __init__(self, max_buffers: int = DEFAULT_MAX_BUFFERS):
+        self.max_buffers = max_buffers
+        self._buffers: "OrderedDict[Tuple[str, str], ColumnarBuffer]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, buffer: ColumnarBuffer, environment: str = "") -> str:
+        handle = f"dql-{uuid.uuid4().hex[:8]}"
+        with self._lock:
+            self._buffers[(environment, handle)] = buffer
+            while len(self._buffers) > self.max_buffers:
+                self._buffers.popitem(last=False)
+        return handle
+
+    def get(self, handle: str, environment: str = "") -> Optional[ColumnarBuffer]:
+        key = (environment, handle.strip())
+        with self._lock:
+            buffer = self._buffers.get(key)
+            if buffer is not None:
+                self._buffers.move_to_end(key)
+            return buffer
+
+
+_store = ResultBufferStore()
+
+
+def get_buffer_store() -> ResultBufferStore:
+    """Process-wide store of buffered DQL results"""
+    return _store
+
+
+def inline_max_chars_from_env() -> int:
+    """Largest execute_dql response returned verbatim (DT_DQL_INLINE_MAX_CHARS)"""
+    try:
+        return int(os.getenv("DT_DQL_INLINE_MAX_CHARS", str(DEFAULT_INLINE_MAX_CHARS)))
+    except ValueError:
+        return DEFAULT_INLINE_MAX_CHARS
+
+
+def buffer_result(
+    text: str,
+    statement: str = "",
+    page_size: int = DEFAULT_PAGE_SIZE,
+    environment: str = ""
+) -> Optional[str]:
+    """
+    Stream the records of an execute_dql response into a new buffer of the
+    environment and return its summary, or None when the response holds no
+    records array.
+    """
+    buffer = ColumnarBuffer(statement)
+    for page in iter_record_pages(text, page_size):
+        buffer.append_page(page)
+    if not buffer.row_count:
+        return None
+
+    handle = get_buffer_store().add(buffer, environment)
+    header = text[:_RECORDS_START.search(text).start()].strip()
+    summary = summarize_buffer(handle, buffer)
+    return f"{_truncate(header, 1000)}\n\n{summary}" if header else summary
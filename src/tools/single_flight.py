@@ -0,0 +1,53 @@
+"""
+Single-Flight - Coalesce identical in-flight MCP requests
+Concurrent callers asking for the same key share one upstream request and its
+result (or exception) instead of each issuing their own
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    """
+    In-flight request table living on the async runtime loop.
+
+    The first caller for a key becomes the leader and starts the request; callers
+    arriving while it is still running await the same task. Entries are removed as
+    soon as the request settles, so this never serves stale data - that is the
+    result cache's job.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self.stats = {"leaders": 0, "coalesced": 0}
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    def _settle(self, key: str, task: asyncio.Task) -> None:
+        self._in_flight.pop(key, None)
+        # Mark a failure as retrieved: when every caller was cancelled before the
+        # request settled, nobody else ever looks at its exception
+        if not task.cancelled():
+            task.exception()
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run `fn()` unless an identical request is already running, then share its result"""
+        task = self._in_flight.get(key)
+        if task is None:
+            self.stats["leaders"] += 1
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda settled: self._settle(key, settled))
+        else:
+            self.stats["coalesced"] += 1
+
+        # Shield so one cancelled caller does not cancel the request for everyone
+        return await asyncio.shield(task)
+
+
+def coalescing_delta(before: Dict[str, int], after: Dict[str, int]) -> Dict[str, int]:
+    """Leader/coalesced counts accumulated between two stats snapshots"""
+    return {field: after.get(field, 0) - before.get(field, 0) for field in ("leaders", "coalesced")}
@@ -0,0 +1,89 @@
+"""Tests for the state carried between incremental (delta) analysis runs"""
+
+import json
+
+from src.analysis_snapshot import (
+    AnalysisSnapshotStore,
+    build_snapshot,
+    compute_delta,
+    extract_items,
+    listing_is_empty,
+    split_analysis,
+)
+from src.crew_orchestrator import DynatraceObservabilityCrew
+
+PROBLEMS_TEXT = "Found 2 problems:\n1. P-123 Disk full (open, 5 min ago)\n2. P-124 CPU saturation (open, 1 h ago)"
+VULNERABILITIES_JSON = json.dumps([{"vulnerability.display_id": "S-7", "status": "OPEN", "riskScore": 8.1}])
+
+
+def test_json_records_are_hashed_on_status_fields_only():
+    before = extract_items(json.dumps([{"display_id": "P-1", "status": "OPEN", "duration": 60}]), "problems")
+    after = extract_items(json.dumps([{"display_id": "P-1", "status": "OPEN", "duration": 120}]), "problems")
+    closed = extract_items(json.dumps([{"display_id": "P-1", "status": "CLOSED", "duration": 120}]), "problems")
+    assert before["P-1"]["hash"] == after["P-1"]["hash"]
+    assert before["P-1"]["hash"] != closed["P-1"]["hash"]
+
+
+def test_text_listings_ignore_relative_times():
+    items = extract_items(PROBLEMS_TEXT, "problems")
+    later = extract_items(PROBLEMS_TEXT.replace("5 min ago", "25 min ago"), "problems")
+    assert list(items) == ["P-123", "P-124"]
+    assert items["P-123"]["hash"] == later["P-123"]["hash"]
+
+
+def test_delta_classifies_items_against_previous_snapshot():
+    current = extract_items(PROBLEMS_TEXT, "problems")
+    previous = {
+        "P-123": {"hash": current["P-123"]["hash"], "analysis": "P-123: disk full on web-1"},
+        "P-099": {"hash": "old", "analysis": "P-099: resolved"},
+    }
+    assert compute_delta(previous, current) == {
+        "new": ["P-124"], "changed": [], "unchanged": ["P-123"], "resolved": ["P-099"]
+    }
+
+
+def test_empty_listings_are_told_apart_from_unrecognized_ones():
+    assert listing_is_empty("No problems found in the selected timeframe")
+    assert listing_is_empty("Query returned 0 records\n[]")
+    assert not listing_is_empty("Found 2 problems:\n- Disk full\n- CPU saturation")
+    assert not listing_is_empty(json.dumps([{"name": "no id here"}]))
+
+
+def test_analysis_is_split_per_item_and_snapshot_round_trips(tmp_path):
+    sections = split_analysis("## P-123 Disk full\nclean up logs\n## P-124 CPU\nscale out", ["P-123", "P-124"])
+    assert sections == {"P-123": "## P-123 Disk full\nclean up logs", "P-124": "## P-124 CPU\nscale out"}
+
+    store = AnalysisSnapshotStore(str(tmp_path / "snapshot.json"))
+    store.save(build_snapshot({"problems": extract_items(PROBLEMS_TEXT, "problems")}, {"problems": sections}, "report"))
+    assert store.load()["items"]["problems"]["P-124"]["analysis"] == "## P-124 CPU\nscale out"
+
+
+def _crew(tmp_path, monkeypatch) -> DynatraceObservabilityCrew:
+    monkeypatch.setenv("DT_DELTA_SNAPSHOT_PATH", str(tmp_path / "snapshot.json"))
+    return DynatraceObservabilityCrew(verbose=False, incremental=True)
+
+
+def _prefetched(problems: str) -> dict:
+    return {
+        "list_problems": {"ok": True, "text": problems},
+        "list_vulnerabilities": {"ok": True, "text": VULNERABILITIES_JSON},
+    }
+
+
+def test_plan_delta_tracks_items_of_both_kinds(tmp_path, monkeypatch):
+    plan = _crew(tmp_path, monkeypatch).plan_delta(_prefetched(PROBLEMS_TEXT))
+    assert plan["changed"] is True
+    assert plan["kinds"]["problems"]["delta"]["new"] == ["P-123", "P-124"]
+    assert plan["kinds"]["vulnerabilities"]["delta"]["new"] == ["S-7"]
+
+
+def test_plan_delta_accepts_an_empty_listing(tmp_path, monkeypatch):
+    plan = _crew(tmp_path, monkeypatch).plan_delta(_prefetched("No problems found"))
+    assert plan is not None
+    assert plan["kinds"]["problems"]["items"] == {}
+
+
+def test_unrecognized_listing_falls_back_to_full_analysis(tmp_path, monkeypatch, caplog):
+    plan = _crew(tmp_path, monkeypatch).plan_delta(_prefetched("Found 2 problems:\n- Disk full\n- CPU saturation"))
+    assert plan is None
+    assert "running a full analysis" in caplog.text
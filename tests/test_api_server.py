@@ -0,0 +1,146 @@
+"""Tests for the on-demand analysis HTTP API and its job manager"""
+
+import asyncio
+import json
+import threading
+import time
+
+from src import api_server
+from src.api_server import AnalysisAPIServer, JobManager
+
+
+class FakeCrew:
+    """Stands in for DynatraceObservabilityCrew and records overlapping runs per environment"""
+
+    lock = threading.Lock()
+    running = {}
+    overlaps = 0
+
+    def __init__(self, verbose=False, incremental=None, environment="", progress_callback=None):
+        self.environment = environment
+        self.progress_callback = progress_callback
+
+    def run_analysis(self):
+        with FakeCrew.lock:
+            FakeCrew.running[self.environment] = FakeCrew.running.get(self.environment, 0) + 1
+            FakeCrew.overlaps += FakeCrew.running[self.environment] > 1
+        self.progress_callback("analysis_started", {})
+        time.sleep(0.1)
+        with FakeCrew.lock:
+            FakeCrew.running[self.environment] -= 1
+        return {"timestamp": "2024-05-01T10:00:00.123", "duration_seconds": 0.1}
+
+    def save_report(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"# Report for {self.environment or 'default'}")
+
+
+def _use_fake_crew(monkeypatch):
+    FakeCrew.running, FakeCrew.overlaps = {}, 0
+    monkeypatch.setattr(api_server, "DynatraceObservabilityCrew", FakeCrew)
+    monkeypatch.delenv("DT_DELTA_ANALYSIS_ENABLED", raising=False)
+
+
+async def _finish(manager, jobs):
+    while not all(job.done for job in jobs):
+        await asyncio.sleep(0.01)
+
+
+def test_default_incremental_is_resolved_before_deduplication(monkeypatch, tmp_path):
+    _use_fake_crew(monkeypatch)
+
+    async def scenario():
+        manager = JobManager(report_dir=str(tmp_path))
+        await manager.start()
+        first, deduplicated_first = manager.submit("prod", None)
+        second, deduplicated_second = manager.submit("prod", False)
+        await _finish(manager, [first])
+        await manager.stop()
+        return first, second, deduplicated_first, deduplicated_second, manager
+
+    first, second, deduplicated_first, deduplicated_second, manager = asyncio.run(scenario())
+    assert second is first
+    assert (deduplicated_first, deduplicated_second) == (False, True)
+    assert first.incremental is False
+    assert first.status == "succeeded"
+    assert first.report == "# Report for prod"
+    assert manager.stats["deduplicated"] == 1
+
+
+def test_jobs_of_one_environment_never_overlap(monkeypatch, tmp_path):
+    _use_fake_crew(monkeypatch)
+
+    async def scenario():
+        manager = JobManager(workers=3, report_dir=str(tmp_path))
+        await manager.start()
+        jobs = [
+            manager.submit("prod", True)[0],
+            manager.submit("prod", False)[0],
+            manager.submit("staging", True)[0],
+        ]
+        await asyncio.sleep(0.05)
+        queued_while_busy = manager.health()["queued"]
+        await _finish(manager, jobs)
+        await manager.stop()
+        return jobs, queued_while_busy
+
+    jobs, queued_while_busy = asyncio.run(scenario())
+    assert [job.status for job in jobs] == ["succeeded"] * 3
+    assert FakeCrew.overlaps == 0
+    assert queued_while_busy == 1
+    assert jobs[1].started >= jobs[0].finished
+
+
+def test_full_queue_rejects_new_jobs(monkeypatch, tmp_path):
+    _use_fake_crew(monkeypatch)
+
+    async def scenario():
+        manager = JobManager(queue_size=1, report_dir=str(tmp_path))
+        manager._queue = asyncio.Queue(maxsize=1)  # No workers: nothing drains the queue
+        manager.submit("prod", True)
+        try:
+            manager.submit("staging", True)
+        except api_server.QueueFullError:
+            return manager.stats["rejected"]
+
+    assert asyncio.run(scenario()) == 1
+
+
+async def _request(port, method, path, body=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    payload = json.dumps(body).encode() if body is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(payload)}\r\n\r\n".encode() + payload
+    )
+    await writer.drain()
+    response = (await reader.read()).decode()
+    writer.close()
+    head, _, content = response.partition("\r\n\r\n")
+    return int(head.split(" ", 2)[1]), content
+
+
+def test_http_submit_stream_and_report(monkeypatch, tmp_path):
+    _use_fake_crew(monkeypatch)
+
+    async def scenario():
+        server = AnalysisAPIServer(JobManager(report_dir=str(tmp_path)), port=0)
+        await server.start()
+        try:
+            status, content = await _request(server.port, "POST", "/analyses", {"incremental": True})
+            job_id = json.loads(content)["id"]
+            events = (await _request(server.port, "GET", f"/analyses/{job_id}/events"))[1]
+            report = await _request(server.port, "GET", f"/analyses/{job_id}/report")
+            invalid = await _request(server.port, "POST", "/analyses", {"incremental": "yes"})
+            missing = await _request(server.port, "GET", "/analyses/unknown")
+            health = json.loads((await _request(server.port, "GET", "/health"))[1])
+        finally:
+            await server.stop()
+        return status, events, report, invalid, missing, health
+
+    status, events, report, invalid, missing, health = asyncio.run(scenario())
+    assert status == 202
+    assert "event: queued" in events and "event: analysis_started" in events and "event: finished" in events
+    assert report == (200, "# Report for default")
+    assert invalid[0] == 400
+    assert missing[0] == 404
+    assert health["stats"]["completed"] == 1
@@ -0,0 +1,75 @@
+"""Tests for the shared background event loop"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.tools.async_runtime import AsyncRuntime
+
+
+@pytest.fixture
+def runtime():
+    runtime = AsyncRuntime(name="test-runtime")
+    yield runtime
+    runtime.shutdown(timeout=5)
+
+
+def test_run_returns_the_coroutine_result(runtime):
+    async def answer():
+        return 42
+
+    assert runtime.run(answer()) == 42
+
+
+def test_coroutines_from_several_threads_share_one_loop(runtime):
+    loops = []
+
+    async def record():
+        loops.append(asyncio.get_running_loop())
+        await asyncio.sleep(0.05)
+
+    threads = [threading.Thread(target=lambda: runtime.run(record())) for _ in range(4)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(set(map(id, loops))) == 1
+    assert time.monotonic() - started < 0.2
+
+
+def test_run_times_out(runtime):
+    with pytest.raises(TimeoutError):
+        runtime.run(asyncio.sleep(5), timeout=0.05)
+
+
+def test_run_from_the_runtime_thread_is_refused(runtime):
+    errors = []
+
+    def nested():
+        try:
+            runtime.run(asyncio.sleep(0))
+        except RuntimeError as e:
+            errors.append(e)
+
+    async def call_nested():
+        nested()
+
+    runtime.run(call_nested())
+    assert errors
+
+
+def test_shutdown_hooks_run(runtime):
+    calls = []
+
+    async def hook():
+        calls.append("closed")
+
+    runtime.add_shutdown_hook(hook)
+    runtime.run(asyncio.sleep(0))
+    runtime.shutdown(timeout=5)
+    assert calls == ["closed"]
+    assert not runtime.running
@@ -0,0 +1,90 @@
+"""Tests for the batch DQL tool"""
+
+from src.tools import dynatrace_mcp_tools as tools
+from src.tools.dynatrace_mcp_tools import BatchExecuteDQLTool, ExecuteDQLTool, ToolErrorText
+from src.tools.circuit_breaker import MCPUnavailableError
+
+SERVICE_A = "SERVICE-1A2B3C4D5E6F7890"
+SERVICE_B = "SERVICE-0987F6E5D4C3B2A1"
+TEMPLATE = 'fetch logs | filter dt.entity.service == "{entity_id}" | limit 50'
+
+
+def _fake_query(monkeypatch, answer):
+    """Replace the single-query path; `answer(statement)` returns (text, ok) or raises"""
+    executed = []
+
+    def query(self, statement, timeframe=""):
+        executed.append(statement)
+        return answer(statement)
+
+    monkeypatch.setattr(ExecuteDQLTool, "_query", query)
+    return executed
+
+
+def _run(**kwargs):
+    tool = BatchExecuteDQLTool()
+    return tool._run(**tool.args_schema(**kwargs).model_dump())
+
+
+def test_template_only_call_is_accepted_by_the_schema(monkeypatch):
+    executed = _fake_query(monkeypatch, lambda statement: ("1 record", True))
+
+    output = _run(dql_template=TEMPLATE, entity_ids=[SERVICE_A, SERVICE_B, SERVICE_A])
+
+    assert output.startswith("Executed 2 DQL queries (2 succeeded, 0 failed).")
+    assert executed == [TEMPLATE.replace("{entity_id}", SERVICE_A), TEMPLATE.replace("{entity_id}", SERVICE_B)]
+    assert f"### {SERVICE_B}" in output
+
+
+def test_malformed_entity_ids_are_reported_and_never_substituted(monkeypatch):
+    executed = _fake_query(monkeypatch, lambda statement: ("1 record", True))
+    injected = 'SERVICE-1" or true or "'
+
+    output = _run(dql_template=TEMPLATE, entity_ids=[SERVICE_A, injected, "checkout"])
+
+    assert executed == [TEMPLATE.replace("{entity_id}", SERVICE_A)]
+    assert output.startswith("Executed 1 DQL queries (1 succeeded, 2 failed).")
+    assert f"'{injected}' is not a Dynatrace entity ID" in output
+    assert "'checkout' is not a Dynatrace entity ID" in output
+
+
+def test_failures_are_counted_from_the_outcome_not_the_text(monkeypatch):
+    def answer(statement):
+        if "refused" in statement:
+            raise MCPUnavailableError("prod", 30)
+        if "server" in statement:
+            return ToolErrorText("Query failed: unknown table"), False
+        if "budget" in statement:
+            return "Note: budget exhausted", False
+        return "Error rate by service: 3 records", True
+
+    _fake_query(monkeypatch, answer)
+
+    output = _run(dql_statements=["fetch refused", "fetch server", "fetch budget", "fetch ok"])
+
+    assert output.startswith("Executed 4 DQL queries (1 succeeded, 3 failed).")
+    assert "Error [MCP_UNAVAILABLE]" in output
+
+
+def test_server_error_results_are_flagged_and_not_cached(monkeypatch):
+    class ErrorResult:
+        isError = True
+        content = [type("Text", (), {"text": "Query failed: unknown table"})()]
+
+    async def call(tool_name, arguments, environment=""):
+        return ErrorResult()
+
+    monkeypatch.setattr(tools, "call_mcp_tool", call)
+    monkeypatch.setattr(tools, "get_tool_cache", lambda: None)
+    text = tools.run_async(tools._fetch_upstream("execute_dql", {"dqlStatement": "fetch nope"}))
+
+    assert isinstance(text, ToolErrorText)
+    assert text == "Query failed: unknown table"
+
+
+def test_empty_batch_is_rejected():
+    assert _run().startswith("Error executing DQL batch: provide dql_statements")
+
+
+def test_batch_tool_is_exported():
+    assert "BatchExecuteDQLTool" in tools.__all__
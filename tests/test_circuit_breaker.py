@@ -0,0 +1,127 @@
+"""Tests for the per-environment MCP circuit breaker"""
+
+import asyncio
+import time
+
+import pytest
+
+from src.tools import dynatrace_mcp_tools as tools
+from src.tools.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    MCPUnavailableError,
+    breaker_delta,
+    is_backend_failure,
+)
+
+
+class FakeResult:
+    def __init__(self, text, is_error=False):
+        self.isError = is_error
+        self.content = [type("Text", (), {"text": text})()]
+
+
+class FakePool:
+    size = 2
+
+    def __init__(self, outcome):
+        self.outcome = outcome
+
+    def has_spare(self):
+        return True
+
+    async def call_tool(self, tool_name, arguments, timeout=None):
+        if isinstance(self.outcome, BaseException):
+            raise self.outcome
+        return self.outcome
+
+
+def test_breaker_opens_after_consecutive_failures_and_rejects_calls():
+    trips = []
+    breaker = CircuitBreaker("prod", failure_threshold=2, reset_timeout=30)
+    breaker.add_listener(trips.append)
+
+    breaker.record_failure(ConnectionError("refused"))
+    breaker.record_success()
+    breaker.record_failure(ConnectionError("refused"))
+    assert breaker.state == CLOSED
+    breaker.record_failure(ConnectionError("refused"))
+    assert breaker.state == OPEN
+    assert trips == [breaker]
+
+    with pytest.raises(MCPUnavailableError, match="last error: refused"):
+        asyncio.run(breaker.before_call())
+    assert breaker.stats()["short_circuited"] == 1
+
+
+def test_half_open_probe_closes_or_reopens_the_breaker():
+    outcomes = [False, True]
+    probes = []
+
+    async def probe():
+        probes.append(breaker.state)
+        return outcomes.pop(0)
+
+    breaker = CircuitBreaker("prod", failure_threshold=1, reset_timeout=30, probe=probe)
+    breaker.record_failure(ConnectionError("refused"))
+    before = breaker.stats()
+
+    breaker.opened_at = time.monotonic() - 31
+    with pytest.raises(MCPUnavailableError):
+        asyncio.run(breaker.before_call())
+    assert breaker.state == OPEN
+
+    breaker.opened_at = time.monotonic() - 31
+    asyncio.run(breaker.before_call())
+    assert breaker.state == CLOSED
+    assert probes == [HALF_OPEN, HALF_OPEN]
+
+    delta = breaker_delta(before, breaker.stats())
+    assert (delta["probes"], delta["probe_failures"], delta["state"]) == (2, 1, CLOSED)
+
+
+def test_auth_and_connection_errors_are_recognized():
+    assert is_backend_failure("Error: 401 Unauthorized - invalid platform token")
+    assert is_backend_failure("request to https://abc.apps.dynatrace.com failed: connect ECONNREFUSED")
+    assert is_backend_failure("Forbidden: missing scope storage:logs:read")
+    assert not is_backend_failure("DQL syntax error at position 12: unknown command 'fitler'")
+    assert not is_backend_failure("429 Too Many Requests")
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    breaker = CircuitBreaker("prod", failure_threshold=1, reset_timeout=30)
+    monkeypatch.setattr(tools, "get_circuit_breaker", lambda environment: breaker)
+    monkeypatch.setattr(tools, "get_request_hedger", lambda environment: tools.RequestHedger(set()))
+    return breaker
+
+
+def _call(monkeypatch, tool_name, outcome):
+    monkeypatch.setattr(tools, "get_session_pool", lambda environment: FakePool(outcome))
+    return asyncio.run(tools.call_mcp_tool(tool_name, {}))
+
+
+def test_auth_error_result_counts_as_a_failure(breaker, monkeypatch):
+    _call(monkeypatch, "list_problems", FakeResult("401 Unauthorized: token expired", is_error=True))
+    assert breaker.state == OPEN
+    assert "token expired" in breaker.last_error
+
+
+def test_ordinary_tool_error_result_proves_the_backend_reachable(breaker, monkeypatch):
+    breaker.consecutive_failures = 5
+    _call(monkeypatch, "execute_dql", FakeResult("DQL syntax error: unknown command", is_error=True))
+    assert breaker.state == CLOSED
+    assert breaker.consecutive_failures == 0
+
+
+def test_slow_dql_query_does_not_count_but_other_timeouts_do(breaker, monkeypatch):
+    with pytest.raises(TimeoutError):
+        _call(monkeypatch, "execute_dql", TimeoutError("MCP tool 'execute_dql' did not respond"))
+    assert breaker.state == CLOSED
+    assert breaker.stats()["failures"] == 0
+
+    with pytest.raises(TimeoutError):
+        _call(monkeypatch, "list_problems", TimeoutError("MCP tool 'list_problems' did not respond"))
+    assert breaker.state == OPEN
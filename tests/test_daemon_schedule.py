@@ -0,0 +1,73 @@
+"""Tests for the daemon's interval and cron schedules"""
+
+from datetime import datetime
+
+import pytest
+
+from src.daemon import CronSchedule, IntervalSchedule, schedule_from_config
+
+
+def test_cron_fields_support_lists_ranges_and_steps():
+    schedule = CronSchedule("*/15 9-17 * * 1-5")
+    assert schedule.minutes == {0, 15, 30, 45}
+    assert schedule.hours == set(range(9, 18))
+    assert schedule.weekdays == {1, 2, 3, 4, 5}
+    assert CronSchedule("5/20 0 * * *").minutes == {5, 25, 45}
+    assert CronSchedule("0 0 * * 7").weekdays == {0}
+
+
+def test_next_run_is_strictly_after_the_given_time():
+    schedule = CronSchedule("30 * * * *")
+    assert schedule.next_run(datetime(2024, 5, 1, 10, 29, 59)) == datetime(2024, 5, 1, 10, 30)
+    assert schedule.next_run(datetime(2024, 5, 1, 10, 30)) == datetime(2024, 5, 1, 11, 30)
+
+
+def test_next_run_rolls_over_days_months_and_years():
+    assert CronSchedule("0 2 * * *").next_run(datetime(2024, 5, 1, 3, 0)) == datetime(2024, 5, 2, 2, 0)
+    assert CronSchedule("0 0 1 * *").next_run(datetime(2024, 1, 31, 12, 0)) == datetime(2024, 2, 1, 0, 0)
+    assert CronSchedule("0 0 1 1 *").next_run(datetime(2024, 6, 1)) == datetime(2025, 1, 1, 0, 0)
+    assert CronSchedule("0 0 29 2 *").next_run(datetime(2024, 3, 1)) == datetime(2028, 2, 29, 0, 0)
+
+
+def test_weekday_schedule_skips_the_weekend():
+    # 2024-05-03 is a Friday
+    assert CronSchedule("0 9 * * 1-5").next_run(datetime(2024, 5, 3, 10, 0)) == datetime(2024, 5, 6, 9, 0)
+
+
+def test_restricted_day_fields_match_either_day():
+    # 13th of the month or any Friday; 2024-05-03 is a Friday
+    schedule = CronSchedule("0 0 13 * 5")
+    assert schedule.next_run(datetime(2024, 5, 1)) == datetime(2024, 5, 3, 0, 0)
+    assert schedule.next_run(datetime(2024, 5, 11)) == datetime(2024, 5, 13, 0, 0)
+
+
+@pytest.mark.parametrize("spec", ["* * * *", "60 * * * *", "0 24 * * *", "0 0 0 * *", "5-1 * * * *"])
+def test_invalid_specs_are_rejected(spec):
+    with pytest.raises(ValueError):
+        CronSchedule(spec)
+
+
+def test_impossible_spec_never_fires():
+    with pytest.raises(ValueError, match="never fires"):
+        CronSchedule("0 0 31 2 *").next_run(datetime(2024, 1, 1))
+
+
+def test_schedule_from_config_prefers_cron_then_interval(monkeypatch):
+    monkeypatch.delenv("DT_DAEMON_CRON", raising=False)
+    monkeypatch.delenv("DT_DAEMON_INTERVAL", raising=False)
+    assert isinstance(schedule_from_config(cron="0 * * * *"), CronSchedule)
+    assert schedule_from_config(interval="15m").seconds == 900
+    assert schedule_from_config(interval="90").seconds == 90
+    assert schedule_from_config().seconds == 3600
+
+    with pytest.raises(ValueError, match="Invalid daemon interval"):
+        schedule_from_config(interval="soon")
+
+    monkeypatch.setenv("DT_DAEMON_CRON", "0 6 * * *")
+    assert str(schedule_from_config(interval="15m")) == "cron '0 6 * * *'"
+
+
+def test_interval_schedule_counts_from_previous_start():
+    assert IntervalSchedule(60).next_run(datetime(2024, 5, 1, 10, 0)) == datetime(2024, 5, 1, 10, 1)
+    with pytest.raises(ValueError):
+        IntervalSchedule(0)
@@ -0,0 +1,117 @@
+"""Tests for whole-run deadlines and the per-call timeouts derived from them"""
+
+import threading
+import time
+
+import pytest
+
+from src import crew_orchestrator
+from src.crew_orchestrator import DynatraceObservabilityCrew
+from src.tools.deadline import (
+    Deadline,
+    DeadlineExceeded,
+    MIN_CALL_TIMEOUT,
+    get_deadline,
+    run_budget_from_env,
+    set_deadline,
+    tool_call_timeout,
+)
+
+
+def test_call_timeouts_are_capped_by_the_time_left():
+    deadline = Deadline(budget_seconds=10)
+    assert deadline.timeout_for(180) == pytest.approx(10, abs=0.1)
+    assert deadline.timeout_for(5) == 5
+    assert deadline.timeout_for(None) == pytest.approx(10, abs=0.1)
+    assert Deadline().timeout_for(180) == 180
+
+
+def test_almost_spent_budget_still_allows_a_minimal_call():
+    deadline = Deadline(budget_seconds=0.001)
+    deadline.expires_at += 0.5  # not yet expired, but far below the minimum call timeout
+    assert deadline.timeout_for(60) == MIN_CALL_TIMEOUT
+
+
+def test_expired_and_cancelled_deadlines_refuse_calls():
+    expired = Deadline(budget_seconds=0.001)
+    expired.expires_at -= 1
+    with pytest.raises(DeadlineExceeded, match="time budget"):
+        expired.check()
+
+    cancelled = Deadline()
+    cancelled.cancel("MCP backend unavailable")
+    cancelled.cancel("second reason")
+    assert cancelled.wait(0) is True
+    assert cancelled.remaining() == 0.0
+    with pytest.raises(DeadlineExceeded, match="MCP backend unavailable"):
+        cancelled.timeout_for(30)
+
+
+def test_tool_timeouts_follow_the_environment_deadline():
+    assert tool_call_timeout("execute_dql", "deadline-test") == 180
+    set_deadline("deadline-test", Deadline(budget_seconds=20))
+    try:
+        assert tool_call_timeout("execute_dql", "deadline-test") == pytest.approx(20, abs=0.1)
+        assert tool_call_timeout("execute_dql", "other") == 180
+    finally:
+        set_deadline("deadline-test", None)
+    assert get_deadline("deadline-test") is None
+
+
+def test_run_budget_from_env(monkeypatch):
+    monkeypatch.setenv("DT_RUN_TIME_BUDGET", "15m")
+    assert run_budget_from_env() == 900
+    monkeypatch.setenv("DT_RUN_TIME_BUDGET", "")
+    assert run_budget_from_env() is None
+    monkeypatch.setenv("DT_RUN_TIME_BUDGET", "soon")
+    with pytest.raises(ValueError):
+        run_budget_from_env()
+
+
+def test_failed_run_does_not_leave_its_deadline_registered(monkeypatch):
+    monkeypatch.setattr(crew_orchestrator, "get_circuit_breaker", lambda environment: None)
+    crew = DynatraceObservabilityCrew(verbose=False, incremental=False, time_budget=60)
+
+    def failing_prefetch():
+        assert get_deadline("") is not None
+        raise ConnectionError("MCP server not reachable")
+
+    monkeypatch.setattr(crew, "prefetch_data", failing_prefetch)
+    monkeypatch.setenv("DT_PREFETCH_ENABLED", "true")
+    with pytest.raises(ConnectionError):
+        crew.run_analysis()
+    assert get_deadline("") is None
+
+
+def test_abandoned_kickoff_keeps_failing_fast_until_it_exits(monkeypatch):
+    monkeypatch.setattr(crew_orchestrator, "get_circuit_breaker", lambda environment: None)
+    monkeypatch.setattr(crew_orchestrator, "KICKOFF_GRACE_SECONDS", 0.05)
+    monkeypatch.setenv("DT_PREFETCH_ENABLED", "false")
+    crew = DynatraceObservabilityCrew(verbose=False, incremental=False, time_budget=0.2)
+    release = threading.Event()
+    late_calls = []
+
+    class StuckCrew:
+        agents = []
+        tasks = [type("Task", (), {"agent": type("Agent", (), {"role": "Log Analyst"})()})()]
+
+        def kickoff(self):
+            release.wait(5)
+            try:
+                tool_call_timeout("execute_dql", "")
+            except DeadlineExceeded as e:
+                late_calls.append(e)
+
+    monkeypatch.setattr(crew, "create_crew", lambda prefetched, delta_plan: StuckCrew())
+
+    assert crew.run_analysis()["status"] == "partial"
+    with pytest.raises(DeadlineExceeded):
+        tool_call_timeout("execute_dql", "")
+
+    release.set()
+    for _ in range(100):
+        if get_deadline("") is None:
+            break
+        time.sleep(0.02)
+    assert len(late_calls) == 1
+    assert get_deadline("") is None
@@ -0,0 +1,87 @@
+"""Tests for the DQL rewriter"""
+
+import pytest
+
+from src.tools.dql_optimizer import optimize_dql, parse_lookback, push_filters_down
+from src.tools.dql import split_pipeline
+
+
+@pytest.mark.parametrize("statement", [
+    "fetch logs, from:now()-7d",
+    "fetch logs, from:-7d",
+    "fetch logs, from: now()-7d",
+    "fetch logs, from:now() - 7 d",
+    "fetch logs,from : NOW()-7d",
+])
+def test_relative_windows_are_clamped_in_every_spelling(statement):
+    result = optimize_dql(statement, max_window_hours=24)
+    assert "from:now()-1d" in result["statement"].replace(" ", "")
+    assert any("clamped timeframe from 7d to 1d" in change for change in result["changes"])
+
+
+def test_timeframe_argument_is_clamped_in_every_spelling():
+    for timeframe in ("7d", "-7d", "now()-7d"):
+        assert optimize_dql("fetch logs", timeframe=timeframe, max_window_hours=24)["timeframe"] == "1d"
+    assert parse_lookback("now() - 90 m") == 5400
+
+
+def test_windows_inside_the_limit_are_left_alone():
+    result = optimize_dql("fetch logs, from:now()-2h | limit 5", max_window_hours=24)
+    assert "from:now()-2h" in result["statement"]
+
+
+def test_projection_is_added_when_only_projected_fields_are_referenced():
+    result = optimize_dql('fetch logs | filter loglevel == "ERROR" | sort timestamp desc')
+    assert "| fields timestamp, status, loglevel" in result["statement"]
+
+
+@pytest.mark.parametrize("statement", [
+    'fetch logs | filter k8s.pod.name == "checkout-1"',
+    "fetch logs | sort trace_id",
+    "fetch logs | fields timestamp, content",
+    "fetch logs | summarize count(), by:{loglevel}",
+])
+def test_projection_is_skipped_when_it_could_drop_referenced_fields(statement):
+    assert "fields timestamp, status" not in optimize_dql(statement)["statement"]
+
+
+def test_default_limit_is_added_to_unbounded_record_queries():
+    assert optimize_dql("fetch logs")["statement"].endswith("| limit 200")
+    assert "limit" not in optimize_dql("fetch logs | summarize count()")["statement"]
+
+
+def test_filters_move_over_sort_but_not_over_limit():
+    stages, moves = push_filters_down(split_pipeline("fetch logs | sort timestamp | filter a == 1 | limit 5 | filter b == 2"))
+    assert stages == ["fetch logs", "filter a == 1", "sort timestamp", "limit 5", "filter b == 2"]
+    assert moves == 1
+
+
+def test_non_fetch_statements_are_unchanged():
+    assert optimize_dql("timeseries avg(dt.host.cpu.usage)")["changes"] == []
+
+
+def test_window_ending_in_the_past_is_measured_from_to():
+    statement = "fetch logs, from:now()-7d, to:now()-6d | limit 5"
+    result = optimize_dql(statement, max_window_hours=24)
+    assert result["statement"].startswith("fetch logs, from:now()-7d, to:now()-6d\n")
+    assert not any("clamped" in change for change in result["changes"])
+
+
+def test_window_ending_in_the_past_is_clamped_towards_to():
+    result = optimize_dql("fetch logs, from:now()-7d, to: now()-5d | limit 5", max_window_hours=24)
+    assert result["statement"].startswith("fetch logs, from:now()-6d, to: now()-5d")
+    assert any("clamped timeframe from 2d to 1d" in change for change in result["changes"])
+
+
+def test_absolute_window_is_clamped_to_an_absolute_start():
+    result = optimize_dql(
+        'fetch logs, from:"2026-01-01T00:00:00Z", to:"2026-01-08T00:00:00Z" | limit 5', max_window_hours=24
+    )
+    assert result["statement"].startswith('fetch logs, from:"2026-01-07T00:00:00+00:00", to:"2026-01-08T00:00:00Z"')
+    assert any("clamped timeframe from 7d to 1d" in change for change in result["changes"])
+
+
+def test_unparseable_to_leaves_the_window_alone():
+    result = optimize_dql("fetch logs, from:now()-7d, to:@d | limit 5", max_window_hours=24)
+    assert result["statement"].startswith("fetch logs, from:now()-7d, to:@d\n")
+    assert not any("clamped" in change for change in result["changes"])
@@ -0,0 +1,107 @@
+"""Tests for the persistent natural-language -> DQL translation cache"""
+
+from src.tools.dql_translation_cache import (
+    DQLTranslationCache,
+    bind_template,
+    parameterize_prompt,
+    templatize_response,
+)
+
+CHECKOUT_PROMPT = "Error logs from the last 6 hours for service checkout?"
+CHECKOUT_DQL = 'fetch logs, from:now()-6h | filter service.name == "checkout"'
+
+
+def test_time_ranges_and_entities_are_parameterized_out():
+    template, params = parameterize_prompt(CHECKOUT_PROMPT)
+    assert template == "error logs from the last ${timeframe} for service ${entity_0}"
+    assert params == {"timeframe": "6h", "entity_0": "checkout"}
+
+    other_template, other_params = parameterize_prompt("error logs from the past 2 days for service payments")
+    assert other_template == template
+    assert other_params == {"timeframe": "2d", "entity_0": "payments"}
+
+
+def test_entity_ids_are_parameterized():
+    template, params = parameterize_prompt("show problems for HOST-ABCDEF0123456789")
+    assert template == "show problems for ${entity_0}"
+    assert params == {"entity_0": "HOST-ABCDEF0123456789"}
+
+
+def test_response_round_trips_through_template():
+    _, params = parameterize_prompt(CHECKOUT_PROMPT)
+    templated = templatize_response(CHECKOUT_DQL, params)
+    assert templated == 'fetch logs, from:now()-${timeframe} | filter service.name == "${entity_0}"'
+    assert bind_template(templated, params) == CHECKOUT_DQL
+
+
+def test_response_missing_a_parameter_is_not_templatized():
+    _, params = parameterize_prompt(CHECKOUT_PROMPT)
+    assert templatize_response("fetch logs | limit 10", params) is None
+
+
+def test_template_is_reused_for_another_entity_and_window(tmp_path):
+    cache = DQLTranslationCache(path=str(tmp_path / "translations.sqlite"))
+    assert cache.get(CHECKOUT_PROMPT) is None
+    cache.put(CHECKOUT_PROMPT, CHECKOUT_DQL)
+
+    assert cache.get("error logs from the past 2 days for service payments") == (
+        'fetch logs, from:now()-2d | filter service.name == "payments"'
+    )
+    assert cache.stats["template_hits"] == 1
+    assert cache.stats["misses"] == 1
+
+
+def test_untemplatizable_translation_only_serves_the_same_prompt(tmp_path):
+    cache = DQLTranslationCache(path=str(tmp_path / "translations.sqlite"))
+    cache.put(CHECKOUT_PROMPT, "fetch logs | limit 10")
+
+    assert cache.get("error logs from the last 6 hours for service checkout") == "fetch logs | limit 10"
+    assert cache.get("error logs from the last 6 hours for service payments") is None
+    assert cache.stats["exact_hits"] == 1
+
+
+def test_translations_persist_and_expire(tmp_path):
+    path = str(tmp_path / "translations.sqlite")
+    DQLTranslationCache(path=path).put(CHECKOUT_PROMPT, CHECKOUT_DQL)
+    assert DQLTranslationCache(path=path).get(CHECKOUT_PROMPT) == CHECKOUT_DQL
+    assert DQLTranslationCache(path=path, ttl_days=0).get(CHECKOUT_PROMPT) is None
+
+
+def test_translations_are_scoped_by_environment(tmp_path):
+    cache = DQLTranslationCache(path=str(tmp_path / "translations.sqlite"))
+    cache.put(CHECKOUT_PROMPT, CHECKOUT_DQL, environment="prod")
+
+    assert cache.get(CHECKOUT_PROMPT, environment="prod") == CHECKOUT_DQL
+    assert cache.get(CHECKOUT_PROMPT, environment="staging") is None
+    assert cache.get(CHECKOUT_PROMPT) is None
+
+
+def test_values_inside_longer_names_are_not_templated():
+    _, params = parameterize_prompt("error logs for service checkout")
+    dql = 'fetch logs | filter service.name == "checkout" or service.name == "checkout-v2" or k8s.pod.name == "mycheckout"'
+    templated = templatize_response(dql, params)
+
+    assert templated == (
+        'fetch logs | filter service.name == "${entity_0}" or service.name == "checkout-v2" '
+        'or k8s.pod.name == "mycheckout"'
+    )
+    assert bind_template(templated, {"entity_0": "payments"}).count("checkout") == 2
+
+
+def test_value_only_found_inside_another_token_is_not_templatized():
+    _, params = parameterize_prompt("error logs for service cart")
+    assert templatize_response('fetch logs | filter service.name == "cartservice"', params) is None
+
+
+def test_error_results_are_not_stored_as_translations(monkeypatch, tmp_path):
+    from src.tools import dynatrace_mcp_tools as tools
+
+    cache = DQLTranslationCache(path=str(tmp_path / "translations.sqlite"))
+    monkeypatch.setattr(tools, "get_translation_cache", lambda: cache)
+    monkeypatch.setattr(
+        tools, "invoke_mcp_tool",
+        lambda tool_name, arguments, environment="": tools.ToolErrorText("Request failed: 503 from upstream")
+    )
+
+    assert tools.GenerateDQLTool()._run(CHECKOUT_PROMPT) == "Request failed: 503 from upstream"
+    assert cache.get(CHECKOUT_PROMPT) is None
@@ -0,0 +1,71 @@
+"""Tests for DQL pre-validation"""
+
+import asyncio
+
+from src.tools import dynatrace_mcp_tools as tools
+from src.tools.dql_validator import DQLValidator, local_syntax_check, parse_verify_response
+
+
+class FakeResult:
+    def __init__(self, text, is_error=False):
+        self.isError = is_error
+        self.content = [type("Text", (), {"text": text})()]
+
+
+def test_local_check_rejects_malformed_statements():
+    assert local_syntax_check('fetch logs | filter a == "x') == "Unterminated string literal (\")"
+    assert "Unclosed" in local_syntax_check("fetch logs | filter (a == 1")
+    assert "trailing" in local_syntax_check("fetch logs |")
+    assert "data source" in local_syntax_check("filter a == 1")
+    assert local_syntax_check('fetch logs | filter content == "a|b"') is None
+
+
+def test_verify_response_is_interpreted():
+    assert parse_verify_response('{"valid": false, "notifications": ["bad"]}')[0] is False
+    assert parse_verify_response("The DQL statement is valid.")[0] is True
+    assert parse_verify_response("❌ Syntax error at position 4")[0] is False
+
+
+def test_structured_verdict_wins_over_keywords():
+    hint = (
+        "DQL Statement Verification:\n\nPlease consider the following notifications:\n"
+        "- Records with an invalid loglevel are excluded\n\n"
+        'The DQL statement is valid - you can use the "execute_dql" tool.'
+    )
+    assert parse_verify_response(hint)[0] is True
+    assert parse_verify_response('{"result": {"valid": true, "notifications": ["invalid field hint"]}}')[0] is True
+    assert parse_verify_response('Verification result: {"valid": true, "hint": "not valid for spans"}')[0] is True
+    assert parse_verify_response("The DQL statement is invalid. Please adapt your statement.")[0] is False
+
+
+def test_verdicts_are_memoized_per_normalized_statement():
+    calls = []
+
+    async def verify(statement):
+        calls.append(statement)
+        return "The DQL statement is valid."
+
+    validator = DQLValidator(verify)
+    asyncio.run(validator.validate("fetch logs | limit 5"))
+    assert asyncio.run(validator.validate("fetch  logs\n| limit 5")) == (True, "The DQL statement is valid.")
+    assert len(calls) == 1
+    assert validator.stats["memo_hits"] == 1
+
+
+def test_server_error_results_mean_unavailable_and_are_not_memoized(monkeypatch):
+    responses = [FakeResult("Error: invalid token (401 Unauthorized)", is_error=True),
+                 FakeResult("The DQL statement is valid.")]
+
+    async def fake_call(tool_name, arguments, environment=""):
+        return responses.pop(0)
+
+    monkeypatch.setattr(tools, "call_mcp_tool", fake_call)
+    validator = DQLValidator(lambda statement: tools._verify_dql(statement))
+
+    valid, message = asyncio.run(validator.validate("fetch logs | limit 5"))
+    assert valid is True
+    assert message.startswith("verification unavailable")
+
+    # The next check reaches the server again and gets a real verdict
+    assert asyncio.run(validator.validate("fetch logs | limit 5")) == (True, "The DQL statement is valid.")
+    assert validator.stats["server_checks"] == 2
@@ -0,0 +1,99 @@
+"""Tests for micro-batched entity lookups"""
+
+import asyncio
+import json
+
+from src.tools.entity_batcher import EntityLookupBatcher, split_entity_response
+
+
+def test_json_response_is_split_by_entity_name():
+    text = json.dumps([{"name": "payment-service"}, {"name": "checkout-service"}])
+    split = split_entity_response(text, ["payment", "checkout"])
+    assert json.loads(split["payment"]) == [{"name": "payment-service"}]
+    assert json.loads(split["checkout"]) == [{"name": "checkout-service"}]
+
+
+def test_fuzzy_matched_name_is_left_unattributed():
+    # The server matched "PaymentSvc" to "payment-service"; substring matching cannot tell
+    text = json.dumps([{"name": "payment-service"}, {"name": "checkout-service"}])
+    split = split_entity_response(text, ["PaymentSvc", "checkout"])
+    assert split["PaymentSvc"] is None
+    assert json.loads(split["checkout"]) == [{"name": "checkout-service"}]
+
+
+def test_name_is_not_found_only_when_every_entity_belongs_to_another_name():
+    text = "Found entities:\n- checkout-service (SERVICE-1)"
+    split = split_entity_response(text, ["payment", "checkout"])
+    assert "No monitored entity found" in split["payment"]
+    assert "SERVICE-1" in split["checkout"]
+
+
+def test_exact_name_wins_over_a_longer_name_containing_it():
+    text = json.dumps([{"name": "cart"}, {"name": "cartservice"}, {"name": "cartservice-canary"}])
+    split = split_entity_response(text, ["cart", "cartservice"])
+    assert json.loads(split["cart"]) == [{"name": "cart"}]
+    assert json.loads(split["cartservice"]) == [{"name": "cartservice"}, {"name": "cartservice-canary"}]
+
+
+def test_prefix_name_is_not_credited_with_a_longer_names_entities():
+    text = "Found entities:\n- cartservice (SERVICE-2)\n- cartservice-canary (SERVICE-3)"
+    split = split_entity_response(text, ["cart", "cartservice"])
+    assert "No monitored entity found" in split["cart"]
+    assert "SERVICE-2" in split["cartservice"] and "SERVICE-3" in split["cartservice"]
+
+
+def test_unsplittable_text_is_unattributed_for_every_name():
+    split = split_entity_response("Something went sideways", ["a", "b"])
+    assert split == {"a": None, "b": None}
+
+
+def test_single_name_gets_the_whole_response():
+    assert split_entity_response("anything", ["a"]) == {"a": "anything"}
+
+
+def test_names_arriving_in_one_window_share_a_call():
+    sent = []
+
+    async def fetch(names):
+        sent.append(list(names))
+        return "\n".join(f"- {name}-service (SERVICE-{i})" for i, name in enumerate(names))
+
+    async def scenario():
+        batcher = EntityLookupBatcher(fetch, window=0.01)
+        return await asyncio.gather(batcher.lookup("payment"), batcher.lookup("checkout"), batcher.lookup("payment"))
+
+    results = asyncio.run(scenario())
+    assert sent == [["payment", "checkout"]]
+    assert results[0] == results[2]
+    assert all(attributed for _, attributed in results)
+
+
+def test_unattributed_lookup_returns_the_full_text_flagged():
+    async def fetch(names):
+        return json.dumps([{"name": "payment-service"}, {"name": "something-else"}])
+
+    async def scenario():
+        batcher = EntityLookupBatcher(fetch, window=0.01)
+        return await batcher.lookup_many(["payment", "other"])
+
+    results = asyncio.run(scenario())
+    assert results["payment"][1] is True
+    assert results["other"] == (json.dumps([{"name": "payment-service"}, {"name": "something-else"}]), False)
+
+
+def test_unattributed_results_are_not_cached_per_name(monkeypatch):
+    from src.tools import dynatrace_mcp_tools as tools
+    from src.tools.mcp_cache import ToolResultCache
+
+    async def fetch(names):
+        return json.dumps([{"name": "payment-service"}, {"name": "fzy-match"}])
+
+    cache = ToolResultCache(ttls={"find_entity_by_name": 60})
+    monkeypatch.setattr(tools, "get_tool_cache", lambda: cache)
+    monkeypatch.setitem(tools._entity_batchers, "test-env", EntityLookupBatcher(fetch, window=0.01))
+
+    results = asyncio.run(tools.lookup_entities(["payment", "fuzzy"], "test-env"))
+
+    assert "could not be isolated" in results["fuzzy"]
+    assert cache.get("find_entity_by_name", {"entityNames": ["fuzzy"], "__environment": "test-env"}) is None
+    assert cache.get("find_entity_by_name", {"entityNames": ["payment"], "__environment": "test-env"}) is not None
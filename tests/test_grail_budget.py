@@ -0,0 +1,37 @@
+"""Tests for Grail scan-budget metering"""
+
+from src.tools.grail_budget import GrailBudgetMeter, downscope_statement, parse_scan_stats
+
+
+def test_scan_stats_are_parsed_from_markdown_and_json():
+    stats = parse_scan_stats('Scanned Bytes: 1.5 GB\nScanned Records: 1,200\n[{"a": 1}, {"a": 2}]')
+    assert stats == {"bytes_scanned": 1.5e9, "records_scanned": 1200.0, "records_returned": 2.0}
+
+
+def test_meter_moves_from_ok_to_soft_to_hard():
+    meter = GrailBudgetMeter(hard_limit_gb=10, soft_limit_gb=8)
+    assert meter.check() == "ok"
+    meter.record("Scanned Bytes: 8 GB", agent="Log Analyst")
+    assert meter.check() == "soft"
+    meter.record("Scanned Bytes: 2 GB", agent="Log Analyst")
+    assert meter.check() == "hard"
+    assert meter.remaining_gb == 0.0
+
+
+def test_summary_attributes_usage_per_agent_and_resets_per_run():
+    meter = GrailBudgetMeter(hard_limit_gb=10)
+    meter.record("Scanned Bytes: 500 MB", agent="Log Analyst")
+    meter.record_decision("hard", agent="Problem Analyst")
+    summary = meter.summary()
+    assert summary["run"]["gb_scanned"] == 0.5
+    assert summary["by_agent"]["Log Analyst"]["queries"] == 1
+    assert summary["by_agent"]["Problem Analyst"]["refused"] == 1
+
+    meter.start_run()
+    assert meter.summary()["run"]["queries"] == 0
+
+
+def test_downscoping_caps_rows_and_scan_size():
+    statement = downscope_statement("fetch logs, from:now()-2h | filter a == 1", 2.5)
+    assert "scanLimitGBytes:2.5" in statement
+    assert statement.endswith("| limit 100")
@@ -0,0 +1,116 @@
+"""Tests for the LLM response cache"""
+
+import pytest
+
+from src.agents import llm_cache
+from src.agents.llm_cache import (
+    CachedLLM,
+    LLMResponseCache,
+    MemoryLLMCache,
+    SQLiteLLMCache,
+    llm_cache_delta,
+    make_llm_cache_key,
+)
+from src.agents.specialist_agents import create_llm
+
+MESSAGES = [{"role": "user", "content": "Summarize P-123"}]
+
+
+def test_key_depends_on_model_sampling_and_prompt():
+    key = make_llm_cache_key("gpt-4o-mini", 0, MESSAGES)
+    assert key == make_llm_cache_key("gpt-4o-mini", 0, [dict(MESSAGES[0])])
+    assert key != make_llm_cache_key("gpt-4o", 0, MESSAGES)
+    assert key != make_llm_cache_key("gpt-4o-mini", 0.3, MESSAGES)
+    assert key != make_llm_cache_key("gpt-4o-mini", 0, MESSAGES, stop=["\nObservation"])
+
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryLLMCache(max_entries=2)
+    backend.put("a", "1")
+    backend.put("b", "2")
+    backend.get("a")
+    assert backend.put("c", "3") == 1
+    assert backend.get("b") is None
+    assert backend.size() == {"entries": 2, "bytes": 2}
+
+
+def test_sqlite_backend_evicts_by_size_and_persists(tmp_path):
+    path = str(tmp_path / "llm.sqlite")
+    backend = SQLiteLLMCache(path, max_entries=10, max_bytes=10)
+    backend.put("a", "x" * 6)
+    assert backend.put("b", "y" * 6) == 1
+    assert SQLiteLLMCache(path).get("b") == "y" * 6
+    assert SQLiteLLMCache(path).get("a") is None
+
+
+def test_cached_llm_replays_identical_calls():
+    cache = LLMResponseCache(MemoryLLMCache())
+    llm = CachedLLM(model="gpt-4o-mini", temperature=0, agent_name="problem_analyst", response_cache=cache)
+    calls = []
+    llm._call_model = lambda *args: calls.append(args) or "P-123 is a disk issue"
+
+    before = cache.stats()
+    assert llm.call(MESSAGES) == "P-123 is a disk issue"
+    assert llm.call(MESSAGES) == "P-123 is a disk issue"
+    assert llm.last_cache_hit is True
+    assert len(calls) == 1
+
+    delta = llm_cache_delta(before, cache.stats())
+    assert (delta["hits"], delta["misses"], delta["hit_rate"]) == (1, 1, 0.5)
+    assert delta["by_agent"]["problem_analyst"]["hits"] == 1
+
+
+def test_tool_calls_bypass_the_cache():
+    cache = LLMResponseCache(MemoryLLMCache())
+    llm = CachedLLM(model="gpt-4o-mini", temperature=0, response_cache=cache)
+    llm._call_model = lambda *args: "tool call"
+    llm.call(MESSAGES, tools=[{"name": "list_problems"}])
+    llm.call(MESSAGES, tools=[{"name": "list_problems"}])
+    assert cache.stats()["bypassed"] == 2
+    assert cache.stats()["entries"] == 0
+
+
+@pytest.fixture
+def default_cache_settings(monkeypatch):
+    for name in ("DT_LLM_CACHE_SAMPLED", "DT_LLM_CACHE_BYPASS"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setattr(llm_cache, "_cache", LLMResponseCache(MemoryLLMCache()))
+    monkeypatch.setenv("DT_LLM_CACHE_BACKEND", "memory")
+
+
+def test_only_deterministic_agents_are_cached_by_default(default_cache_settings, monkeypatch):
+    assert create_llm(temperature=0, agent="extractor").cache_bypass is False
+    assert create_llm(temperature=0.4, agent="log_analyst").cache_bypass is True
+    assert create_llm(temperature=0.4, agent="log_analyst", cache=True).cache_bypass is False
+    assert create_llm(temperature=0, agent="extractor", cache=False).cache_bypass is True
+
+    monkeypatch.setenv("DT_LLM_CACHE_SAMPLED", "true")
+    assert create_llm(temperature=0.4, agent="log_analyst").cache_bypass is False
+
+    monkeypatch.setenv("DT_LLM_CACHE_BYPASS", "log_analyst")
+    assert create_llm(temperature=0.4, agent="log_analyst", cache=True).cache_bypass is True
+
+
+def test_analysts_and_onboarding_guide_opt_in_to_the_cache(default_cache_settings):
+    from src.agents import specialist_agents
+
+    cached = {
+        factory: factory().llm.cache_bypass is False
+        for factory in (
+            specialist_agents.create_problem_analyst_agent,
+            specialist_agents.create_security_analyst_agent,
+            specialist_agents.create_log_analyst_agent,
+            specialist_agents.create_insights_synthesizer_agent,
+            specialist_agents.create_onboarding_guide_agent,
+        )
+    }
+    assert [factory.__name__ for factory, on in cached.items() if not on] == ["create_insights_synthesizer_agent"]
+
+
+def test_backend_missing_a_method_fails_on_instantiation():
+    class Incomplete(llm_cache.LLMCacheBackend):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        Incomplete()
@@ -0,0 +1,49 @@
+"""Tests for Drain-style log template mining"""
+
+from src.tools.log_templates import LogTemplateMiner, format_templates, mask_line
+
+
+def test_variable_parts_are_masked():
+    line = "2024-05-01T10:00:00Z user 42 from 10.0.0.1:8080 hit SERVICE-ABCDEF0123456789 in 35ms"
+    assert mask_line(line) == "<TS> user <NUM> from <IP> hit <ENTITY> in <NUM>"
+    assert mask_line("request 123e4567-e89b-12d3-a456-426614174000 failed") == "request <UUID> failed"
+
+
+def test_similar_lines_share_a_template():
+    miner = LogTemplateMiner()
+    first = miner.add("Connection to primary timed out after 30s")
+    second = miner.add("Connection to replica timed out after 45s")
+    third = miner.add("Payment declined for order 17")
+
+    assert first is second
+    assert first.template == "Connection to <*> timed out after <NUM>"
+    assert first.count == 2
+    assert third is not first
+    assert len(miner.clusters) == 2
+
+
+def test_clusters_track_time_range_and_samples():
+    miner = LogTemplateMiner(max_samples=2)
+    for index, timestamp in enumerate(["10:02", "10:00", "10:05"]):
+        miner.add(f"retrying job {index}", timestamp=timestamp, record_id=f"r{index}")
+    cluster = miner.clusters[0]
+    assert (cluster.first_seen, cluster.last_seen) == ("10:00", "10:05")
+    assert cluster.sample_ids == ["r0", "r1"]
+
+
+def test_report_ranks_templates_by_frequency():
+    miner = LogTemplateMiner()
+    miner.add_many((f"cache miss for key {i}", None, None) for i in range(3))
+    miner.add("disk full", None, None)
+    miner.add("worker restarted", None, None)
+
+    report = format_templates(miner, limit=2, source="checkout")
+    lines = report.splitlines()
+    assert lines[0] == "Mined 5 log lines from checkout into 3 templates (showing top 2):"
+    assert lines[1].startswith("1. [3 lines, 60.0%]")
+    assert lines[2].strip() == "cache miss for key <NUM>"
+    assert lines[-1] == "... 1 more templates covering 1 lines"
+
+
+def test_report_without_lines():
+    assert format_templates(LogTemplateMiner(), source="checkout") == "No log lines found to mine in checkout."
@@ -0,0 +1,55 @@
+"""Tests for the MCP tool result cache"""
+
+import time
+
+from src.tools.mcp_cache import ToolResultCache, make_cache_key, stats_delta
+
+
+def test_equivalent_arguments_share_a_key():
+    assert make_cache_key("execute_dql", {"dqlStatement": "fetch  logs\n| limit 5", "timeframe": ""}) == \
+        make_cache_key("execute_dql", {"dqlStatement": "fetch logs | limit 5"})
+    assert make_cache_key("execute_dql", {"dqlStatement": 'filter a == "x  y"'}) != \
+        make_cache_key("execute_dql", {"dqlStatement": 'filter a == "x y"'})
+
+
+def test_hit_after_put_and_miss_after_expiry():
+    cache = ToolResultCache(ttls={"list_problems": 0.05})
+    cache.put("list_problems", {}, "P-1")
+    assert cache.get("list_problems", {}) == "P-1"
+    time.sleep(0.06)
+    assert cache.get("list_problems", {}) is None
+    assert cache.stats()["expired"] == 1
+
+
+def test_tools_with_zero_ttl_are_never_cached():
+    cache = ToolResultCache(ttls={"chat_with_davis_copilot": 0})
+    cache.put("chat_with_davis_copilot", {"text": "hi"}, "hello")
+    assert cache.get("chat_with_davis_copilot", {"text": "hi"}) is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ToolResultCache(ttls={"find_entity_by_name": 60}, max_entries=2)
+    for name in ("a", "b"):
+        cache.put("find_entity_by_name", {"entityNames": [name]}, name)
+    cache.get("find_entity_by_name", {"entityNames": ["a"]})
+    cache.put("find_entity_by_name", {"entityNames": ["c"]}, "c")
+    assert cache.get("find_entity_by_name", {"entityNames": ["b"]}) is None
+    assert cache.get("find_entity_by_name", {"entityNames": ["a"]}) == "a"
+
+
+def test_disk_tier_survives_a_restart(tmp_path):
+    path = str(tmp_path / "cache.db")
+    ToolResultCache(ttls={"list_vulnerabilities": 60}, path=path).put("list_vulnerabilities", {}, "S-1")
+    reopened = ToolResultCache(ttls={"list_vulnerabilities": 60}, path=path)
+    assert reopened.get("list_vulnerabilities", {}) == "S-1"
+    assert reopened.stats()["disk_hits"] == 1
+
+
+def test_stats_delta_reports_the_hit_rate():
+    cache = ToolResultCache(ttls={"list_problems": 60})
+    before = cache.stats()
+    cache.get("list_problems", {})
+    cache.put("list_problems", {}, "P-1")
+    cache.get("list_problems", {})
+    delta = stats_delta(before, cache.stats())
+    assert (delta["hits"], delta["misses"], delta["hit_rate"]) == (1, 1, 0.5)
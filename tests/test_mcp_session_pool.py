@@ -0,0 +1,107 @@
+"""Tests for the pooled MCP sessions"""
+
+import asyncio
+
+import pytest
+
+from src.tools.mcp_session_pool import MCPSessionPool
+
+
+class FakeSession:
+    """Stands in for a PooledSession without starting an MCP server"""
+
+    def __init__(self, name, fail_calls=False):
+        self.name = name
+        self.fail_calls = fail_calls
+        self.alive = True
+        self.last_used = 0.0
+        self.closed = False
+
+    async def call_tool(self, tool_name, arguments):
+        await asyncio.sleep(0.01)
+        if self.fail_calls:
+            self.alive = False
+            raise ConnectionError("server went away")
+        return f"{self.name}:{tool_name}"
+
+    async def ping(self):
+        return self.alive
+
+    async def close(self):
+        self.closed = True
+        self.alive = False
+
+
+def make_pool(size, sessions):
+    """Pool whose _connect hands out `sessions` in order (an Exception entry fails the connect)"""
+    pool = MCPSessionPool(size=size, healthcheck_interval=3600)
+    queue = list(sessions)
+
+    async def connect():
+        item = queue.pop(0)
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    pool._connect = connect
+    return pool
+
+
+def test_sessions_are_reused():
+    pool = make_pool(1, [FakeSession("a")])
+
+    async def scenario():
+        first = await pool.call_tool("list_problems", {})
+        second = await pool.call_tool("list_problems", {})
+        return first, second
+
+    assert asyncio.run(scenario()) == ("a:list_problems", "a:list_problems")
+
+
+def test_waiter_gets_a_slot_when_a_reconnect_fails():
+    # The only session dies mid-call and its reconnect fails while a second
+    # caller waits; the freed slot must let the waiter open a new session
+    pool = make_pool(1, [FakeSession("a", fail_calls=True), RuntimeError("npx failed"), FakeSession("b")])
+
+    async def scenario():
+        failing = asyncio.ensure_future(pool.call_tool("list_problems", {}, timeout=5))
+        await asyncio.sleep(0)
+        waiting = asyncio.ensure_future(pool.call_tool("list_problems", {}, timeout=5))
+        with pytest.raises(RuntimeError):
+            await failing
+        return await asyncio.wait_for(waiting, timeout=2)
+
+    assert asyncio.run(scenario()) == "b:list_problems"
+
+
+def test_acquire_is_bounded_by_the_call_timeout():
+    pool = make_pool(1, [FakeSession("a")])
+
+    async def scenario():
+        held = await pool.acquire()
+        try:
+            with pytest.raises(TimeoutError):
+                await pool.call_tool("list_problems", {}, timeout=0.05)
+        finally:
+            pool.release(held)
+
+    asyncio.run(scenario())
+
+
+def test_timed_out_call_recycles_the_session():
+    slow = FakeSession("slow")
+
+    async def hang(tool_name, arguments):
+        await asyncio.sleep(10)
+
+    slow.call_tool = hang
+    pool = make_pool(1, [slow, FakeSession("fresh")])
+
+    async def scenario():
+        with pytest.raises(TimeoutError):
+            await pool.call_tool("execute_dql", {}, timeout=1.0)
+        return await pool.call_tool("execute_dql", {}, timeout=2)
+
+    assert asyncio.run(scenario()) == "fresh:execute_dql"
+    assert slow.closed
+    assert pool.stats["timeouts"] == 1
@@ -0,0 +1,86 @@
+"""Tests for per-agent model routing"""
+
+import pytest
+
+from src.agents import model_router
+from src.agents.model_router import RoutedLLM, RoutingPolicy, get_routing_policy, load_routing_config, parse_routes
+
+
+@pytest.fixture(autouse=True)
+def no_routing_overrides(monkeypatch, tmp_path):
+    for name in ("DT_LLM_MODEL", "DT_LLM_FALLBACK_MODEL", "DT_LLM_TIMEOUT_SECONDS", "DT_LLM_ROUTES"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("DT_LLM_ROUTING_FILE", str(tmp_path / "missing.json"))
+
+
+def test_defaults_keep_one_model_without_fallback_or_timeout():
+    for agent in ("problem_analyst", "log_analyst", "insights_synthesizer", "onboarding_guide"):
+        policy = get_routing_policy(agent)
+        assert policy.routes == [(None, "gpt-4o-mini")]
+        assert policy.fallbacks == []
+        assert policy.timeout is None
+
+
+def test_environment_sets_fallback_and_timeout(monkeypatch):
+    monkeypatch.setenv("DT_LLM_FALLBACK_MODEL", "gpt-4o")
+    monkeypatch.setenv("DT_LLM_TIMEOUT_SECONDS", "45")
+    policy = get_routing_policy("log_analyst")
+    assert policy.fallbacks == ["gpt-4o"]
+    assert policy.timeout == 45.0
+
+    monkeypatch.setenv("DT_LLM_TIMEOUT_SECONDS", "")
+    assert get_routing_policy("log_analyst").timeout is None
+
+
+def test_agent_entry_wins_over_task_type_and_defaults():
+    config = {
+        "defaults": {"fallbacks": ["gpt-4o"]},
+        "task_types": {"synthesis": {"model": "gpt-4o-mini", "timeout": 180}},
+        "agents": {"insights_synthesizer": {"routes": [
+            {"model": "gpt-4o-mini", "max_prompt_tokens": 32000}, {"model": "gpt-4o"}
+        ]}},
+    }
+    policy = get_routing_policy("insights_synthesizer", config)
+    assert policy.task_type == "synthesis"
+    assert policy.timeout == 180.0
+    assert policy.candidates(1000) == ["gpt-4o-mini", "gpt-4o"]
+    assert policy.candidates(50000) == ["gpt-4o"]
+    assert get_routing_policy("problem_analyst", config).timeout is None
+
+
+def test_inline_routes_target_agents_or_task_types(monkeypatch):
+    assert parse_routes("gpt-4o-mini<=16000|gpt-4o") == [(16000, "gpt-4o-mini"), (None, "gpt-4o")]
+    monkeypatch.setenv("DT_LLM_ROUTES", "extraction=gpt-4o;log_analyst=gpt-4o-mini<=8000|gpt-4o")
+    config = load_routing_config()
+    assert config["task_types"]["extraction"]["routes"] == [{"model": "gpt-4o", "max_prompt_tokens": None}]
+    assert get_routing_policy("problem_analyst", config).primary_model == "gpt-4o"
+    assert get_routing_policy("log_analyst", config).choose(9000) == "gpt-4o"
+
+
+def test_timed_out_call_retries_on_the_fallback_model():
+    llm = RoutedLLM(policy=RoutingPolicy([(None, "gpt-4o-mini")], fallbacks=["gpt-4o"]), agent_name="log_analyst")
+    attempts = []
+
+    def call(routed, *args):
+        attempts.append(routed.model)
+        if routed.model == "gpt-4o-mini":
+            raise TimeoutError("slow")
+        return "answer"
+
+    llm._call_routed = call
+    assert llm.call([{"role": "user", "content": "q"}]) == "answer"
+    assert attempts == ["gpt-4o-mini", "gpt-4o"]
+
+    stats = model_router.get_routing_stats().stats()["log_analyst"]
+    assert stats["gpt-4o-mini"]["timeouts"] >= 1
+
+
+def test_errors_other_than_timeouts_are_not_retried():
+    llm = RoutedLLM(policy=RoutingPolicy([(None, "gpt-4o-mini")], fallbacks=["gpt-4o"]))
+
+    def call(routed, *args):
+        raise ValueError("bad request")
+
+    llm._call_routed = call
+    with pytest.raises(ValueError):
+        llm.call("q")
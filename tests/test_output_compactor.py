@@ -0,0 +1,92 @@
+"""Tests for token-budgeted compaction of tool outputs"""
+
+import json
+
+import pytest
+
+from src.tools import output_compactor
+from src.tools.output_compactor import (
+    OutputCompactor,
+    collapse_tracebacks,
+    compaction_delta,
+    dedupe_lines,
+)
+
+
+@pytest.fixture(autouse=True)
+def character_token_estimate(monkeypatch):
+    # ~4 characters per token keeps budgets deterministic without tiktoken's encoding files
+    monkeypatch.setattr(output_compactor, "TIKTOKEN_AVAILABLE", False)
+
+
+def test_traceback_collapses_to_one_line():
+    text = (
+        "Traceback (most recent call last):\n"
+        '  File "/app/src/tools/dql.py", line 3, in main\n'
+        "    run()\n"
+        "ValueError: bad statement\n"
+        "done"
+    )
+    assert collapse_tracebacks(text) == "[traceback collapsed] ValueError: bad statement (at dql.py:3 in main)\ndone"
+
+
+def test_repeated_lines_and_table_rows_are_counted():
+    text = "retry\nretry\nretry\n| host |\n|---|\n| web-1 |\n| web-1 |\nend"
+    assert dedupe_lines(text) == "retry  (x3)\n| host |\n|---|\n| web-1 |  (x2)\nend"
+
+
+def test_output_within_budget_is_returned_unchanged():
+    compactor = OutputCompactor(budgets={"execute_dql": 100})
+    assert compactor.compact("execute_dql", "3 records") == "3 records"
+    assert compactor.stats()["execute_dql"]["compacted"] == 0
+
+
+def test_large_json_is_truncated_by_whole_items_and_readable_by_handle():
+    records = [{"id": index, "message": f"event number {index}"} for index in range(300)]
+    text = "Query result:\n" + json.dumps(records)
+    compactor = OutputCompactor(budgets={"execute_dql": 300})
+
+    compacted = compactor.compact("execute_dql", text)
+    assert compacted.startswith("Query result:\n[")
+    assert "more items" in compacted
+    assert output_compactor.estimate_tokens(compacted) <= 300
+
+    handle = compacted.rsplit("handle '", 1)[1].split("'")[0]
+    pages = [compactor.read(handle, page) for page in (1, 2)]
+    assert pages[0].startswith(text[:100])
+    assert "[Page 2 of" in pages[1]
+    assert compactor.read("out-missing").startswith("Error reading tool output")
+
+
+def test_long_text_keeps_leading_lines():
+    text = "\n".join(f"line {index} " + "x" * 40 for index in range(200))
+    compacted = OutputCompactor(budgets={"list_problems": 200}).compact("list_problems", text)
+    assert compacted.startswith("line 0 ")
+    assert "more lines" in compacted
+
+
+def test_delta_reports_tokens_saved_per_tool():
+    compactor = OutputCompactor(budgets={"list_problems": 50})
+    before = compactor.stats()
+    compactor.compact("list_problems", "\n".join("same line" for _ in range(100)))
+    delta = compaction_delta(before, compactor.stats())
+    assert delta["by_tool"]["list_problems"]["calls"] == 1
+    assert delta["total"]["tokens_saved"] > 0
+
+
+def test_full_outputs_are_scoped_by_environment(monkeypatch):
+    compactor = OutputCompactor(budgets={"list_problems": 50})
+    monkeypatch.setattr(output_compactor, "_compactor", compactor)
+
+    class Tool:
+        environment = "prod"
+
+        @output_compactor.compacted("list_problems")
+        def _run(self):
+            return "\n".join(f"problem {index} " + "x" * 40 for index in range(50))
+
+    compacted = Tool()._run()
+    handle = compacted.rsplit("handle '", 1)[1].split("'")[0]
+    assert compactor.read(handle, environment="prod").startswith("problem 0 ")
+    assert compactor.read(handle, environment="staging").startswith("Error reading tool output")
+    assert compactor.read(handle).startswith("Error reading tool output")
@@ -0,0 +1,24 @@
+"""Tests for the concurrent pre-fetch stage"""
+
+import asyncio
+import time
+
+from src.tools import dynatrace_mcp_tools as tools
+
+
+def test_calls_run_concurrently_and_failures_stay_isolated(monkeypatch):
+    async def fake_fetch(tool_name, arguments, on_upstream=None, environment=""):
+        await asyncio.sleep(0.1)
+        if tool_name == "list_vulnerabilities":
+            raise ConnectionError("down")
+        return f"{tool_name} text"
+
+    monkeypatch.setattr(tools, "fetch_tool_text", fake_fetch)
+    started = time.monotonic()
+    results = tools.prefetch_tool_results({"list_problems": {}, "list_vulnerabilities": {}, "get_environment_info": {}})
+
+    assert time.monotonic() - started < 0.25
+    assert results["list_problems"] == {"ok": True, "text": "list_problems text", "seconds": results["list_problems"]["seconds"]}
+    assert results["list_vulnerabilities"]["ok"] is False
+    assert results["list_vulnerabilities"]["error"] == "down"
+    assert results["get_environment_info"]["ok"] is True
@@ -0,0 +1,126 @@
+"""Tests for the per-backend token bucket and adaptive concurrency limiter"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.tools import rate_limiter
+from src.tools.rate_limiter import AdaptiveLimiter, TokenBucket, is_rate_limited, limited_async
+
+
+def _limiter(concurrency=1, max_concurrency=16, rate=0.0, burst=1) -> AdaptiveLimiter:
+    return AdaptiveLimiter(
+        "mcp:test", rate=rate, burst=burst, concurrency=concurrency,
+        max_concurrency=max_concurrency, latency_target=10.0
+    )
+
+
+def _count_attempts(limiter, monkeypatch):
+    attempts = []
+    original = limiter._try_acquire
+    monkeypatch.setattr(limiter, "_try_acquire", lambda: attempts.append(1) or original())
+    return attempts
+
+
+def test_token_bucket_refills_at_its_rate():
+    bucket = TokenBucket(rate=10, burst=1)
+    now = time.monotonic()
+    assert bucket.try_take(now) == 0.0
+    assert bucket.try_take(now) == pytest.approx(0.1)
+    assert bucket.try_take(now + 0.11) == 0.0
+
+
+def test_blocked_thread_sleeps_until_a_release(monkeypatch):
+    limiter = _limiter()
+    limiter.acquire()
+    attempts = _count_attempts(limiter, monkeypatch)
+    acquired_at = []
+
+    waiter = threading.Thread(target=lambda: (limiter.acquire(), acquired_at.append(time.monotonic())))
+    waiter.start()
+    time.sleep(0.2)
+    assert limiter.stats()["queue_depth"] == 1
+    released_at = time.monotonic()
+    limiter.release(0.01)
+    waiter.join(1)
+
+    assert acquired_at and acquired_at[0] - released_at < 0.05
+    assert len(attempts) <= 3  # one attempt before waiting, one after the wake-up - no polling
+
+
+def test_blocked_coroutine_is_woken_by_a_release_from_another_thread(monkeypatch):
+    limiter = _limiter()
+    limiter.acquire()
+    attempts = _count_attempts(limiter, monkeypatch)
+
+    async def scenario():
+        threading.Timer(0.2, limiter.release, args=(0.01,)).start()
+        started = time.monotonic()
+        await limiter.acquire_async()
+        return time.monotonic() - started
+
+    elapsed = asyncio.run(scenario())
+    assert 0.15 < elapsed < 0.4
+    assert len(attempts) <= 3
+    assert limiter.in_flight == 1
+
+
+def test_cancelled_coroutine_leaves_no_waiter_behind():
+    limiter = _limiter()
+    limiter.acquire()
+
+    async def scenario():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(limiter.acquire_async(), timeout=0.05)
+
+    asyncio.run(scenario())
+    assert limiter._async_waiters == []
+    assert limiter.stats()["queue_depth"] == 0
+
+
+def test_window_grows_on_success_and_halves_on_rate_limit():
+    limiter = _limiter(concurrency=4)
+    for _ in range(4):
+        limiter.acquire()
+        limiter.release(0.01)
+    assert limiter.limit == pytest.approx(4.9, abs=0.05)
+
+    limiter.acquire()
+    limiter.release(0.01, rate_limited=True, retry_after=0.2)
+    assert limiter.limit == pytest.approx(2.45, abs=0.05)
+    started = time.monotonic()
+    limiter.acquire()
+    assert time.monotonic() - started >= 0.15
+
+
+def test_cap_bounds_the_window_below_the_configured_maximum():
+    limiter = _limiter(concurrency=4, max_concurrency=16)
+    limiter.cap(2)
+    assert (limiter.limit, limiter.max_limit) == (2.0, 2.0)
+    for _ in range(10):
+        limiter.acquire()
+        limiter.release(0.01)
+    assert limiter.limit == 2.0
+
+    limiter.cap(64)
+    assert limiter.max_limit == 16.0
+
+
+def test_limited_async_caps_the_window(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "_limiters", {})
+    monkeypatch.delenv("DT_RATE_LIMITER_ENABLED", raising=False)
+
+    async def scenario():
+        async with limited_async("mcp:capped", max_concurrency=2):
+            pass
+
+    asyncio.run(scenario())
+    assert rate_limiter.get_limiter("mcp:capped").max_limit == 2.0
+
+
+def test_rate_limits_are_recognized_from_errors_and_text():
+    assert is_rate_limited(rate_limiter.RateLimitedError())
+    assert is_rate_limited(text="HTTP 429 Too Many Requests")
+    assert not is_rate_limited(text="HTTP 500 Internal Server Error")
@@ -0,0 +1,100 @@
+"""Tests for hedging slow idempotent MCP calls"""
+
+import asyncio
+
+import pytest
+
+from src.tools.request_hedger import RequestHedger, hedge_delta, percentile
+
+
+def _warm(hedger, tool_name, seconds=0.01, samples=5):
+    for _ in range(samples):
+        hedger.record_latency(tool_name, seconds)
+
+
+def _calls(results):
+    """A make_call returning the next (delay, value-or-exception) in turn"""
+    started = []
+
+    async def make_call():
+        index = len(started)
+        started.append(index)
+        delay, outcome = results[index]
+        await asyncio.sleep(delay)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+    return make_call, started
+
+
+def test_percentile_picks_the_nearest_rank():
+    assert percentile(range(1, 101), 0.95) == 95
+    assert percentile([3.0], 0.95) == 3.0
+
+
+def test_no_hedge_before_enough_latencies_are_seen():
+    hedger = RequestHedger({"list_problems"}, min_samples=5)
+    _warm(hedger, "list_problems", samples=4)
+    make_call, started = _calls([(0.2, "slow")])
+
+    assert asyncio.run(hedger.call("list_problems", make_call)) == "slow"
+    assert started == [0]
+    assert hedger.stats()["list_problems"]["hedged"] == 0
+
+
+def test_slow_call_is_hedged_and_the_hedge_wins():
+    hedger = RequestHedger({"list_problems"}, min_samples=5)
+    _warm(hedger, "list_problems")
+    before = hedger.stats()
+    make_call, started = _calls([(0.5, "primary"), (0.0, "hedge")])
+
+    assert asyncio.run(hedger.call("list_problems", make_call)) == "hedge"
+    assert started == [0, 1]
+
+    delta = hedge_delta(before, hedger.stats())["list_problems"]
+    assert (delta["calls"], delta["hedged"], delta["hedge_wins"], delta["win_rate"]) == (1, 1, 1, 1.0)
+
+
+def test_no_hedge_without_a_spare_session():
+    hedger = RequestHedger({"list_problems"}, min_samples=5)
+    _warm(hedger, "list_problems")
+    make_call, started = _calls([(0.2, "primary")])
+
+    assert asyncio.run(hedger.call("list_problems", make_call, can_hedge=lambda: False)) == "primary"
+    assert started == [0]
+
+
+def test_hedges_are_capped_by_the_budget():
+    hedger = RequestHedger({"list_problems"}, budget=0.0, min_samples=5)
+    _warm(hedger, "list_problems", samples=100)
+
+    async def run():
+        for _ in range(3):
+            make_call, _ = _calls([(0.1, "primary"), (0.0, "hedge")])
+            await hedger.call("list_problems", make_call)
+
+    asyncio.run(run())
+    stats = hedger.stats()["list_problems"]
+    # Only the burst allowance is spent when the budget is zero
+    assert (stats["hedged"], stats["budget_denied"]) == (2, 1)
+
+
+def test_primary_error_is_raised_when_both_requests_fail():
+    hedger = RequestHedger({"list_problems"}, min_samples=5)
+    _warm(hedger, "list_problems")
+    make_call, started = _calls([(0.2, RuntimeError("primary failed")), (0.0, RuntimeError("hedge failed"))])
+
+    with pytest.raises(RuntimeError, match="primary failed"):
+        asyncio.run(hedger.call("list_problems", make_call))
+    assert started == [0, 1]
+
+
+def test_hedge_delta_skips_tools_without_new_calls():
+    hedger = RequestHedger({"list_problems"}, min_samples=5)
+    make_call, _ = _calls([(0.0, "ok")])
+    asyncio.run(hedger.call("list_problems", make_call))
+    snapshot = hedger.stats()
+
+    assert hedge_delta(snapshot, snapshot) == {}
+    assert hedge_delta({}, snapshot)["list_problems"]["win_rate"] == 0.0
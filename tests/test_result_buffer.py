@@ -0,0 +1,95 @@
+"""Tests for streaming DQL records into the local columnar buffer"""
+
+import json
+
+from src.tools.result_buffer import (
+    Column,
+    ColumnarBuffer,
+    ResultBufferStore,
+    buffer_result,
+    iter_record_pages,
+    query_buffer,
+)
+
+RECORDS = [
+    {"service": "checkout", "status": 500, "message": "timeout"},
+    {"service": "checkout", "status": 200},
+    {"service": "payments", "status": 503, "message": "refused"},
+]
+RESPONSE = "Query returned 3 records\n\n" + json.dumps(RECORDS)
+
+
+def _buffer(records=RECORDS) -> ColumnarBuffer:
+    buffer = ColumnarBuffer()
+    buffer.append_page(records)
+    return buffer
+
+
+def test_records_are_decoded_in_pages():
+    pages = list(iter_record_pages(RESPONSE, page_size=2))
+    assert [len(page) for page in pages] == [2, 1]
+    assert pages[1][0]["service"] == "payments"
+    assert list(iter_record_pages("no records here")) == []
+
+
+def test_columns_are_typed_and_backfilled_with_nulls():
+    buffer = _buffer()
+    assert buffer.columns["service"].kind == "str"
+    assert buffer.columns["status"].kind == "num"
+    assert buffer.row(1) == {"service": "checkout", "status": 200.0, "message": None}
+
+
+def test_demotion_stores_old_and_new_values_alike():
+    strings = Column("value")
+    for value in ("abc", 7, "def"):
+        strings.append(value)
+    assert strings.kind == "json"
+    assert [strings.get(i) for i in range(3)] == ["abc", "7", "def"]
+
+    numbers = Column("value")
+    for value in (3, 2.5, "n/a", 4, {"a": 1}, None):
+        numbers.append(value)
+    assert [numbers.get(i) for i in range(6)] == ["3", "2.5", "n/a", "4", '{"a": 1}', None]
+
+
+def test_query_filters_and_groups_locally():
+    buffer = _buffer()
+    assert query_buffer(buffer, where="status >= 500", group_by="service").splitlines() == [
+        "2 matching records grouped by service (2 groups):",
+        "  checkout: 1",
+        "  payments: 1",
+    ]
+    assert query_buffer(buffer, where="message contains REF").startswith("1 matching records")
+    assert query_buffer(buffer, where="missing == 1").startswith("Error: unknown field 'missing'")
+
+
+def test_numeric_literals_match_numbers_in_demoted_columns():
+    buffer = _buffer([{"status": 200}, {"status": "n/a"}, {"status": 200.5}, {"status": 503}])
+    assert buffer.columns["status"].kind == "json"
+    assert query_buffer(buffer, where="status == 200").startswith("1 matching records")
+    assert query_buffer(buffer, where="status >= 500").startswith("1 matching records")
+    assert query_buffer(buffer, where="status == n/a").startswith("1 matching records")
+
+
+def test_store_evicts_least_recently_used_buffer():
+    store = ResultBufferStore(max_buffers=2)
+    first, second = store.add(_buffer()), store.add(_buffer())
+    assert store.get(first) is not None
+    store.add(_buffer())
+    assert store.get(first) is not None
+    assert store.get(second) is None
+
+
+def test_buffer_result_summarizes_and_registers_a_handle():
+    summary = buffer_result(RESPONSE)
+    assert summary.startswith("Query returned 3 records")
+    assert "3 records, 3 columns" in summary
+    assert buffer_result("no records here") is None
+
+
+def test_handles_are_scoped_by_environment():
+    store = ResultBufferStore()
+    handle = store.add(_buffer(), environment="prod")
+    assert store.get(handle, environment="prod") is not None
+    assert store.get(handle, environment="staging") is None
+    assert store.get(handle) is None
@@ -0,0 +1,79 @@
+"""Tests for single-flight coalescing of identical in-flight requests"""
+
+import asyncio
+import gc
+
+import pytest
+
+from src.tools.single_flight import SingleFlight
+
+
+def test_identical_concurrent_calls_share_one_request():
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return "P-1"
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("list_problems", fetch) for _ in range(5)))
+
+    assert asyncio.run(scenario()) == ["P-1"] * 5
+    assert len(calls) == 1
+    assert flight.stats == {"leaders": 1, "coalesced": 4}
+    assert flight.in_flight == 0
+
+
+def test_followers_receive_the_leaders_exception():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ConnectionError("down")
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("k", fail) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(result, ConnectionError) for result in asyncio.run(scenario()))
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_request():
+    flight = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    async def scenario():
+        leader = asyncio.ensure_future(flight.do("k", fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do("k", fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(scenario()) == "ok"
+
+
+def test_failure_after_every_caller_was_cancelled_is_not_reported_as_unretrieved():
+    flight = SingleFlight()
+    unhandled = []
+
+    async def fail():
+        await asyncio.sleep(0.02)
+        raise ConnectionError("down")
+
+    async def scenario():
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: unhandled.append(context))
+        leader = asyncio.ensure_future(flight.do("k", fail))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        await asyncio.sleep(0.05)
+        gc.collect()
+
+    asyncio.run(scenario())
+    assert not unhandled
@@ -0,0 +1,52 @@
+"""Tests for the dependency-wave task scheduling of the crew"""
+
+import pytest
+
+from src.crew_orchestrator import build_task_waves, schedule_parallel_tasks
+
+
+class FakeTask:
+    def __init__(self, name, context=None):
+        self.name = name
+        self.context = context or []
+        self.async_execution = False
+
+    def __repr__(self):
+        return self.name
+
+
+def make_tasks():
+    problems = FakeTask("problems")
+    security = FakeTask("security")
+    logs = FakeTask("logs", [problems, security])
+    synthesis = FakeTask("synthesis", [problems, security, logs])
+    onboarding = FakeTask("onboarding", [synthesis])
+    return [problems, security, logs, synthesis, onboarding]
+
+
+def test_independent_tasks_share_a_wave():
+    waves = build_task_waves(make_tasks())
+    assert [[task.name for task in wave] for wave in waves] == [
+        ["problems", "security"], ["logs"], ["synthesis"], ["onboarding"]
+    ]
+
+
+def test_parallel_wave_is_async_and_followed_by_a_barrier():
+    ordered = schedule_parallel_tasks(build_task_waves(make_tasks()))
+    assert [task.name for task in ordered if task.async_execution] == ["problems", "security"]
+    assert not ordered[-1].async_execution
+
+
+def test_last_task_of_the_crew_is_synchronous():
+    a, b = FakeTask("a"), FakeTask("b")
+    ordered = schedule_parallel_tasks(build_task_waves([a, b]))
+    assert a.async_execution and not b.async_execution
+    assert ordered == [a, b]
+
+
+def test_cycles_are_rejected():
+    a = FakeTask("a")
+    b = FakeTask("b", [a])
+    a.context = [b]
+    with pytest.raises(ValueError):
+        build_task_waves([a, b])